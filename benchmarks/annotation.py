@@ -0,0 +1,69 @@
+'''
+Render time of the screenshot annotation on dense synthetic element layouts.
+
+Boxes tile the whole screen (the layout that crowds labels most) and are drawn on a frame
+at the vision-mode capture scale. No X session is needed.
+
+    python benchmarks/annotation.py --boxes 100 500 1000 --runs 50
+'''
+from linux_use.agent.tree.views import TreeElementNode, BoundingBox, Center
+from linux_use.agent.tree.annotation import AnnotationRenderer, LabelGrid
+from statistics import median, quantiles
+from math import ceil, sqrt
+from time import perf_counter
+from tabulate import tabulate
+from PIL import Image
+import argparse
+import random
+
+def make_nodes(count: int, width: int, height: int, seed: int = 0) -> list[TreeElementNode]:
+    '''`count` boxes tiling the screen like a spreadsheet or a crowded toolbar, with uneven gaps.'''
+    generator = random.Random(seed)
+    columns = ceil(sqrt(count * width / height))
+    rows = ceil(count / columns)
+    cell_width, cell_height = width // columns, height // rows
+    nodes = []
+    for index in range(count):
+        row, column = divmod(index, columns)
+        x, y = column * cell_width, row * cell_height
+        box_width = max(8, cell_width - generator.randint(2, cell_width // 3))
+        box_height = max(8, cell_height - generator.randint(2, cell_height // 3))
+        box = BoundingBox(left=x, top=y, right=x + box_width, bottom=y + box_height, width=box_width, height=box_height)
+        nodes.append(TreeElementNode(name=f'Element {index}', control_type='Push_Button', value='', shortcut='',
+                                     bounding_box=box, center=Center(x + box_width // 2, y + box_height // 2), app_name='Bench'))
+    return nodes
+
+def count_overlapping_labels(renderer: AnnotationRenderer, nodes: list[TreeElementNode], scale: float, size: tuple[int, int]) -> int:
+    grid = LabelGrid()
+    for index, node in enumerate(nodes):
+        box = node.bounding_box
+        rect = (int(box.left * scale), int(box.top * scale), int(box.right * scale), int(box.bottom * scale))
+        renderer.place(rect, renderer.get_label_width(str(index)), size, grid)
+    # Every label overlaps itself
+    return sum(grid.overlaps(rect) > 1 for rect in grid.rects)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--boxes', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--scale', type=float, default=0.5)
+    args = parser.parse_args()
+
+    screen = (1920, 1080)
+    size = (int(screen[0] * args.scale), int(screen[1] * args.scale))
+    renderer = AnnotationRenderer()
+    rows = []
+    for count in args.boxes:
+        nodes = make_nodes(count, *screen)
+        frames = [Image.new('RGB', size, color=(240, 240, 240)) for _ in range(args.runs)]
+        times = []
+        for frame in frames:
+            start = perf_counter()
+            renderer.render(frame, nodes, args.scale)
+            times.append((perf_counter() - start) * 1000)
+        p95 = quantiles(times, n=20)[-1] if len(times) > 1 else times[0]
+        rows.append([count, f'{median(times):.2f}', f'{p95:.2f}', count_overlapping_labels(renderer, nodes, args.scale, size)])
+    print(tabulate(rows, headers=['Boxes', 'Median (ms)', 'p95 (ms)', 'Overlapping labels'], tablefmt='github'))
+
+if __name__ == '__main__':
+    main()
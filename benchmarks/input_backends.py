@@ -0,0 +1,57 @@
+'''
+Wall time of the input tools under each input backend.
+
+Needs a live X session. Open a scratch text field (e.g. an empty editor window) and pass
+a point inside it with --loc; the benchmark clicks, types, scrolls and drags there.
+
+    python benchmarks/input_backends.py --loc 600,400 --runs 5
+'''
+from linux_use.agent.tools.service import click_tool, type_tool, scroll_tool, drag_tool, move_tool, shortcut_tool
+from linux_use.agent.input.views import InputBackend
+from linux_use.agent.desktop.service import Desktop
+from linux_use.agent.registry.service import Registry
+from time import perf_counter
+from tabulate import tabulate
+import argparse
+
+def get_actions(x: int, y: int) -> list[tuple[str, dict]]:
+    return [
+        ('Move Tool', {'to_loc': (x, y)}),
+        ('Click Tool', {'loc': (x, y), 'button': 'left', 'clicks': 1}),
+        ('Type Tool', {'loc': (x, y), 'text': 'The quick brown fox jumps over the lazy dog. ', 'clear': 'true'}),
+        ('Shortcut Tool', {'shortcut': 'ctrl+a'}),
+        ('Scroll Tool', {'loc': (x, y), 'type': 'vertical', 'direction': 'down', 'wheel_times': 3}),
+        ('Drag Tool', {'from_loc': (x, y), 'to_loc': (x + 100, y)}),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--loc', required=True, help='x,y of a scratch text field')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    x, y = map(int, args.loc.split(','))
+
+    registry = Registry([click_tool, type_tool, scroll_tool, drag_tool, move_tool, shortcut_tool])
+    desktop = Desktop(compare_frames=False)
+    backends = list(InputBackend)
+    timings: dict[str, dict[InputBackend, float]] = {}
+    for backend in backends:
+        desktop.set_input_backend(backend)
+        if desktop.input.backend != backend:
+            print(f'{backend.value} is not available on this display, skipped.')
+            continue
+        for name, params in get_actions(x, y):
+            start = perf_counter()
+            for _ in range(args.runs):
+                result = registry.execute(name, desktop, **params)
+                if not result.is_success:
+                    raise RuntimeError(f'{name} failed with {backend.value}: {result.error}')
+            timings.setdefault(name, {})[backend] = (perf_counter() - start) / args.runs
+
+    headers = ['Tool'] + [f'{backend.value} (ms)' for backend in backends]
+    rows = [[name] + [f'{per_backend[backend]*1000:.1f}' if backend in per_backend else '-' for backend in backends]
+            for name, per_backend in timings.items()]
+    print(tabulate(rows, headers=headers, tablefmt='github'))
+
+if __name__ == '__main__':
+    main()
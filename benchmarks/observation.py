@@ -0,0 +1,137 @@
+'''
+Size and render time of the observation sections in each ObservationFormat.
+
+Runs on synthetic trees shaped like busy desktops (a browser page, a file manager and an
+editor) unless recorded trees are given. Record the tree of the current desktop with
+`--record FILE`, then compare on it with `--trees FILE ...`. Tokens are counted with
+tiktoken's cl100k_base when it is installed and estimated as bytes / 4 otherwise.
+
+    python benchmarks/observation.py --elements 200 1000 3000 --runs 20
+    python benchmarks/observation.py --record tree.json
+    python benchmarks/observation.py --trees tree.json
+'''
+from linux_use.agent.tree.views import TreeState, TreeElementNode, TextElementNode, ScrollElementNode, BoundingBox, Center
+from linux_use.agent.observation.service import ObservationEncoder
+from linux_use.agent.observation.views import ObservationFormat
+from dataclasses import asdict, fields
+from statistics import median
+from time import perf_counter
+from tabulate import tabulate
+import argparse
+import random
+import json
+
+try:
+    import tiktoken
+    TOKENIZER = tiktoken.get_encoding('cl100k_base')
+except Exception:
+    TOKENIZER = None
+
+APPS = ['Firefox', 'Files', 'Text Editor']
+CONTROL_TYPES = ['Push_Button', 'Link', 'Entry', 'Menu_Item', 'Check_Box', 'Combo_Box', 'Toggle_Button', 'Tab']
+WORDS = ['Open', 'Save', 'Settings', 'Downloads', 'Search', 'Account', 'Report', 'New', 'Tab', 'Close', 'Quarterly',
+         'Results', 'Profile', 'Documents', 'Share', 'Edit', 'View', 'History', 'Bookmarks', 'Help']
+
+def make_tree(count: int, seed: int = 0) -> TreeState:
+    '''`count` interactive elements, half as many texts and a few scroll containers, grouped by app.'''
+    generator = random.Random(seed)
+    def words(low, high):
+        return ' '.join(generator.choice(WORDS) for _ in range(generator.randint(low, high)))
+    def box():
+        x, y = generator.randint(0, 1800), generator.randint(0, 1000)
+        width, height = generator.randint(20, 300), generator.randint(16, 40)
+        return BoundingBox(left=x, top=y, right=x + width, bottom=y + height, width=width, height=height), Center(x + width // 2, y + height // 2)
+    interactive, informative, scrollable = [], [], []
+    for index in range(count):
+        bounding_box, center = box()
+        control_type = generator.choice(CONTROL_TYPES)
+        interactive.append(TreeElementNode(
+            name=words(1, 4), control_type=control_type,
+            value=words(1, 3) if control_type in ('Entry', 'Combo_Box') and generator.random() < 0.6 else '',
+            shortcut=f'Alt+{generator.choice("ABCDEFGH")}' if generator.random() < 0.1 else '',
+            bounding_box=bounding_box, center=center, app_name=APPS[index * len(APPS) // count]))
+    for index in range(count // 2):
+        informative.append(TextElementNode(name=words(2, 12), app_name=APPS[index * len(APPS) // (count // 2)]))
+    for index in range(max(1, count // 100)):
+        bounding_box, center = box()
+        vertical = generator.random() < 0.9
+        scrollable.append(ScrollElementNode(
+            name=words(1, 2), control_type='Scroll_Pane', app_name=APPS[index % len(APPS)], bounding_box=bounding_box,
+            center=center, horizontal_scrollable=not vertical, horizontal_scroll_percent=0.0 if vertical else 50.0,
+            vertical_scrollable=vertical, vertical_scroll_percent=round(generator.random() * 100, 1), is_focused=index == 0))
+    return TreeState(interactive_nodes=interactive, informative_nodes=informative, scrollable_nodes=scrollable)
+
+def dump_tree(tree_state: TreeState) -> dict:
+    def serialize(node):
+        return {key: value for key, value in asdict(node).items() if key != 'accessible'}
+    return {
+        'interactive': [serialize(node) for node in tree_state.interactive_nodes],
+        'informative': [serialize(node) for node in tree_state.informative_nodes],
+        'scrollable': [serialize(node) for node in tree_state.scrollable_nodes]
+    }
+
+def load_tree(data: dict) -> TreeState:
+    def located(node_type, item):
+        names = {field.name for field in fields(node_type)}
+        item = {key: value for key, value in item.items() if key in names}
+        item['bounding_box'] = BoundingBox(**item['bounding_box'])
+        item['center'] = Center(**item['center'])
+        if 'element_id' in item:
+            item['element_id'] = tuple(item['element_id'])
+        return node_type(**item)
+    return TreeState(
+        interactive_nodes=[located(TreeElementNode, item) for item in data['interactive']],
+        informative_nodes=[TextElementNode(**item) for item in data['informative']],
+        scrollable_nodes=[located(ScrollElementNode, item) for item in data['scrollable']]
+    )
+
+def render(encoder: ObservationEncoder, tree_state: TreeState) -> str:
+    return '\n'.join([encoder.interactive_elements(tree_state), encoder.informative_elements(tree_state), encoder.scrollable_elements(tree_state)])
+
+def count_tokens(text: str) -> int:
+    if TOKENIZER is None:
+        return len(text.encode('utf-8')) // 4
+    return len(TOKENIZER.encode(text))
+
+def record(path: str):
+    from linux_use.agent.desktop.service import Desktop
+    desktop = Desktop()
+    state = desktop.get_state()
+    with open(path, 'w') as file:
+        json.dump(dump_tree(state.tree_state), file)
+    print(f'Recorded {len(state.tree_state.interactive_nodes)} interactive elements to {path}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--elements', type=int, nargs='+', default=[200, 1000, 3000])
+    parser.add_argument('--trees', nargs='+', default=[], help='Recorded trees (JSON) used instead of synthetic ones')
+    parser.add_argument('--record', help='Record the tree of the current desktop to this file and exit')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+    if args.trees:
+        cases = []
+        for path in args.trees:
+            with open(path) as file:
+                cases.append((path, load_tree(json.load(file))))
+    else:
+        cases = [(f'synthetic {count}', make_tree(count)) for count in args.elements]
+
+    rows = []
+    for name, tree_state in cases:
+        for format in ObservationFormat:
+            encoder = ObservationEncoder(format)
+            times = []
+            for _ in range(args.runs):
+                start = perf_counter()
+                text = render(encoder, tree_state)
+                times.append((perf_counter() - start) * 1000)
+            rows.append([name, format.value, len(text.encode('utf-8')), count_tokens(text), f'{median(times):.2f}'])
+    tokens = 'Tokens' if TOKENIZER is not None else 'Tokens (bytes/4)'
+    print(tabulate(rows, headers=['Tree', 'Format', 'Bytes', tokens, 'Median (ms)'], tablefmt='github'))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+'''
+Prompt size and parse failure rate of the XML output format and of native tool calling.
+
+A scripted chat model answers a fixed mix of steps (clicks, typing, scrolling, shortcuts,
+launching an app, the final answer). A share of the answers carry the slips models make in
+each mode (unclosed tags, Python/JSON mix-ups, tuples written as strings, arguments that are
+not valid JSON, prose without an action). Each answer is read twice: as written (XML that
+ResponseParser reads without any repair, the tool calls as returned for tool calling) and
+with ResponseParser's repairs. An answer fails when it cannot be parsed or an action does
+not match its tool's schema, i.e. when it would cost another LLM call. Tokens are counted
+with tiktoken's cl100k_base when it is installed and estimated as bytes / 4 otherwise.
+
+    python benchmarks/tool_calling.py --responses 2000 --slip-rate 0.2
+'''
+from linux_use.agent.tools.service import (click_tool, type_tool, shell_tool, done_tool,
+shortcut_tool, scroll_tool, drag_tool, move_tool, wait_tool, app_tool, scrape_tool, memory_tool)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.messages import AIMessage, HumanMessage
+from linux_use.agent.registry.service import Registry, function_name
+from linux_use.agent.repair.service import ResponseParser
+from linux_use.agent.prompt.service import load_template
+from linux_use.agent.views import AgentData
+from pydantic import ValidationError
+from statistics import median
+from time import perf_counter
+from tabulate import tabulate
+import argparse
+import random
+import json
+
+try:
+    import tiktoken
+    TOKENIZER = tiktoken.get_encoding('cl100k_base')
+except Exception:
+    TOKENIZER = None
+
+TOOLS = [click_tool, type_tool, app_tool, shell_tool, done_tool, shortcut_tool, scroll_tool, drag_tool, move_tool, wait_tool, scrape_tool, memory_tool]
+STEPS = [
+    ('App Tool', {'mode': 'launch', 'name': 'Text Editor'}),
+    ('Click Tool', {'loc': [640, 360], 'button': 'left', 'clicks': 1}),
+    ('Type Tool', {'loc': [640, 360], 'text': 'Quarterly report', 'clear': 'true', 'press_enter': 'false'}),
+    ('Scroll Tool', {'loc': [900, 500], 'direction': 'down', 'wheel_times': 3}),
+    ('Shortcut Tool', {'shortcut': 'ctrl+s'}),
+    ('Done Tool', {'answer': 'The report is saved in Documents.'}),
+]
+EVALUATE = 'Success - the previous action had the expected effect'
+THOUGHT = 'Continue with the next step of the task'
+XML_SLIPS = ['fence', 'unclosed_input', 'mixed_literals', 'bare_keys', 'tool_name', 'string_tuple', 'prose']
+TOOL_CALL_SLIPS = ['no_reasoning', 'string_tuple', 'bool_argument', 'invalid_json', 'prose']
+PROSE = 'I will now save the document with Ctrl+S.'
+# The facts of a host, in place of a live desktop
+SYSTEM_VALUES = {
+    'instructions': '', 'download_directory': '/home/user/Downloads', 'os': 'Ubuntu 24.04 LTS', 'language': 'English',
+    'browser': 'firefox', 'home_dir': '/home/user', 'user': 'user (admin)', 'max_steps': 25, 'max_batch_actions': 5,
+    'resolution': 'Primary Monitor (1920x1080) with DPI Scale: 1.0'
+}
+
+class ScriptedChatModel(BaseChatModel):
+    '''Answers from a script of messages, in order.'''
+    responses: list[AIMessage]
+    index: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return 'scripted'
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=tools, **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self.responses[self.index % len(self.responses)]
+        self.index += 1
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+def count_tokens(text: str) -> int:
+    if TOKENIZER is None:
+        return len(text.encode('utf-8')) // 4
+    return len(TOKENIZER.encode(text))
+
+def system_prompt(registry: Registry, tool_calling: bool) -> str:
+    tools_prompt = registry.get_tool_names_prompt() if tool_calling else registry.get_tools_prompt()
+    output_format = load_template('tool_calling_output.md' if tool_calling else 'xml_output.md').format()
+    return load_template('system.md').format(**SYSTEM_VALUES, tools_prompt=tools_prompt, output_format=output_format)
+
+def xml_response(name: str, args: dict, slip: str | None) -> AIMessage:
+    action_input = json.dumps(args)
+    if slip == 'prose':
+        return AIMessage(content=PROSE)
+    if slip == 'tool_name':
+        name = name.split()[0].lower()
+    if slip == 'string_tuple' and 'loc' in args:
+        action_input = json.dumps(args | {'loc': str(tuple(args['loc']))})
+    if slip == 'mixed_literals':
+        action_input = repr(args)[:-1] + ", 'visible': true}"
+    if slip == 'bare_keys':
+        action_input = '{' + ', '.join(f'{key}: {json.dumps(value)}' for key, value in args.items()) + '}'
+    closing = '' if slip == 'unclosed_input' else '</action_input>'
+    text = (f'<output>\n  <evaluate>{EVALUATE}</evaluate>\n  <thought>{THOUGHT}</thought>\n'
+            f'  <action_name>{name}</action_name>\n  <action_input>{action_input}{closing}\n</output>')
+    if slip == 'fence':
+        text = f'```xml\n{text}\n```'
+    return AIMessage(content=text)
+
+def tool_call_response(name: str, args: dict, slip: str | None, id: str) -> AIMessage:
+    content = f'<evaluate>{EVALUATE}</evaluate>\n<thought>{THOUGHT}</thought>'
+    if slip == 'prose':
+        return AIMessage(content=PROSE)
+    if slip == 'no_reasoning':
+        content = ''
+    if slip == 'string_tuple' and 'loc' in args:
+        args = args | {'loc': str(tuple(args['loc']))}
+    if slip == 'bool_argument' and name == 'Type Tool':
+        args = args | {'clear': True}
+    if slip == 'invalid_json':
+        invalid = {'name': function_name(name), 'args': repr(args), 'id': id, 'error': None, 'type': 'invalid_tool_call'}
+        return AIMessage(content=content, invalid_tool_calls=[invalid])
+    return AIMessage(content=content, tool_calls=[{'name': function_name(name), 'args': args, 'id': id, 'type': 'tool_call'}])
+
+def script(count: int, slip_rate: float, tool_calling: bool, seed: int) -> list[AIMessage]:
+    '''The same steps and slip draws for both modes, so their rates compare like for like.'''
+    generator = random.Random(seed)
+    responses = []
+    for index in range(count):
+        name, args = STEPS[index % len(STEPS)]
+        slipped = generator.random() < slip_rate
+        slips = TOOL_CALL_SLIPS if tool_calling else XML_SLIPS
+        slip = generator.choice(slips) if slipped else None
+        responses.append(tool_call_response(name, args, slip, f'call_{index}') if tool_calling else xml_response(name, args, slip))
+    return responses
+
+def is_executable(agent_data: AgentData, registry: Registry) -> bool:
+    for action in agent_data.actions:
+        tool = registry.tools_registry.get(action.name)
+        if tool is None:
+            return False
+        try:
+            tool.args_schema.model_validate(action.params)
+        except ValidationError:
+            return False
+    return True
+
+def read_as_written(message: AIMessage, registry: Registry, tool_calling: bool) -> AgentData | None:
+    '''The response without repairs: XML that reads without any repair, or the tool calls exactly as returned.'''
+    try:
+        if not tool_calling:
+            parsed = ResponseParser(registry).parse_message(message)
+            return parsed.agent_data if not parsed.repairs else None
+        names = {function_name(name): name for name in registry.tools_registry}
+        actions = [{'name': names.get(call['name'], call['name']), 'params': call['args']} for call in message.tool_calls]
+        return AgentData.model_validate({'evaluate': '', 'thought': '', 'actions': actions})
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--responses', type=int, default=1200)
+    parser.add_argument('--slip-rate', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    registry = Registry(TOOLS)
+    response_parser = ResponseParser(registry)
+    messages = [HumanMessage(content='state')]
+    rows = []
+    for tool_calling in (False, True):
+        mode = 'tool calling' if tool_calling else 'xml'
+        definitions = registry.get_tool_definitions()
+        llm = ScriptedChatModel(responses=script(args.responses, args.slip_rate, tool_calling, args.seed))
+        chat_llm = llm.bind_tools(definitions) if tool_calling else llm
+        system = count_tokens(system_prompt(registry, tool_calling))
+        tools = count_tokens(json.dumps(definitions)) if tool_calling else 0
+        strict_failures = repaired_failures = 0
+        output_tokens, times = [], []
+        for _ in range(args.responses):
+            message = chat_llm.invoke(messages)
+            output_tokens.append(count_tokens(message.content) + sum(count_tokens(function_name(call['name']) + json.dumps(call['args'])) for call in message.tool_calls))
+            agent_data = read_as_written(message, registry, tool_calling)
+            strict_failures += agent_data is None or not is_executable(agent_data, registry)
+            start = perf_counter()
+            parsed = response_parser.parse_message(message, tool_calling=tool_calling)
+            times.append((perf_counter() - start) * 1e6)
+            repaired_failures += not parsed.is_success or not is_executable(parsed.agent_data, registry)
+        rows.append([mode, system, tools, system + tools, f'{median(output_tokens):.0f}',
+                     f'{strict_failures / args.responses:.1%}', f'{repaired_failures / args.responses:.1%}', f'{median(times):.0f}'])
+    tokens = '' if TOKENIZER is not None else ' (bytes/4)'
+    print(f'{args.responses} responses, {args.slip_rate:.0%} with a slip, tokens{tokens}')
+    print(tabulate(rows, headers=['Mode', 'System prompt', 'Tool definitions', 'Prompt total', 'Response (median)',
+                                  'Failures as written', 'Failures repaired', 'Parse (µs)'], tablefmt='github'))
+
+if __name__ == '__main__':
+    main()
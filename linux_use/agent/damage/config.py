@@ -0,0 +1,8 @@
+# Damage records kept for change queries; a query reaching past the oldest one is reported as incomplete
+DAMAGE_HISTORY_SIZE = 4096
+
+# Depth below a top-level window searched for the client window (the one carrying WM_STATE)
+CLIENT_SEARCH_DEPTH = 2
+
+# Longest wait (s) for X events before the listener checks whether it was closed
+DAMAGE_POLL_INTERVAL = 0.1
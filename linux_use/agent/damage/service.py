@@ -0,0 +1,225 @@
+from linux_use.agent.damage.config import DAMAGE_HISTORY_SIZE, CLIENT_SEARCH_DEPTH, DAMAGE_POLL_INTERVAL
+from linux_use.agent.damage.views import ScreenChanges, Region
+from threading import Thread, Event, Lock
+from collections import deque
+from select import select
+from time import monotonic
+from typing import Optional
+
+# Try to import X11 libraries
+try:
+    from Xlib import display, X
+    from Xlib.ext import damage
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+class TrackedWindow:
+    '''A mapped top-level window with its damage object, its client window and its last known geometry.'''
+    def __init__(self, damage_id: int, client: int, geometry: Region):
+        self.damage_id = damage_id
+        self.client = client
+        self.geometry = geometry
+
+class DamageTracker:
+    '''
+    Records where the screen changed, per window, from the XDamage extension.
+
+    Every mapped top-level window gets a bounding-box damage object. The server reports the
+    box around new damage, the tracker stores it in screen coordinates under the window's
+    client (the window carrying `WM_STATE`, i.e. `App.handle`) and subtracts the damage, so
+    the next repaint is reported afresh. Maps, unmaps and moves count as changes to the area
+    they cover. A static screen produces no events, so tracking costs nothing while idle.
+
+    Queries take a monotonic timestamp (e.g. taken at the previous observation) and return
+    the union per window of everything damaged since then.
+
+    Args:
+        display_name (str, optional): X display to watch. Defaults to None ($DISPLAY).
+        history_size (int, optional): Damage records kept for queries. Defaults to DAMAGE_HISTORY_SIZE.
+    '''
+    def __init__(self, display_name: Optional[str] = None, history_size: int = DAMAGE_HISTORY_SIZE):
+        self.display_name = display_name
+        self.history: deque[tuple[float, int, Region]] = deque(maxlen=history_size)
+        self.windows: dict[int, TrackedWindow] = {}
+        self.lock = Lock()
+        self.started = 0.0
+        # Changes before this time are unknown (tracking had not started or the record was dropped)
+        self.truncated_at = float('inf')
+        self.last_activity = 0.0
+        self.available = False
+        self.ready = Event()
+        self.closed = Event()
+        self.thread: Optional[Thread] = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = Thread(target=self.run_listener, name='damage-tracker', daemon=True)
+            self.thread.start()
+
+    def close(self):
+        '''Stop listening and close the X connection; queries report unknown changes from now on.'''
+        self.closed.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.available = False
+
+    def run_listener(self):
+        try:
+            self.listen()
+        except Exception:
+            # Extension missing or connection lost: queries report unknown changes from now on
+            self.available = False
+        finally:
+            self.ready.set()
+
+    def listen(self):
+        if not XLIB_AVAILABLE:
+            return
+        connection = display.Display(self.display_name)
+        if not connection.has_extension('DAMAGE'):
+            connection.close()
+            return
+        # Windows vanish between requests; the resulting BadWindow/BadDamage errors are expected
+        connection.set_error_handler(lambda *args: None)
+        connection.damage_query_version(1, 1)
+        self.connection = connection
+        self.notify_type = connection.query_extension('DAMAGE').first_event + damage.DamageNotifyCode
+        self.wm_state = connection.intern_atom('WM_STATE')
+        self.root = connection.screen().root
+        self.screen_size = (connection.screen().width_in_pixels, connection.screen().height_in_pixels)
+        self.root.change_attributes(event_mask=X.SubstructureNotifyMask)
+        for window in self.root.query_tree().children:
+            try:
+                viewable = window.get_attributes().map_state == X.IsViewable
+            except Exception:
+                continue
+            if viewable:
+                self.track(window, record=False)
+        connection.flush()
+        with self.lock:
+            self.started = self.truncated_at = monotonic()
+        self.available = True
+        self.ready.set()
+        damaged: set[int] = set()
+        try:
+            while not self.closed.is_set():
+                if connection.pending_events():
+                    self.handle_event(connection.next_event(), damaged)
+                    continue
+                if damaged:
+                    # Reset the reported boxes once the queue is drained, one request per window
+                    for damage_id in damaged:
+                        connection.damage_subtract(damage_id)
+                    damaged.clear()
+                    connection.flush()
+                select([connection], [], [], DAMAGE_POLL_INTERVAL)
+        finally:
+            connection.close()
+
+    def handle_event(self, event, damaged: set[int]):
+        if event.type == self.notify_type:
+            tracked = self.windows.get(event.drawable.id)
+            if tracked is None:
+                return
+            geometry, area = event.drawable_geometry, event.area
+            tracked.geometry = (geometry.x, geometry.y, geometry.x + geometry.width, geometry.y + geometry.height)
+            left, top = geometry.x + area.x, geometry.y + area.y
+            self.record(tracked.client, (left, top, left + area.width, top + area.height))
+            damaged.add(tracked.damage_id)
+        elif event.type == X.MapNotify:
+            self.track(event.window)
+        elif event.type in (X.UnmapNotify, X.DestroyNotify):
+            self.untrack(event.window.id)
+        elif event.type == X.ConfigureNotify:
+            tracked = self.windows.get(event.window.id)
+            if tracked is None:
+                return
+            geometry = (event.x, event.y, event.x + event.width, event.y + event.height)
+            if geometry != tracked.geometry:
+                # Both the uncovered and the newly covered area changed
+                self.record(tracked.client, tracked.geometry)
+                self.record(tracked.client, geometry)
+                tracked.geometry = geometry
+        elif event.type == X.ReparentNotify:
+            if event.parent.id != self.root.id:
+                # Reparented into a frame: the frame is tracked instead once it is mapped
+                self.untrack(event.window.id, record=False)
+
+    def track(self, window, record: bool = True):
+        if window.id in self.windows:
+            return
+        try:
+            geometry = window.get_geometry()
+            damage_id = window.damage_create(damage.DamageReportBoundingBox)
+        except Exception:
+            return
+        region = (geometry.x, geometry.y, geometry.x + geometry.width, geometry.y + geometry.height)
+        tracked = TrackedWindow(damage_id=damage_id, client=self.find_client(window) or window.id, geometry=region)
+        self.windows[window.id] = tracked
+        if record:
+            self.record(tracked.client, region)
+
+    def untrack(self, window_id: int, record: bool = True):
+        tracked = self.windows.pop(window_id, None)
+        if tracked is None:
+            return
+        self.connection.damage_destroy(tracked.damage_id)
+        if record:
+            # Whatever the window covered is exposed now
+            self.record(tracked.client, tracked.geometry)
+
+    def find_client(self, window, depth: int = CLIENT_SEARCH_DEPTH) -> Optional[int]:
+        '''The client window at or below a top-level window (the frame of a reparenting window manager).'''
+        try:
+            if window.get_full_property(self.wm_state, X.AnyPropertyType) is not None:
+                return window.id
+            if depth == 0:
+                return None
+            children = window.query_tree().children
+        except Exception:
+            return None
+        for child in children:
+            client = self.find_client(child, depth - 1)
+            if client is not None:
+                return client
+        return None
+
+    def record(self, window: int, region: Region):
+        width, height = self.screen_size
+        left, top, right, bottom = region
+        region = (max(left, 0), max(top, 0), min(right, width), min(bottom, height))
+        if region[0] >= region[2] or region[1] >= region[3]:
+            return
+        now = monotonic()
+        with self.lock:
+            if len(self.history) == self.history.maxlen:
+                self.truncated_at = self.history[0][0]
+            self.history.append((now, window, region))
+            self.last_activity = now
+
+    def get_changes(self, since: float) -> ScreenChanges:
+        '''Changed region per window since the monotonic time `since`.'''
+        regions: dict[int, Region] = {}
+        with self.lock:
+            complete = self.available and since >= self.truncated_at
+            for time, window, region in reversed(self.history):
+                if time <= since:
+                    break
+                current = regions.get(window)
+                if current is not None:
+                    region = (min(current[0], region[0]), min(current[1], region[1]),
+                              max(current[2], region[2]), max(current[3], region[3]))
+                regions[window] = region
+        return ScreenChanges(since=since, regions=regions, complete=complete)
+
+    def changed_windows(self, since: float) -> list[int]:
+        return self.get_changes(since).windows
+
+    def changed_regions(self, since: float) -> list[Region]:
+        return list(self.get_changes(since).regions.values())
+
+    def idle_since(self) -> float:
+        '''Monotonic time of the latest change (or of the start of tracking).'''
+        with self.lock:
+            return max(self.last_activity, self.started)
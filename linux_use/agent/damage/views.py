@@ -0,0 +1,27 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+Region = tuple[int, int, int, int]
+
+@dataclass
+class ScreenChanges:
+    '''Screen changes since `since` (a monotonic timestamp), as one region (x1, y1, x2, y2 in screen coordinates) per window.'''
+    since: float
+    regions: dict[int, Region] = field(default_factory=dict)
+    # False when damage older than `since` was dropped, so anything may have changed
+    complete: bool = True
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.regions) or not self.complete
+
+    @property
+    def windows(self) -> list[int]:
+        return list(self.regions)
+
+    @property
+    def bounding_box(self) -> Optional[Region]:
+        if not self.regions:
+            return None
+        lefts, tops, rights, bottoms = zip(*self.regions.values())
+        return min(lefts), min(tops), max(rights), max(bottoms)
@@ -1,5 +1,14 @@
 from typing import Set
 
+# Worker threads used by Desktop.get_state (window list, accessibility tree, screen capture)
+STATE_WORKERS = 3
+
+# Sent in place of a screenshot when the screen has not changed since the previous step
+UNCHANGED_SCREENSHOT_NOTE = 'Screenshot: the screen is unchanged since the previous step, so no new screenshot is attached.'
+
+# Minimum rapidfuzz WRatio score for an app name to match a window (title, WM_CLASS or process name)
+APP_MATCH_SCORE_CUTOFF = 70
+
 # Browser process names for Linux (without .exe extension)
 BROWSER_NAMES = set([
     'firefox',
@@ -68,4 +77,16 @@ CINNAMON_SYSTEM_WINDOWS = set([
     'cinnamon-settings-daemon',
     'nemo-desktop',
     'Cinnamon'
-])
\ No newline at end of file
+])
+
+# Seconds App Tool waits for a launched app's window (and accessibility tree) to be ready
+LAUNCH_TIMEOUT = 10.0
+
+# Upper bound (s) between readiness checks while waiting on X events
+LAUNCH_POLL_INTERVAL = 0.1
+
+# Interval (s) between AT-SPI registry checks once the window is up
+ACCESSIBILITY_POLL_INTERVAL = 0.05
+
+# Wrappers skipped when reading the program name from a desktop entry's Exec line
+EXEC_WRAPPERS = set(['env'])
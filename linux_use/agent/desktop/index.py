@@ -0,0 +1,68 @@
+from linux_use.agent.desktop.config import APP_MATCH_SCORE_CUTOFF
+from linux_use.agent.desktop.views import App, AppMatch
+from rapidfuzz import process, fuzz, utils
+from psutil import Process, Error
+from typing import Optional
+
+class AppIndex:
+    '''
+    Name index over the open windows, rebuilt whenever the window list is enumerated.
+
+    Every window contributes several keys: its title, the instance and class halves of its
+    `WM_CLASS` and the name of its process. Keys are normalised once when the index is built,
+    so a lookup only processes the query and hands the precomputed choices to rapidfuzz.
+    A window scores the best of its keys, which lets 'firefox' match a window titled
+    'Mozilla Firefox — Page Title' through its class even when the title has drifted.
+    '''
+    def __init__(self):
+        self.apps: list[App] = []
+        self.keys: list[str] = []
+        self.owners: list[int] = []
+        self.process_names: dict[int, str] = {}
+
+    def update(self, apps: list[App]):
+        keys, owners = [], []
+        live_pids = set()
+        for position, app in enumerate(apps):
+            names = [app.name, *app.wm_class.split('.')]
+            if app.pid:
+                live_pids.add(app.pid)
+                names.append(self.get_process_name(app.pid))
+            for name in dict.fromkeys(filter(None, names)):
+                key = utils.default_process(name)
+                if key:
+                    keys.append(key)
+                    owners.append(position)
+        # Drop cached process names of windows that have gone away (pids get reused)
+        self.process_names = {pid: name for pid, name in self.process_names.items() if pid in live_pids}
+        self.apps, self.keys, self.owners = list(apps), keys, owners
+
+    def get_process_name(self, pid: int) -> str:
+        name = self.process_names.get(pid)
+        if name is None:
+            try:
+                name = Process(pid).name()
+            except Error:
+                name = ''
+            self.process_names[pid] = name
+        return name
+
+    def search(self, query: str, limit: int = 5, score_cutoff: float = APP_MATCH_SCORE_CUTOFF) -> list[AppMatch]:
+        '''Windows matching `query`, best first, with the key that matched.'''
+        query = utils.default_process(query)
+        if not query or not self.keys:
+            return []
+        best: dict[int, tuple[float, str]] = {}
+        for key, score, index in process.extract(query, self.keys, scorer=fuzz.WRatio, processor=None,
+                                                 limit=None, score_cutoff=score_cutoff):
+            owner = self.owners[index]
+            if owner not in best or score > best[owner][0]:
+                best[owner] = (score, key)
+        # Ties keep the window order (topmost first)
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+        return [AppMatch(app=self.apps[owner], score=score, key=key) for owner, (score, key) in ranked]
+
+    def find(self, query: str, score_cutoff: float = APP_MATCH_SCORE_CUTOFF) -> Optional[App]:
+        '''Best matching window, if any.'''
+        matches = self.search(query, limit=1, score_cutoff=score_cutoff)
+        return matches[0].app if matches else None
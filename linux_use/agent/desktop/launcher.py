@@ -0,0 +1,202 @@
+from linux_use.agent.desktop.config import LAUNCH_TIMEOUT, LAUNCH_POLL_INTERVAL, ACCESSIBILITY_POLL_INTERVAL, EXEC_WRAPPERS
+from linux_use.agent.desktop.views import LaunchResult
+from linux_use.agent.display.service import atspi_lock
+from configparser import ConfigParser
+from time import monotonic, sleep
+from typing import Optional
+from select import select
+from pathlib import Path
+import subprocess
+import psutil
+import shlex
+import os
+
+# Try to import X11 libraries
+try:
+    from Xlib import display, X, Xatom
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+# Try to import AT-SPI2 libraries
+try:
+    import pyatspi
+    ATSPI_AVAILABLE = True
+except ImportError:
+    ATSPI_AVAILABLE = False
+
+def find_desktop_entry(name: str) -> Optional[Path]:
+    """Locate `<name>.desktop` in the XDG application directories."""
+    data_home = os.environ.get('XDG_DATA_HOME') or str(Path.home() / '.local' / 'share')
+    data_dirs = os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share'
+    file_name = name if name.endswith('.desktop') else f'{name}.desktop'
+    for directory in [data_home, *data_dirs.split(':'), '/var/lib/flatpak/exports/share']:
+        path = Path(directory) / 'applications' / file_name
+        if path.is_file():
+            return path
+    return None
+
+def get_app_identifiers(name: str) -> set[str]:
+    """Lower-cased names a window of the app may carry: the launch name, the entry's StartupWMClass and its program name."""
+    identifiers = {name.lower().removesuffix('.desktop')}
+    path = find_desktop_entry(name)
+    if path is None:
+        return identifiers
+    parser = ConfigParser(interpolation=None, strict=False)
+    try:
+        parser.read(path, encoding='utf-8')
+        entry = parser['Desktop Entry']
+    except Exception:
+        return identifiers
+    if entry.get('StartupWMClass'):
+        identifiers.add(entry['StartupWMClass'].lower())
+    try:
+        tokens = [token for token in shlex.split(entry.get('Exec', '')) if '=' not in token and token not in EXEC_WRAPPERS]
+    except ValueError:
+        tokens = []
+    if tokens:
+        identifiers.add(Path(tokens[0]).name.lower())
+    return identifiers
+
+class AppLauncher:
+    '''
+    Launches applications and waits for concrete readiness signals instead of fixed sleeps.
+
+    The launcher records the managed windows (`_NET_CLIENT_LIST`) before launching, then blocks on
+    root-window property events until a new viewable window shows up whose `_NET_WM_PID` belongs to
+    the launched process tree or whose `WM_CLASS`/process name matches the app. Optionally it then
+    waits for the app to register with AT-SPI and drop its busy state.
+
+    Args:
+        display_name (str, optional): X display to watch. Defaults to None ($DISPLAY).
+        timeout (float, optional): Seconds to wait for readiness. Defaults to LAUNCH_TIMEOUT.
+        wait_for_accessibility (bool, optional): Also wait for the AT-SPI application. Defaults to True.
+    '''
+    def __init__(self, display_name: Optional[str] = None, timeout: float = LAUNCH_TIMEOUT, wait_for_accessibility: bool = True):
+        self.display_name = display_name
+        self.timeout = timeout
+        self.wait_for_accessibility = wait_for_accessibility
+
+    def launch(self, name: str, timeout: Optional[float] = None, env: Optional[dict[str, str]] = None) -> LaunchResult:
+        start = monotonic()
+        deadline = start + (self.timeout if timeout is None else timeout)
+        connection = self.open_connection()
+        try:
+            known_windows = set(self.get_client_windows(connection)) if connection else set()
+            process = self.start_process(name, env)
+            if process is None:
+                return LaunchResult(name=name, started=False, error=f'No application or command named {name}.')
+            if connection is None:
+                return LaunchResult(name=name, started=True, pid=process.pid, elapsed=monotonic() - start)
+            identifiers = get_app_identifiers(name)
+            window = self.wait_for_window(connection, known_windows, process.pid, identifiers, deadline)
+        finally:
+            if connection is not None:
+                connection.close()
+        if window is None:
+            return LaunchResult(name=name, started=True, pid=process.pid, elapsed=monotonic() - start)
+        handle, pid, wm_class = window
+        accessible = self.wait_for_accessible(pid, deadline) if self.wait_for_accessibility and pid else False
+        return LaunchResult(name=name, started=True, ready=True, handle=handle, pid=pid, wm_class=wm_class,
+                            accessible=accessible, elapsed=monotonic() - start)
+
+    def open_connection(self):
+        if not XLIB_AVAILABLE:
+            return None
+        try:
+            connection = display.Display(self.display_name)
+            root = connection.screen().root
+            root.change_attributes(event_mask=X.PropertyChangeMask | X.SubstructureNotifyMask)
+            connection.sync()
+            return connection
+        except Exception:
+            return None
+
+    def start_process(self, name: str, env: Optional[dict[str, str]] = None) -> Optional[subprocess.Popen]:
+        """Start the app through its desktop entry (gtk-launch), falling back to running it as a command."""
+        try:
+            process = subprocess.Popen(['gtk-launch', name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+            if process.wait(timeout=5) == 0:
+                return process
+        except subprocess.TimeoutExpired:
+            # Still launching (e.g. slow D-Bus activation): keep waiting on this launch
+            return process
+        except FileNotFoundError:
+            pass
+        try:
+            return subprocess.Popen([name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True, env=env)
+        except (FileNotFoundError, PermissionError):
+            return None
+
+    def get_client_windows(self, connection) -> list[int]:
+        root = connection.screen().root
+        client_list = root.get_full_property(connection.intern_atom('_NET_CLIENT_LIST'), Xatom.WINDOW)
+        return list(client_list.value) if client_list is not None else []
+
+    def wait_for_window(self, connection, known_windows: set[int], pid: int, identifiers: set[str], deadline: float) -> Optional[tuple[int, Optional[int], Optional[str]]]:
+        while True:
+            for handle in self.get_client_windows(connection):
+                if handle in known_windows:
+                    continue
+                window = self.match_window(connection, handle, pid, identifiers)
+                if window is not None:
+                    return window
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return None
+            # Wake on the next X event (client list or map changes) or after the poll interval
+            if not connection.pending_events():
+                select([connection.fileno()], [], [], min(remaining, LAUNCH_POLL_INTERVAL))
+            while connection.pending_events():
+                connection.next_event()
+
+    def match_window(self, connection, handle: int, pid: int, identifiers: set[str]) -> Optional[tuple[int, Optional[int], Optional[str]]]:
+        try:
+            window = connection.create_resource_object('window', handle)
+            if window.get_attributes().map_state != X.IsViewable:
+                return None
+            wm_pid = window.get_full_property(connection.intern_atom('_NET_WM_PID'), Xatom.CARDINAL)
+            window_pid = int(wm_pid.value[0]) if wm_pid is not None else None
+            wm_class = window.get_wm_class()
+        except Exception:
+            return None
+        class_name = '.'.join(wm_class) if wm_class else None
+        if window_pid is not None and self.is_descendant(window_pid, pid):
+            return handle, window_pid, class_name
+        names = {part.lower() for part in wm_class or ()}
+        if window_pid is not None:
+            try:
+                names.add(psutil.Process(window_pid).name().lower())
+            except psutil.Error:
+                pass
+        if names & identifiers:
+            return handle, window_pid, class_name
+        return None
+
+    def is_descendant(self, pid: int, ancestor: int) -> bool:
+        if pid == ancestor:
+            return True
+        try:
+            return any(parent.pid == ancestor for parent in psutil.Process(pid).parents())
+        except psutil.Error:
+            return False
+
+    def wait_for_accessible(self, pid: int, deadline: float) -> bool:
+        """Wait until an AT-SPI application with `pid` is registered and none of its windows is busy."""
+        if not ATSPI_AVAILABLE:
+            return False
+        while True:
+            try:
+                with atspi_lock:
+                    desktop = pyatspi.Registry.getDesktop(0)
+                    for index in range(desktop.childCount):
+                        app = desktop.getChildAtIndex(index)
+                        if app is None or app.get_process_id() != pid or app.childCount == 0:
+                            continue
+                        if not any(app.getChildAtIndex(i).getState().contains(pyatspi.STATE_BUSY) for i in range(app.childCount)):
+                            return True
+            except Exception:
+                pass
+            if monotonic() >= deadline:
+                return False
+            sleep(ACCESSIBILITY_POLL_INTERVAL)
@@ -1,20 +1,31 @@
-from linux_use.agent.desktop.config import EXCLUDED_APPS, AVOIDED_APPS, BROWSER_NAMES
+from linux_use.agent.desktop.config import EXCLUDED_APPS, AVOIDED_APPS, BROWSER_NAMES, STATE_WORKERS, LAUNCH_TIMEOUT, UNCHANGED_SCREENSHOT_NOTE
+from linux_use.agent.desktop.launcher import AppLauncher
+from linux_use.agent.desktop.index import AppIndex
 from linux_use.agent.desktop.views import DesktopState, App, Size, Status
+from linux_use.agent.input.service import InputController, TextEntry, create_input_controller
+from linux_use.agent.input.views import InputBackend, InputDelays, TextEntryMethod
+from linux_use.agent.screenshot.views import EncoderConfig, EncodedScreenshot, FrameChange, FrameChangeType
+from linux_use.agent.screenshot.service import ScreenshotEncoder, FrameComparator
+from linux_use.agent.system.service import get_system_facts_provider
+from linux_use.agent.display.service import get_accessibility_bus, bind_accessibility_bus, atspi_lock
+from linux_use.agent.display.views import DisplayTarget
+from linux_use.agent.shell.service import ShellSessionManager
+from linux_use.agent.settle.service import SettleDetector
+from linux_use.agent.damage.service import DamageTracker
+from linux_use.agent.settle.views import SettleConfig, SettleResult
+from linux_use.agent.screenshot.config import CROP_MARGIN
+from linux_use.agent.tree.annotation import AnnotationRenderer
+from linux_use.agent.tree.views import TreeElementNode, TreeState
 from linux_use.agent.tree.service import Tree
 from PIL.Image import Image as PILImage
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, Callable
 from contextlib import contextmanager
-from fuzzywuzzy import process
-from typing import Optional
+from time import perf_counter, monotonic
 from psutil import Process
-from time import sleep
-from io import BytesIO
-from PIL import Image
+from PIL import Image, ImageGrab
 import subprocess
-import pyautogui
-import base64
-import distro
-import screeninfo
-import os
+import asyncio
 
 # Try to import X11 libraries
 try:
@@ -26,12 +37,32 @@ except ImportError:
     print("Warning: python-xlib not available. Some features may be limited.")
 
 class Desktop:
-    def __init__(self):
+    '''
+    The desktop of one X display: observation (windows, accessibility tree, screenshots) and
+    the actions the tools perform on it.
+
+    Every X connection, capture and helper process (wmctrl, xdotool, clipboard, launched apps,
+    the shell) is bound to `display_name`, so several Desktops can drive their own displays
+    (e.g. one Xvfb server each) concurrently. The accessibility tree is the exception: pyatspi
+    serves one AT-SPI bus per process, so only Desktops sharing the bus of the first one read it.
+    '''
+    def __init__(self, encoder_config: Optional[EncoderConfig] = None, compare_frames: bool = True, launch_timeout: float = LAUNCH_TIMEOUT,
+                 input_backend: InputBackend | str = InputBackend.XTEST, input_delays: Optional[InputDelays] = None,
+                 accessible_clicks: bool = True, settle_config: Optional[SettleConfig] = None,
+                 display_name: Optional[str] = None, atspi_bus: Optional[str] = None, keep_images: Optional[int] = None):
         self.encoding = 'utf-8'
         self.desktop_state = None
+        self.encoder = ScreenshotEncoder(encoder_config)
+        # Unchanged notes and crops refer to the last full frame: the caller keeps its image in the conversation,
+        # or only keeps the `keep_images` newest ones and the comparator sends a full frame once it is gone
+        self.frame_comparator = FrameComparator(window=keep_images) if compare_frames else None
+        self.annotator = AnnotationRenderer()
+        self.executor = ThreadPoolExecutor(max_workers=STATE_WORKERS, thread_name_prefix='desktop-state')
+        self.app_index = AppIndex()
+        self.accessible_clicks = accessible_clicks
         if XLIB_AVAILABLE:
             try:
-                self.display = display.Display()
+                self.display = display.Display(display_name)
                 self.screen = self.display.screen()
                 self.root = self.screen.root
             except Exception as e:
@@ -43,137 +74,282 @@ class Desktop:
             self.display = None
             self.screen = None
             self.root = None
+        if atspi_bus is None and display_name is not None:
+            atspi_bus = get_accessibility_bus(self.display)
+        self.target = DisplayTarget(name=display_name, atspi_bus=atspi_bus)
+        # Must happen before anything in this process talks to the AT-SPI registry
+        self.accessibility = bind_accessibility_bus(atspi_bus)
+        if not self.accessibility:
+            print(f"Warning: AT-SPI bus of display {display_name} differs from the one this process uses; "
+                  "the accessibility tree is unavailable (run one process per display to use it).")
+        env = self.target.environment()
+        self.launcher = AppLauncher(display_name=display_name, timeout=launch_timeout, wait_for_accessibility=self.accessibility)
+        self.shell = ShellSessionManager(env=env)
+        # Screen damage per window, shared by the settle wait and the frame capture
+        self.damage = DamageTracker(display_name)
+        self.damage.start()
+        self.last_capture: Optional[float] = None
+        # Windows whose applications the last tree read covered; the next read starts from them
+        self.visible_apps: Optional[list[App]] = None
+        self.settle = SettleDetector(settle_config, display_name=display_name, accessibility=self.accessibility, damage_tracker=self.damage)
+        # Host and screen facts are probed once per process and display in the background
+        self.facts = get_system_facts_provider(display_name)
+        self.facts.prefetch()
+        self.set_input_backend(input_backend, input_delays or InputDelays())
+        self.text_entry = TextEntry(env=env, accessibility=self.accessibility)
+
+    def set_input_backend(self, backend: InputBackend | str, delays: Optional[InputDelays] = None):
+        """Switch the backend used for pointer and keyboard input, keeping the current delays by default."""
+        self.input: InputController = create_input_controller(backend, self.display, delays or self.input.delays)
+        if self.input.backend == InputBackend.PYAUTOGUI and not self.target.is_ambient:
+            print(f"Warning: pyautogui input goes to the ambient display, not {self.target.name}.")
+
+    def close(self):
+        """Release the worker threads, the shells (and every process they started) and the X connections."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.encoder.close()
+        self.damage.close()
+        self.shell.close()
+        if self.display is not None:
+            self.display.close()
+            self.display = None
+
+    def activate_element(self, loc: tuple[int, int]) -> Optional[TreeElementNode]:
+        """Activate the interactive element centred at `loc` through its AT-SPI action, if it has one."""
+        if not self.accessible_clicks or not self.accessibility or self.desktop_state is None:
+            return None
+        x, y = loc
+        node = next((node for node in self.desktop_state.tree_state.interactive_nodes
+                     if node.center.x == x and node.center.y == y), None)
+        if node is None:
+            return None
+        with atspi_lock:
+            activated = Tree(self).activate_node(node)
+        if not activated:
+            return None
+        return node
+
+    def is_element_in_place(self, label: int) -> Optional[bool]:
+        """
+        Whether interactive element `label` of the last observation is still showing at its coordinates;
+        None when that cannot be checked (no AT-SPI, a Desktop off the bound bus, or no observation yet).
+        """
+        if not self.accessibility or self.desktop_state is None:
+            return None
+        nodes = self.desktop_state.tree_state.interactive_nodes
+        if not 0 <= label < len(nodes):
+            return False
+        with atspi_lock:
+            return Tree(self).is_node_in_place(nodes[label])
+
+    def enter_text(self, text: str, loc: Optional[tuple[int, int]] = None, clear: bool = False) -> TextEntryMethod:
+        """Enter text into the focused field (accessibility, then clipboard paste, then key events)."""
+        return self.text_entry.enter(self.input, text, loc=loc, clear=clear)
         
     def get_state(self, use_vision: bool = False) -> DesktopState:
+        """
+        Capture the desktop state. The window list (X server), the accessibility tree (D-Bus) and,
+        in vision mode, the screen capture run concurrently: the tree is read for the windows that
+        were visible at the last observation and only read again if the fresh window list differs
+        (see `get_tree_state`). Annotation starts as soon as both the capture and the tree are
+        ready and encoding runs on the encoder's worker thread.
+        """
+        start = perf_counter()
+        timings: dict[str, float] = {}
+        # Observe once the last action has finished repainting instead of after a fixed delay
+        settle = self.settle.wait()
+        timings['settle'] = settle.elapsed
         tree = Tree(self)
-        active_app, apps = self.get_apps()
-        tree_state = tree.get_state()
+        apps_future = self.executor.submit(self.timed(timings, 'apps', self.get_apps))
+        tree_future = self.executor.submit(self.timed(timings, 'tree', self.get_tree_state), tree, apps_future)
+        frame_change = screenshot_note = screenshot_info = None
         if use_vision:
-            annotated_screenshot = tree.annotated_screenshot(tree_state.interactive_nodes, scale=0.5)
-            screenshot = self.screenshot_in_bytes(annotated_screenshot)
-        else:
-            screenshot = None
+            scale = 0.5
+            capture_future = self.executor.submit(self.timed(timings, 'capture', self.capture_frame), scale)
+            screenshot, frame_change = capture_future.result()
+            if frame_change is not None and frame_change.type == FrameChangeType.UNCHANGED:
+                screenshot_note = UNCHANGED_SCREENSHOT_NOTE
+            else:
+                annotated_screenshot, screenshot_note = self.annotate_frame(tree, tree_future.result(), screenshot, frame_change, scale, timings)
+                screenshot_info = self.encoder.submit(annotated_screenshot).result()
+                timings['encode'] = screenshot_info.encode_time
+        tree_state = tree_future.result()
+        return self.build_state(apps_future.result(), tree_state, screenshot_info, screenshot_note, frame_change, settle, timings, start)
+
+    async def aget_state(self, use_vision: bool = False) -> DesktopState:
+        """
+        `get_state` for the asyncio loop. The settle wait sleeps on the loop and every stage
+        (including annotation) runs on the worker threads while the loop awaits it, so other
+        tasks keep running during the observation.
+        """
+        start = perf_counter()
+        timings: dict[str, float] = {}
+        settle = await self.settle.await_settled()
+        timings['settle'] = settle.elapsed
+        tree = Tree(self)
+        apps_future = self.executor.submit(self.timed(timings, 'apps', self.get_apps))
+        tree_future = self.executor.submit(self.timed(timings, 'tree', self.get_tree_state), tree, apps_future)
+        frame_change = screenshot_note = screenshot_info = None
+        if use_vision:
+            scale = 0.5
+            capture_future = self.executor.submit(self.timed(timings, 'capture', self.capture_frame), scale)
+            screenshot, frame_change = await asyncio.wrap_future(capture_future)
+            if frame_change is not None and frame_change.type == FrameChangeType.UNCHANGED:
+                screenshot_note = UNCHANGED_SCREENSHOT_NOTE
+            else:
+                tree_state = await asyncio.wrap_future(tree_future)
+                annotate_future = self.executor.submit(self.annotate_frame, tree, tree_state, screenshot, frame_change, scale, timings)
+                annotated_screenshot, screenshot_note = await asyncio.wrap_future(annotate_future)
+                screenshot_info = await asyncio.wrap_future(self.encoder.submit(annotated_screenshot))
+                timings['encode'] = screenshot_info.encode_time
+        tree_state = await asyncio.wrap_future(tree_future)
+        apps = await asyncio.wrap_future(apps_future)
+        return self.build_state(apps, tree_state, screenshot_info, screenshot_note, frame_change, settle, timings, start)
+
+    def annotate_frame(self, tree: Tree, tree_state: TreeState, screenshot: PILImage, frame_change: Optional[FrameChange],
+                       scale: float, timings: dict[str, float]) -> tuple[PILImage, Optional[str]]:
+        """Annotate a captured frame, cropped to the changed region when only part of the screen changed."""
+        annotated_screenshot = self.timed(timings, 'annotate', tree.annotated_screenshot)(tree_state.interactive_nodes, scale=scale, screenshot=screenshot)
+        if frame_change is not None and frame_change.type == FrameChangeType.PARTIAL:
+            return self.crop_to_change(annotated_screenshot, frame_change, scale)
+        return annotated_screenshot, None
+
+    def build_state(self, apps: tuple[Optional[App], Optional[list[App]]], tree_state: TreeState, screenshot_info: Optional[EncodedScreenshot],
+                    screenshot_note: Optional[str], frame_change: Optional[FrameChange], settle: SettleResult,
+                    timings: dict[str, float], start: float) -> DesktopState:
+        active_app, apps = apps
+        apps = apps if apps is not None else []
+        timings['total'] = perf_counter() - start
         self.desktop_state = DesktopState(
             apps=apps,
             active_app=active_app,
-            screenshot=screenshot,
-            tree_state=tree_state
+            screenshot=screenshot_info.data_uri if screenshot_info else None,
+            tree_state=tree_state,
+            screenshot_info=screenshot_info,
+            screenshot_note=screenshot_note,
+            frame_change=frame_change,
+            cursor_location=self.get_cursor_location(),
+            timings=timings,
+            settled=not settle.timed_out
         )
         return self.desktop_state
-    
+
+    def get_tree_state(self, tree: Tree, apps_future: Future) -> TreeState:
+        """
+        Accessibility tree of the applications with a visible window on the current workspace.
+
+        The windows visible at the last observation rarely change between steps, so their tree is
+        read while the window list is still being enumerated; it is kept when the fresh list shows
+        the same windows and read again for the fresh list otherwise.
+        """
+        previous = self.visible_apps
+        tree_state = tree.get_state(previous) if previous is not None else None
+        active_app, apps = apps_future.result()
+        # Without a window list every application is read
+        visible = self.get_visible_apps(active_app, apps) if apps is not None else None
+        self.visible_apps = visible
+        if visible is None:
+            return tree.get_state(None)
+        if tree_state is not None:
+            linked = {app.handle: app for app in previous}
+            if linked.keys() == {app.handle for app in visible}:
+                for app in visible:
+                    app.accessible = linked[app.handle].accessible
+                return tree_state
+        return tree.get_state(visible)
+
+    def get_visible_apps(self, active_app: Optional[App], apps: list[App]) -> list[App]:
+        workspace = self.get_current_workspace()
+        windows = ([active_app] if active_app is not None else []) + apps
+        return [app for app in windows if app.status not in (Status.MINIMIZED, Status.HIDDEN)
+                and (workspace is None or app.workspace == workspace)]
+
+    def get_current_workspace(self) -> Optional[int]:
+        """Index of the current workspace (_NET_CURRENT_DESKTOP), if the window manager publishes it."""
+        if self.root is None:
+            return None
+        try:
+            value = self.root.get_full_property(self.display.intern_atom('_NET_CURRENT_DESKTOP'), X.AnyPropertyType)
+        except Exception:
+            return None
+        return int(value.value[0]) if value is not None and len(value.value) else None
+
+    def timed(self, timings: dict[str, float], stage: str, function: Callable) -> Callable:
+        """Wrap `function` so its wall time is recorded in `timings` under `stage`."""
+        def wrapper(*args, **kwargs):
+            stage_start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings[stage] = perf_counter() - stage_start
+        return wrapper
+
+    def capture_frame(self, scale: float) -> tuple[Optional[PILImage], Optional[FrameChange]]:
+        """Capture a downscaled frame and classify it against the previous ones (no capture at all without screen damage since the last one)."""
+        if self.frame_comparator is not None and self.frame_comparator.holds_reference() and self.last_capture is not None:
+            if not self.damage.get_changes(self.last_capture).changed:
+                return None, self.frame_comparator.skip()
+        # Taken before the grab, so damage during the grab shows up next time
+        self.last_capture = monotonic()
+        screenshot = self.get_screenshot(scale=scale)
+        frame_change = self.frame_comparator.compare(screenshot) if self.frame_comparator is not None else None
+        return screenshot, frame_change
+
+    def crop_to_change(self, annotated_screenshot: PILImage, frame_change: FrameChange, scale: float) -> tuple[PILImage, str]:
+        """Crop an annotated frame to the changed region and describe where the crop sits on screen."""
+        left, top, right, bottom = frame_change.bounding_box
+        crop_box = (
+            max(0, left - CROP_MARGIN),
+            max(0, top - CROP_MARGIN),
+            min(annotated_screenshot.width, right + CROP_MARGIN),
+            min(annotated_screenshot.height, bottom + CROP_MARGIN)
+        )
+        screen_box = tuple(int(value / scale) for value in (left, top, right, bottom))
+        note = (f'Screenshot: only the region {screen_box} (x1,y1,x2,y2 in screen coordinates) changed since the full screenshot of step '
+                f'{frame_change.reference_index}, so the attached image is a crop of that region; the rest of the screen is as it was then.')
+        return annotated_screenshot.crop(crop_box), note
+
     def get_active_app(self, apps: list[App]) -> App | None:
         if len(apps) > 0 and apps[0].status != Status.MINIMIZED:
             return apps[0]
         return None
     
     def get_cursor_location(self) -> tuple[int, int]:
-        position = pyautogui.position()
-        return (position.x, position.y)
+        return self.input.position()
     
-    def execute_command(self, command: str) -> tuple[str, int]:
-        """Execute bash command and return output with status code."""
+    def execute_command(self, command: str, timeout: Optional[float] = None) -> tuple[str, int]:
+        """Execute a bash command in the persistent shell session and return output with status code."""
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                executable='/bin/bash',
-                capture_output=True,
-                text=True,
-                timeout=25,
-                cwd=os.path.expanduser('~')
-            )
-            stdout = result.stdout
-            stderr = result.stderr
-            return (stdout or stderr, result.returncode)
-        except subprocess.TimeoutExpired:
-            return ('Command execution timed out', 1)
+            result = self.shell.execute(command, timeout=timeout)
         except Exception as e:
             return (f'Command execution failed: {e}', 1)
+        return (result.to_string(), result.status)
     
     def get_linux_distro(self) -> str:
         """Get Linux distribution name and version."""
-        try:
-            dist_name = distro.name()
-            dist_version = distro.version()
-            return f"{dist_name} {dist_version}"
-        except Exception:
-            return "Linux"
+        return self.facts.get().host.os
     
     def get_user_account_type(self) -> str:
         """Detect local vs LDAP/domain account."""
-        try:
-            username = os.environ.get('USER', '')
-            # Check if user exists in /etc/passwd
-            result = subprocess.run(
-                ['getent', 'passwd', username],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                # Check if it's from LDAP or local
-                result_ldap = subprocess.run(
-                    ['getent', '-s', 'ldap', 'passwd', username],
-                    capture_output=True,
-                    text=True
-                )
-                if result_ldap.returncode == 0:
-                    return "LDAP/Domain Account"
-                return "Local Account"
-            return "Unknown Account Type"
-        except Exception:
-            return "Local Account"
+        return self.facts.get().host.account_type
     
     def get_dpi_scaling(self) -> float:
         """Get DPI scaling factor for HiDPI displays."""
-        try:
-            # Try using xrandr
-            result = subprocess.run(
-                ['xrandr', '--current'],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                # Parse DPI from output
-                for line in result.stdout.split('\n'):
-                    if 'connected' in line and 'primary' in line:
-                        # Default to 1.0 if cannot parse
-                        return 1.0
-            
-            # Fallback: Try to get from Xlib if available
-            if XLIB_AVAILABLE and self.screen:
-                dpi = (self.screen.width_in_pixels / (self.screen.width_in_mms / 25.4))
-                return dpi / 96.0
-            
-            return 1.0
-        except Exception:
-            return 1.0
+        return self.facts.get().dpi_scaling
     
     def get_screen_resolution(self) -> Size:
         """Get primary screen resolution."""
-        try:
-            monitors = screeninfo.get_monitors()
-            if monitors:
-                primary = monitors[0]
-                return Size(width=primary.width, height=primary.height)
-        except Exception:
-            pass
-        
-        # Fallback to pyautogui
-        try:
-            size = pyautogui.size()
-            return Size(width=size.width, height=size.height)
-        except Exception:
-            return Size(width=1920, height=1080)
+        return self.facts.get().resolution
     
-    def get_apps(self) -> tuple[App | None, list[App]]:
-        """Enumerate windows using wmctrl."""
+    def get_apps(self) -> tuple[App | None, Optional[list[App]]]:
+        """Enumerate windows using wmctrl (the windows are None when wmctrl cannot list them)."""
         try:
-            sleep(0.5)
             # Use wmctrl to list windows
             result = subprocess.run(
                 ['wmctrl', '-lGpx'],
                 capture_output=True,
-                text=True
+                text=True,
+                env=self.target.environment()
             )
             
             apps = []
@@ -220,15 +396,22 @@ class Desktop:
                         depth=depth,
                         status=status,
                         size=size,
-                        handle=int(win_id, 16)  # Convert hex to int
+                        handle=int(win_id, 16),  # Convert hex to int
+                        wm_class=win_class,
+                        pid=int(pid),
+                        workspace=int(desktop_num)
                     ))
+            else:
+                print(f"Error getting windows: {result.stderr.strip()}")
+                return (None, None)
             
+            self.app_index.update(apps)
             active_app = self.get_active_app(apps)
             apps = apps[1:] if len(apps) > 1 else []
             return (active_app, apps)
         except Exception as ex:
             print(f"Error getting windows: {ex}")
-            return (None, [])
+            return (None, None)
     
     def is_app_browser(self, node) -> bool:
         """Check if a window/app is a browser."""
@@ -242,15 +425,7 @@ class Desktop:
     
     def get_default_language(self) -> str:
         """Get system default language."""
-        try:
-            lang = os.environ.get('LANG', 'en_US.UTF-8')
-            # Parse language
-            if lang:
-                lang_code = lang.split('.')[0]
-                return lang_code.replace('_', ' ')
-            return "English (US)"
-        except Exception:
-            return "English (US)"
+        return self.facts.get().host.language
     
     def resize_app(self, size: tuple[int, int] = None, loc: tuple[int, int] = None) -> tuple[str, int]:
         """Resize active application window."""
@@ -277,7 +452,8 @@ class Desktop:
                 # Use wmctrl to resize
                 result = subprocess.run(
                     ['wmctrl', '-i', '-r', win_id, '-e', f'0,{x},{y},{width},{height}'],
-                    capture_output=True
+                    capture_output=True,
+                    env=self.target.environment()
                 )
                 
                 if result.returncode == 0:
@@ -287,56 +463,34 @@ class Desktop:
                 return (f'Error resizing window: {e}', 1)
     
     def is_app_running(self, name: str) -> bool:
-        """Check if an app is currently running."""
-        apps = {app.name: app for app in [self.desktop_state.active_app] + self.desktop_state.apps if app is not None}
-        return process.extractOne(name, list(apps.keys()), score_cutoff=60) is not None
+        """Check if an app is currently running (matched on title, WM_CLASS or process name)."""
+        return self.app_index.find(name) is not None
     
-    def launch_app(self, name: str) -> tuple[str, int]:
-        """Launch an application."""
+    def launch_app(self, name: str, timeout: Optional[float] = None) -> tuple[str, int]:
+        """Launch an application and wait until its window (and accessibility tree) is ready."""
         try:
-            # Try with gtk-launch first
-            result = subprocess.run(
-                ['gtk-launch', name],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                sleep(1.5)
-                return f'{name.title()} launched.', 0
-            
-            # Fallback: try direct command
-            result = subprocess.run(
-                [name],
-                capture_output=True,
-                text=True,
-                start_new_session=True
-            )
-            
-            if result.returncode == 0 or result.returncode is None:
-                sleep(1.5)
-                return f'{name.title()} launched.', 0
-            
-            return f'Failed to launch {name.title()}.', 1
+            result = self.launcher.launch(name, timeout=timeout, env=self.target.environment())
         except Exception as e:
             return f'Error launching {name}: {e}', 1
+        if not result.started:
+            return f'Failed to launch {name.title()}.', 1
+        if not result.ready:
+            return f'Launching {name.title()} wait for it to come load.', 0
+        return f'{name.title()} launched.', 0
     
     def switch_app(self, name: str) -> tuple[str, int]:
         """Switch to a specific application window."""
-        apps = {app.name: app for app in [self.desktop_state.active_app] + self.desktop_state.apps if app is not None}
-        matched_app: Optional[tuple[str, float]] = process.extractOne(name, list(apps.keys()), score_cutoff=70)
-        
-        if matched_app is None:
+        app = self.app_index.find(name)
+        if app is None:
             return (f'Application {name.title()} not found.', 1)
         
-        app_name, _ = matched_app
-        app = apps.get(app_name)
-        
+        app_name = app.name
         try:
             win_id = hex(app.handle)
             result = subprocess.run(
                 ['wmctrl', '-i', '-a', win_id],
-                capture_output=True
+                capture_output=True,
+                env=self.target.environment()
             )
             
             if result.returncode == 0:
@@ -345,17 +499,13 @@ class Desktop:
         except Exception as e:
             return (f'Error switching to {app_name}: {e}', 1)
     
-    def screenshot_in_bytes(self, screenshot: PILImage) -> bytes:
-        """Convert PIL Image to base64 data URI."""
-        buffer = BytesIO()
-        screenshot.save(buffer, format='PNG')
-        img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        data_uri = f"data:image/png;base64,{img_base64}"
-        return data_uri
+    def screenshot_in_bytes(self, screenshot: PILImage) -> str:
+        """Convert PIL Image to base64 data URI using the configured encoder."""
+        return self.encoder.encode(screenshot).data_uri
     
     def get_screenshot(self, scale: float = 0.7) -> Image.Image:
         """Capture screenshot of the desktop."""
-        screenshot = pyautogui.screenshot()
+        screenshot = ImageGrab.grab(xdisplay=self.target.name)
         size = (int(screenshot.width * scale), int(screenshot.height * scale))
         screenshot.thumbnail(size=size, resample=Image.Resampling.LANCZOS)
         return screenshot
@@ -365,16 +515,18 @@ class Desktop:
         """Auto-minimize the current window (IDE) while agent works."""
         try:
             # Get current active window
+            env = self.target.environment()
             result = subprocess.run(
                 ['xdotool', 'getactivewindow'],
                 capture_output=True,
-                text=True
+                text=True,
+                env=env
             )
             
             if result.returncode == 0:
                 win_id = result.stdout.strip()
                 # Minimize it
-                subprocess.run(['xdotool', 'windowminimize', win_id])
+                subprocess.run(['xdotool', 'windowminimize', win_id], env=env)
                 yield
             else:
                 yield
@@ -384,6 +536,6 @@ class Desktop:
             # Restore window
             try:
                 if win_id:
-                    subprocess.run(['xdotool', 'windowactivate', win_id])
+                    subprocess.run(['xdotool', 'windowactivate', win_id], env=env)
             except Exception:
                 pass
\ No newline at end of file
@@ -1,6 +1,7 @@
+from linux_use.agent.screenshot.views import EncodedScreenshot, FrameChange
 from linux_use.agent.tree.views import TreeState
-from typing import Optional
-from dataclasses import dataclass
+from typing import Optional, Any
+from dataclasses import dataclass, field
 from tabulate import tabulate
 from enum import Enum
 
@@ -25,10 +26,22 @@ class App:
     status: Status
     size: 'Size'
     handle: int
+    wm_class: str = ''
+    pid: int = 0
+    # Workspace (_NET_WM_DESKTOP) the window is on
+    workspace: int = 0
+    # Root of the window's AT-SPI application, linked when the tree is read
+    accessible: Any = field(default=None, repr=False, compare=False)
     
     def to_row(self):
         return [self.name, self.depth, self.status.value, self.size.width, self.size.height, self.handle]
 
+@dataclass
+class AppMatch:
+    app: App
+    score: float
+    key: str
+
 @dataclass
 class Size:
     width: int
@@ -41,8 +54,20 @@ class Size:
 class DesktopState:
     apps: list[App]
     active_app: Optional[App]
-    screenshot: bytes | None
+    screenshot: str | None
     tree_state: TreeState
+    screenshot_info: Optional[EncodedScreenshot] = None
+    screenshot_note: Optional[str] = None
+    frame_change: Optional[FrameChange] = None
+    # Pointer position on the Desktop's own display when the state was captured
+    cursor_location: Optional[tuple[int, int]] = None
+    timings: dict[str, float] = field(default_factory=dict)
+    # False when the screen was still changing after the settle wait (e.g. a page still loading)
+    settled: bool = True
+
+    def timings_to_string(self):
+        stages = ', '.join(f'{stage} {elapsed*1000:.0f} ms' for stage, elapsed in self.timings.items() if stage != 'total')
+        return f"{self.timings.get('total', 0.0)*1000:.0f} ms ({stages})"
 
     def active_app_to_string(self):
         if self.active_app is None:
@@ -55,4 +80,15 @@ class DesktopState:
             return 'No apps running in background'
         headers = ["Name", "Depth", "Status", "Width", "Height", "Handle"]
         rows = [app.to_row() for app in self.apps]
-        return tabulate(rows, headers=headers, tablefmt="github")
\ No newline at end of file
+        return tabulate(rows, headers=headers, tablefmt="github")
+@dataclass
+class LaunchResult:
+    name: str
+    started: bool
+    ready: bool = False
+    handle: Optional[int] = None
+    pid: Optional[int] = None
+    wm_class: Optional[str] = None
+    accessible: bool = False
+    elapsed: float = 0.0
+    error: Optional[str] = None
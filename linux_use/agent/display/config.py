@@ -0,0 +1,5 @@
+# Root-window property on which at-spi-bus-launcher publishes the accessibility bus address of its display
+ATSPI_BUS_PROPERTY = 'AT_SPI_BUS'
+
+# Environment variable libatspi reads the accessibility bus address from (before asking the session bus)
+ATSPI_BUS_ENVIRONMENT = 'AT_SPI_BUS_ADDRESS'
@@ -0,0 +1,48 @@
+from linux_use.agent.display.config import ATSPI_BUS_PROPERTY, ATSPI_BUS_ENVIRONMENT
+from threading import Lock, RLock
+from typing import Optional
+import os
+
+# Try to import X11 libraries
+try:
+    from Xlib import Xatom
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+def get_accessibility_bus(connection) -> Optional[str]:
+    '''Address of the AT-SPI bus serving the display behind `connection`, if its bus launcher published one.'''
+    if not XLIB_AVAILABLE or connection is None:
+        return None
+    try:
+        root = connection.screen().root
+        value = root.get_full_property(connection.intern_atom(ATSPI_BUS_PROPERTY), Xatom.STRING)
+    except Exception:
+        return None
+    if value is None or not value.value:
+        return None
+    address = value.value.decode() if isinstance(value.value, bytes) else str(value.value)
+    return address.strip('\x00') or None
+
+# libatspi is not thread-safe: every pyatspi call, and the dispatch of its events, holds this lock
+atspi_lock = RLock()
+
+UNBOUND = object()
+bound_bus = UNBOUND
+bound_bus_lock = Lock()
+
+def bind_accessibility_bus(address: Optional[str]) -> bool:
+    '''
+    Point this process's AT-SPI registry at `address` (None: the session default).
+
+    pyatspi holds a single registry connection per process, made on first use, so the first
+    Desktop decides the bus. Returns whether the process is bound to `address`; a Desktop on a
+    display with another bus has to run in its own process to read the accessibility tree.
+    '''
+    global bound_bus
+    with bound_bus_lock:
+        if bound_bus is UNBOUND:
+            if address is not None:
+                os.environ[ATSPI_BUS_ENVIRONMENT] = address
+            bound_bus = address
+        return bound_bus == address
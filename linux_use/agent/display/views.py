@@ -0,0 +1,28 @@
+from linux_use.agent.display.config import ATSPI_BUS_ENVIRONMENT
+from dataclasses import dataclass
+from typing import Optional
+import os
+
+@dataclass
+class DisplayTarget:
+    '''
+    The X display (and its AT-SPI bus) a Desktop drives.
+
+    `name=None` means the ambient `$DISPLAY`; `atspi_bus=None` means the bus the display
+    publishes, or the session default for the ambient display.
+    '''
+    name: Optional[str] = None
+    atspi_bus: Optional[str] = None
+
+    @property
+    def is_ambient(self) -> bool:
+        return self.name is None or self.name == os.environ.get('DISPLAY')
+
+    def environment(self) -> dict[str, str]:
+        '''Environment for subprocesses (wmctrl, xdotool, launched apps, the shell) that talk to this display.'''
+        env = dict(os.environ)
+        if self.name is not None:
+            env['DISPLAY'] = self.name
+        if self.atspi_bus is not None:
+            env[ATSPI_BUS_ENVIRONMENT] = self.atspi_bus
+        return env
@@ -0,0 +1,18 @@
+# Most recent steps (action plus its result) sent verbatim
+KEEP_STEPS = 6
+
+# Token ceiling on everything between the system prompt and the current observation
+MAX_HISTORY_TOKENS = 6000
+
+# Characters kept from a step's result in its summary line
+SUMMARY_RESULT_CHARS = 160
+
+# Token estimate of text (characters per token) and of an attached image
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 1500
+
+# Most recent screenshots kept in the conversation, counting the current observation's
+KEEP_IMAGES = 1
+
+# Text left in place of a dropped screenshot
+IMAGE_PLACEHOLDER = '[Screenshot removed: only the most recent screenshots are kept]'
@@ -0,0 +1,137 @@
+from linux_use.agent.history.config import CHARS_PER_TOKEN, IMAGE_TOKENS, IMAGE_PLACEHOLDER
+from linux_use.agent.history.views import HistoryConfig, PayloadReport
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from linux_use.agent.repair.service import ResponseParser
+from linux_use.agent.utils import message_text
+from textwrap import shorten
+from psutil import Process
+from typing import Optional
+import re
+
+RESULT_PATTERN = re.compile(r'Action Response:(.*?)</agent_state>', re.DOTALL)
+SUMMARY_TEMPLATE = '<history_summary>\nSummary of the earlier steps (action -> result):\n{lines}\n</history_summary>'
+# Tokens of the summary wrapper and of the line counting the dropped steps
+SUMMARY_OVERHEAD = (len(SUMMARY_TEMPLATE) + len('(9999 earlier steps omitted)\n')) // CHARS_PER_TOKEN + 1
+
+def get_image_urls(message: BaseMessage) -> list[str]:
+    if isinstance(message.content, str):
+        return []
+    return [block['image_url']['url'] for block in message.content if isinstance(block, dict) and block.get('type') == 'image_url']
+
+def estimate_tokens(message: BaseMessage) -> int:
+    '''Rough token count of a message: its text at CHARS_PER_TOKEN plus IMAGE_TOKENS per image.'''
+    tool_calls = len(str(message.tool_calls)) if isinstance(message, AIMessage) and message.tool_calls else 0
+    return (len(message_text(message)) + tool_calls) // CHARS_PER_TOKEN + len(get_image_urls(message)) * IMAGE_TOKENS
+
+class HistoryManager:
+    '''
+    Bounds the conversation sent to the LLM.
+
+    The graph state keeps the whole transcript: the system prompt, then one step per action
+    (the action message and the result of the action) and finally the current observation.
+    The request only carries the system prompt, the last `keep_steps` steps verbatim, one
+    summary line per older step (its action and the start of its result) and the current
+    observation. Steps move from verbatim to summarized, and the oldest summary lines are
+    dropped, until the history fits `max_tokens`, so a late step costs about what an early one does.
+    A pinned screenshot (the full frame that later crops are described against) is never folded
+    or stripped, so every crop in the request has its reference next to it.
+
+    Args:
+        config (HistoryConfig, optional): Steps kept verbatim and the token ceiling. Defaults to HistoryConfig().
+        parser (ResponseParser, optional): Reads the actions of text-format steps for their summary lines. Defaults to None
+            (the text of the action message is summarized).
+    '''
+    def __init__(self, config: Optional[HistoryConfig] = None, parser: Optional[ResponseParser] = None):
+        self.config = config or HistoryConfig()
+        self.parser = parser
+
+    def view(self, messages: list[BaseMessage], pinned: Optional[str] = None) -> list[BaseMessage]:
+        '''The messages to send for the transcript `messages`, with the step holding the `pinned` image and all later ones verbatim.'''
+        if len(messages) < 3:
+            return messages
+        system, current = messages[0], messages[-1]
+        steps = self.group_steps(messages[1:-1])
+        minimum = next((len(steps) - index for index, step in enumerate(steps)
+                        if pinned is not None and any(pinned in get_image_urls(message) for message in step)), 0)
+        keep = max(min(self.config.keep_steps, len(steps)), minimum)
+        costs = [sum(estimate_tokens(message) for message in step) for step in steps]
+        # The opening observation comes before the first action, so it is not a numbered step
+        offset = 0 if isinstance(steps[0][0], AIMessage) else 1
+        lines = [self.summarize_step(index + 1 - offset, step) for index, step in enumerate(steps)]
+        line_costs = [len(line) // CHARS_PER_TOKEN + 1 for line in lines]
+        while keep > minimum and SUMMARY_OVERHEAD + sum(line_costs[:len(steps) - keep]) + sum(costs[len(steps) - keep:]) > self.config.max_tokens:
+            keep -= 1
+        folded = len(steps) - keep
+        # Whatever the verbatim steps leave of the ceiling goes to the newest summary lines
+        budget = self.config.max_tokens - SUMMARY_OVERHEAD - sum(costs[folded:])
+        first = folded
+        while first > 0 and line_costs[first - 1] <= budget:
+            budget -= line_costs[first - 1]
+            first -= 1
+        summary = [line for line in lines[first:folded] if line]
+        omitted = sum(isinstance(step[0], AIMessage) for step in steps[:first])
+        if omitted:
+            summary.insert(0, f'({omitted} earlier steps omitted)')
+        if not summary:
+            # Nothing folded, or only the opening observation, which stays so that no action directly follows the system prompt
+            return [system] + [message for step in steps for message in step] + [current]
+        verbatim = [message for step in steps[folded:] for message in step]
+        summary_message = HumanMessage(content=SUMMARY_TEMPLATE.format(lines='\n'.join(summary)))
+        return [system, summary_message] + verbatim + [current]
+
+    def retain_images(self, messages: list[BaseMessage], keep: int, pinned: Optional[str] = None):
+        '''
+        Keep the images of the newest `keep` image messages of the transcript, and the `pinned`
+        image wherever it is, and replace the others, in place, by text-only copies, so their
+        data URIs are freed with the old messages.
+        '''
+        for index in range(len(messages) - 1, -1, -1):
+            images = get_image_urls(messages[index])
+            if not images:
+                continue
+            if keep > 0:
+                keep -= 1
+                continue
+            if pinned is not None and pinned in images:
+                continue
+            messages[index] = HumanMessage(content=f'{message_text(messages[index])}\n{IMAGE_PLACEHOLDER}')
+
+    def report(self, messages: list[BaseMessage]) -> PayloadReport:
+        '''Payload of a request made of `messages`.'''
+        images = [url for message in messages for url in get_image_urls(message)]
+        return PayloadReport(
+            messages=len(messages),
+            images=len(images),
+            image_bytes=sum(len(url) for url in images),
+            text_bytes=sum(len(message_text(message).encode('utf-8')) for message in messages),
+            rss=Process().memory_info().rss
+        )
+
+    def group_steps(self, messages: list[BaseMessage]) -> list[list[BaseMessage]]:
+        '''Split the transcript into steps, each starting at an action message.'''
+        steps: list[list[BaseMessage]] = [[]]
+        for message in messages:
+            if isinstance(message, AIMessage) and steps[-1]:
+                steps.append([])
+            steps[-1].append(message)
+        return [step for step in steps if step]
+
+    def summarize_step(self, number: int, step: list[BaseMessage]) -> str:
+        '''One line for a step: its actions and the start of their result (empty for the opening observation).'''
+        action, results = step[0], step[1:]
+        if not isinstance(action, AIMessage):
+            return ''
+        if action.tool_calls:
+            actions = ', '.join(f"{call['name']}({', '.join(f'{key}={value}' for key, value in call['args'].items())})" for call in action.tool_calls)
+        else:
+            parsed = self.parser.parse_message(action) if self.parser is not None else None
+            if parsed is not None and parsed.is_success:
+                actions = ', '.join(f"{item.name}({', '.join(f'{key}={value}' for key, value in item.params.items())})" for item in parsed.agent_data.actions)
+            else:
+                actions = message_text(action)
+        result = ' '.join(message_text(message) for message in results)
+        match = RESULT_PATTERN.search(result)
+        if match:
+            result = match.group(1)
+        width = self.config.summary_result_chars
+        return f"Step {number}: {shorten(actions, width, placeholder='...')} -> {shorten(result, width, placeholder='...')}"
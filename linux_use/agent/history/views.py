@@ -0,0 +1,26 @@
+from linux_use.agent.history.config import KEEP_STEPS, MAX_HISTORY_TOKENS, SUMMARY_RESULT_CHARS, KEEP_IMAGES
+from dataclasses import dataclass
+
+@dataclass
+class HistoryConfig:
+    keep_steps: int = KEEP_STEPS
+    max_tokens: int = MAX_HISTORY_TOKENS
+    summary_result_chars: int = SUMMARY_RESULT_CHARS
+    keep_images: int = KEEP_IMAGES
+
+@dataclass
+class PayloadReport:
+    '''Size of one LLM request and the memory of the agent process when it was sent.'''
+    messages: int
+    images: int
+    image_bytes: int
+    text_bytes: int
+    rss: int
+
+    @property
+    def total_bytes(self) -> int:
+        return self.image_bytes + self.text_bytes
+
+    def to_string(self) -> str:
+        return (f'{self.messages} messages, {self.images} images ({self.image_bytes / 1024:.0f} KB), '
+                f'text {self.text_bytes / 1024:.0f} KB, RSS {self.rss / 2**20:.0f} MB')
@@ -0,0 +1,100 @@
+# Settle delay (s) after each kind of input action, replacing pyautogui's global PAUSE
+MOVE_DELAY = 0.01
+CLICK_DELAY = 0.05
+SCROLL_DELAY = 0.05
+KEY_DELAY = 0.02
+TYPE_DELAY = 0.02
+DRAG_DELAY = 0.05
+
+# Pause (s) between intermediate pointer motions while dragging, so targets see the drag start
+DRAG_STEP_DELAY = 0.01
+DRAG_STEPS = 10
+
+# Core X pointer buttons (4-7 are the vertical and horizontal wheel)
+BUTTONS = {
+    'left': 1,
+    'middle': 2,
+    'right': 3
+}
+WHEEL_BUTTONS = {
+    'up': 4,
+    'down': 5,
+    'left': 6,
+    'right': 7
+}
+
+# pyautogui key names that differ from X keysym names
+KEYSYM_ALIASES = {
+    'enter': 'Return',
+    'return': 'Return',
+    '\n': 'Return',
+    '\t': 'Tab',
+    ' ': 'space',
+    'tab': 'Tab',
+    'esc': 'Escape',
+    'escape': 'Escape',
+    'backspace': 'BackSpace',
+    'delete': 'Delete',
+    'del': 'Delete',
+    'insert': 'Insert',
+    'home': 'Home',
+    'end': 'End',
+    'pageup': 'Prior',
+    'pgup': 'Prior',
+    'pagedown': 'Next',
+    'pgdn': 'Next',
+    'up': 'Up',
+    'down': 'Down',
+    'left': 'Left',
+    'right': 'Right',
+    'space': 'space',
+    'ctrl': 'Control_L',
+    'ctrlleft': 'Control_L',
+    'ctrlright': 'Control_R',
+    'control': 'Control_L',
+    'shift': 'Shift_L',
+    'shiftleft': 'Shift_L',
+    'shiftright': 'Shift_R',
+    'alt': 'Alt_L',
+    'altleft': 'Alt_L',
+    'altright': 'Alt_R',
+    'win': 'Super_L',
+    'winleft': 'Super_L',
+    'winright': 'Super_R',
+    'super': 'Super_L',
+    'cmd': 'Super_L',
+    'meta': 'Meta_L',
+    'capslock': 'Caps_Lock',
+    'numlock': 'Num_Lock',
+    'scrolllock': 'Scroll_Lock',
+    'printscreen': 'Print',
+    'prtsc': 'Print',
+    'pause': 'Pause',
+    'menu': 'Menu',
+    'apps': 'Menu',
+    'volumeup': 'XF86AudioRaiseVolume',
+    'volumedown': 'XF86AudioLowerVolume',
+    'volumemute': 'XF86AudioMute',
+    'playpause': 'XF86AudioPlay',
+    'nexttrack': 'XF86AudioNext',
+    'prevtrack': 'XF86AudioPrev'
+}
+
+# Text shorter than this (and fully on the keyboard map) is typed instead of pasted, leaving the clipboard alone
+CLIPBOARD_MIN_LENGTH = 16
+
+# Seconds to keep the pasted text on the clipboard before restoring the previous contents
+CLIPBOARD_RESTORE_DELAY = 0.5
+
+# Timeout (s) for the clipboard helper commands
+CLIPBOARD_TIMEOUT = 1.0
+
+# Clipboard helpers tried in order: (read command, write command)
+CLIPBOARD_COMMANDS = [
+    (['xclip', '-selection', 'clipboard', '-o'], ['xclip', '-selection', 'clipboard', '-i']),
+    (['xsel', '--clipboard', '--output'], ['xsel', '--clipboard', '--input'])
+]
+
+# Pause (s) before a spare keycode used for an off-keymap character is remapped or released,
+# so the focused client has translated the previous key event with the old mapping
+KEYMAP_REMAP_DELAY = 0.05
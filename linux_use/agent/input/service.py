@@ -0,0 +1,452 @@
+from linux_use.agent.input.config import (BUTTONS, WHEEL_BUTTONS, KEYSYM_ALIASES, DRAG_STEPS, DRAG_STEP_DELAY, KEYMAP_REMAP_DELAY,
+CLIPBOARD_MIN_LENGTH, CLIPBOARD_RESTORE_DELAY, CLIPBOARD_TIMEOUT, CLIPBOARD_COMMANDS)
+from linux_use.agent.input.views import InputBackend, InputDelays, TextEntryMethod
+from linux_use.agent.display.service import atspi_lock
+from abc import ABC, abstractmethod
+from threading import Timer, Lock
+from typing import Optional
+from shutil import which
+from time import sleep
+import pyautogui as pg
+import subprocess
+
+# Agent actions target screen corners too; pyautogui checks its fail-safe on every call, even without the pause
+pg.FAILSAFE=False
+
+try:
+    from Xlib import X, XK
+    from Xlib.ext import xtest
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+try:
+    import pyatspi
+    ATSPI_AVAILABLE = True
+except ImportError:
+    ATSPI_AVAILABLE = False
+
+class InputController(ABC):
+    '''
+    Pointer and keyboard actions shared by the input backends.
+
+    Backends only implement the primitives (pointer motion, button and key events, flush);
+    the composed actions live here and end with the settle delay configured for their kind,
+    instead of a global pause after every primitive.
+
+    Args:
+        delays (InputDelays, optional): Settle delays per action. Defaults to InputDelays().
+    '''
+    backend: InputBackend
+
+    def __init__(self, delays: Optional[InputDelays] = None):
+        self.delays = delays or InputDelays()
+
+    def settle(self, action: str):
+        delay = getattr(self.delays, action)
+        if delay > 0:
+            sleep(delay)
+
+    @abstractmethod
+    def position(self) -> tuple[int, int]:
+        pass
+
+    @abstractmethod
+    def move_pointer(self, x: int, y: int):
+        pass
+
+    @abstractmethod
+    def button_event(self, button: int, down: bool):
+        pass
+
+    @abstractmethod
+    def key_event(self, key: str, down: bool):
+        pass
+
+    def wheel(self, direction: str, clicks: int):
+        button = WHEEL_BUTTONS[direction]
+        for _ in range(clicks):
+            self.button_event(button, True)
+            self.button_event(button, False)
+
+    def write_text(self, text: str, interval: float):
+        for char in text:
+            self.key_event(char, True)
+            self.key_event(char, False)
+            if interval:
+                self.flush()
+                sleep(interval)
+
+    def flush(self):
+        pass
+
+    def is_on_keymap(self, text: str) -> bool:
+        '''Whether every character of `text` can be typed with the plain keyboard map.'''
+        return text.isascii()
+
+    def move(self, x: int, y: int):
+        self.move_pointer(x, y)
+        self.flush()
+        self.settle('move')
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None, button: str = 'left', clicks: int = 1):
+        if x is not None and y is not None:
+            self.move_pointer(x, y)
+        code = BUTTONS[button]
+        for _ in range(clicks):
+            self.button_event(code, True)
+            self.button_event(code, False)
+        self.flush()
+        self.settle('click')
+
+    def scroll(self, direction: str, clicks: int = 1, x: Optional[int] = None, y: Optional[int] = None):
+        if x is not None and y is not None:
+            self.move_pointer(x, y)
+        self.wheel(direction, clicks)
+        self.flush()
+        self.settle('scroll')
+
+    def drag(self, from_loc: tuple[int, int], to_loc: tuple[int, int], button: str = 'left'):
+        (x1, y1), (x2, y2) = from_loc, to_loc
+        code = BUTTONS[button]
+        self.move_pointer(x1, y1)
+        self.button_event(code, True)
+        self.flush()
+        # Intermediate motion lets toolkits recognise the drag before the drop
+        for step in range(1, DRAG_STEPS + 1):
+            self.move_pointer(x1 + (x2 - x1) * step // DRAG_STEPS, y1 + (y2 - y1) * step // DRAG_STEPS)
+            self.flush()
+            sleep(DRAG_STEP_DELAY)
+        self.button_event(code, False)
+        self.flush()
+        self.settle('drag')
+
+    def press(self, key: str):
+        self.key_event(key, True)
+        self.key_event(key, False)
+        self.flush()
+        self.settle('key')
+
+    def hotkey(self, *keys: str):
+        for key in keys:
+            self.key_event(key, True)
+        for key in reversed(keys):
+            self.key_event(key, False)
+        self.flush()
+        self.settle('key')
+
+    def type_text(self, text: str, interval: float = 0.0):
+        self.write_text(text, interval)
+        self.flush()
+        self.settle('type')
+
+class PyAutoGUIInput(InputController):
+    '''Input through pyautogui, with its per-call pause disabled in favour of the settle delays.'''
+    backend = InputBackend.PYAUTOGUI
+    button_names = {code: name for name, code in BUTTONS.items()}
+
+    def position(self) -> tuple[int, int]:
+        position = pg.position()
+        return (position.x, position.y)
+
+    def move_pointer(self, x: int, y: int):
+        pg.moveTo(x, y, _pause=False)
+
+    def button_event(self, button: int, down: bool):
+        if down:
+            pg.mouseDown(button=self.button_names[button], _pause=False)
+        else:
+            pg.mouseUp(button=self.button_names[button], _pause=False)
+
+    def key_event(self, key: str, down: bool):
+        if down:
+            pg.keyDown(key, _pause=False)
+        else:
+            pg.keyUp(key, _pause=False)
+
+    def wheel(self, direction: str, clicks: int):
+        match direction:
+            case 'up' | 'down':
+                pg.scroll(clicks if direction == 'up' else -clicks, _pause=False)
+            case 'left' | 'right':
+                pg.hscroll(clicks if direction == 'right' else -clicks, _pause=False)
+
+    def write_text(self, text: str, interval: float):
+        pg.typewrite(text, interval=interval, _pause=False)
+
+class XTestInput(InputController):
+    '''
+    Input injected with the XTEST extension over an existing Xlib connection.
+
+    Events are queued on the connection and sent in one round trip per action (`flush`),
+    so a click or a hotkey costs one request batch instead of several process-level calls.
+
+    Args:
+        connection: Open Xlib display (shared with the rest of the desktop).
+        delays (InputDelays, optional): Settle delays per action. Defaults to InputDelays().
+    '''
+    backend = InputBackend.XTEST
+
+    def __init__(self, connection, delays: Optional[InputDelays] = None):
+        super().__init__(delays)
+        if not XLIB_AVAILABLE:
+            raise RuntimeError('python-xlib is not available')
+        if not connection.query_extension('XTEST').present:
+            raise RuntimeError('XTEST extension is not available on this display')
+        self.connection = connection
+        self.root = connection.screen().root
+        self.keys: dict[str, tuple[int, bool]] = {}
+        self.spare_keycodes: Optional[list[int]] = None
+
+    def position(self) -> tuple[int, int]:
+        pointer = self.root.query_pointer()
+        return (pointer.root_x, pointer.root_y)
+
+    def move_pointer(self, x: int, y: int):
+        xtest.fake_input(self.connection, X.MotionNotify, x=x, y=y)
+
+    def button_event(self, button: int, down: bool):
+        xtest.fake_input(self.connection, X.ButtonPress if down else X.ButtonRelease, button)
+
+    def key_event(self, key: str, down: bool):
+        keycode, _ = self.lookup(key)
+        if not keycode:
+            raise ValueError(f'No keycode for key {key!r}')
+        xtest.fake_input(self.connection, X.KeyPress if down else X.KeyRelease, keycode)
+
+    def write_text(self, text: str, interval: float):
+        shift, _ = self.lookup('shift')
+        remapped: dict[int, int] = {}
+        borrowed: set[int] = set()
+        for char in text:
+            keycode, shifted = self.lookup(char)
+            if not keycode:
+                keycode = self.remap(self.get_keysym(char), remapped)
+                if not keycode:
+                    # No spare keycode to borrow, skipped like pyautogui.typewrite does
+                    continue
+                borrowed.add(keycode)
+            if shifted:
+                xtest.fake_input(self.connection, X.KeyPress, shift)
+            xtest.fake_input(self.connection, X.KeyPress, keycode)
+            xtest.fake_input(self.connection, X.KeyRelease, keycode)
+            if shifted:
+                xtest.fake_input(self.connection, X.KeyRelease, shift)
+            if interval:
+                self.flush()
+                sleep(interval)
+        if borrowed:
+            self.flush()
+            sleep(KEYMAP_REMAP_DELAY)
+            for keycode in sorted(borrowed):
+                self.connection.change_keyboard_mapping(keycode, [(X.NoSymbol, X.NoSymbol)])
+
+    def remap(self, keysym: int, remapped: dict[int, int]) -> int:
+        '''Borrow a spare keycode for a keysym missing from the keyboard map (e.g. non-Latin text).'''
+        if keysym in remapped:
+            return remapped[keysym]
+        spare = self.get_spare_keycodes()
+        if not spare:
+            return 0
+        if len(remapped) == len(spare):
+            # All spare keycodes are in use: let the queued keys be translated before reusing them
+            self.flush()
+            sleep(KEYMAP_REMAP_DELAY)
+            remapped.clear()
+        keycode = spare[len(remapped)]
+        self.connection.change_keyboard_mapping(keycode, [(keysym, keysym)])
+        remapped[keysym] = keycode
+        return keycode
+
+    def get_spare_keycodes(self) -> list[int]:
+        if self.spare_keycodes is None:
+            first = self.connection.display.info.min_keycode
+            count = self.connection.display.info.max_keycode - first + 1
+            mapping = self.connection.get_keyboard_mapping(first, count)
+            self.spare_keycodes = [first + offset for offset, keysyms in enumerate(mapping) if not any(keysyms)]
+        return self.spare_keycodes
+
+    def is_on_keymap(self, text: str) -> bool:
+        return all(self.lookup(char)[0] for char in set(text))
+
+    def lookup(self, key: str) -> tuple[int, bool]:
+        '''Keycode for a pyautogui-style key name or a character, and whether it needs shift.'''
+        if key not in self.keys:
+            keysym = self.get_keysym(key)
+            keycode = self.connection.keysym_to_keycode(keysym) if keysym else 0
+            shifted = bool(keycode) and self.connection.keycode_to_keysym(keycode, 0) != keysym \
+                and self.connection.keycode_to_keysym(keycode, 1) == keysym
+            self.keys[key] = (keycode, shifted)
+        return self.keys[key]
+
+    def get_keysym(self, key: str) -> int:
+        name = KEYSYM_ALIASES.get(key if len(key) == 1 else key.lower(), key)
+        if len(name) > 1 and name[0] in 'fF' and name[1:].isdigit():
+            name = name.upper()
+        keysym = XK.string_to_keysym(name)
+        if keysym == X.NoSymbol and len(name) == 1:
+            code = ord(name)
+            # Latin-1 keysyms equal the code point, the rest of Unicode is offset by 0x1000000
+            keysym = code if 0x20 <= code <= 0x7e or 0xa0 <= code <= 0xff else 0x1000000 | code
+        return keysym
+
+    def flush(self):
+        self.connection.sync()
+
+class Clipboard:
+    '''
+    Text clipboard through the first available helper (xclip, then xsel).
+
+    `paste` leaves the text on the clipboard only long enough for the paste and then puts the
+    previous text back from a timer, so the caller does not wait for the restore.
+
+    Args:
+        env (dict[str, str], optional): Environment of the helpers (selects the display). Defaults to None (this process's).
+    '''
+    def __init__(self, env: Optional[dict[str, str]] = None):
+        self.env = env
+        self.commands = next(((read, write) for read, write in CLIPBOARD_COMMANDS if which(read[0])), None)
+        self.restore_timer: Optional[Timer] = None
+        self.saved: Optional[str] = None
+        self.lock = Lock()
+
+    @property
+    def available(self) -> bool:
+        return self.commands is not None
+
+    def get(self) -> Optional[str]:
+        try:
+            result = subprocess.run(self.commands[0], capture_output=True, text=True, timeout=CLIPBOARD_TIMEOUT, env=self.env)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        return result.stdout if result.returncode == 0 else None
+
+    def set(self, text: str) -> bool:
+        # The helper forks to serve the selection, so its output must not be a pipe we wait on
+        try:
+            result = subprocess.run(self.commands[1], input=text.encode('utf-8'), stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL, timeout=CLIPBOARD_TIMEOUT, env=self.env)
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return result.returncode == 0
+
+    def paste(self, controller: InputController, text: str) -> bool:
+        with self.lock:
+            if self.restore_timer is not None:
+                # A restore is still pending: the clipboard holds our text, not the user's
+                self.restore_timer.cancel()
+            else:
+                self.saved = self.get()
+            if not self.set(text):
+                self.restore_timer = None
+                return False
+            controller.hotkey('ctrl', 'v')
+            self.restore_timer = Timer(CLIPBOARD_RESTORE_DELAY, self.restore)
+            self.restore_timer.daemon = True
+            self.restore_timer.start()
+            return True
+
+    def restore(self):
+        with self.lock:
+            self.restore_timer = None
+            if self.saved is not None:
+                self.set(self.saved)
+            self.saved = None
+
+class TextEntry:
+    '''
+    Enters text into the focused field with the fastest method that works.
+
+    1. AT-SPI EditableText on the focused editable element under the pointer (one call, any script).
+    2. Clipboard paste (constant time, any script), for text that is long or off the keyboard map.
+    3. Key events from the input backend (XTEST queues them in one batch and borrows spare keycodes
+       for characters missing from the keyboard map).
+
+    Args:
+        env (dict[str, str], optional): Environment of the clipboard helpers. Defaults to None (this process's).
+        accessibility (bool, optional): Whether the AT-SPI registry serves this display. Defaults to True.
+    '''
+    def __init__(self, env: Optional[dict[str, str]] = None, accessibility: bool = True):
+        self.clipboard = Clipboard(env)
+        self.accessibility = accessibility
+
+    def enter(self, controller: InputController, text: str, loc: Optional[tuple[int, int]] = None, clear: bool = False) -> TextEntryMethod:
+        if loc is not None:
+            with atspi_lock:
+                inserted = self.insert_accessible(text, loc, clear)
+            if inserted:
+                return TextEntryMethod.ACCESSIBILITY
+        if clear:
+            controller.hotkey('ctrl', 'a')
+            controller.press('backspace')
+        if not text:
+            return TextEntryMethod.KEYS
+        short = len(text) < CLIPBOARD_MIN_LENGTH and controller.is_on_keymap(text)
+        if not short and self.clipboard.available and self.clipboard.paste(controller, text):
+            return TextEntryMethod.CLIPBOARD
+        controller.type_text(text)
+        return TextEntryMethod.KEYS
+
+    def insert_accessible(self, text: str, loc: tuple[int, int], clear: bool) -> bool:
+        if not ATSPI_AVAILABLE or not self.accessibility:
+            return False
+        try:
+            accessible = self.get_focused_editable(*loc)
+            if accessible is None:
+                return False
+            editable = accessible.queryEditableText()
+            before = editable.characterCount
+            if clear:
+                if not editable.setTextContents(text):
+                    return False
+                expected, caret = len(text), len(text)
+            else:
+                offset = editable.caretOffset
+                if offset < 0:
+                    offset = before
+                # The length argument is in UTF-8 bytes
+                if not editable.insertText(offset, text, len(text.encode('utf-8'))):
+                    return False
+                expected, caret = before + len(text), offset + len(text)
+            # Some toolkits accept the call without applying it; verify before skipping the fallbacks
+            if editable.characterCount != expected:
+                return False
+            editable.setCaretOffset(caret)
+            return True
+        except Exception:
+            return False
+
+    def get_focused_editable(self, x: int, y: int):
+        '''Deepest accessible at (x, y) in the active window, if it is focused and editable.'''
+        desktop = pyatspi.Registry.getDesktop(0)
+        for app in desktop:
+            if app is None:
+                continue
+            for window in app:
+                if window is None or not window.getState().contains(pyatspi.STATE_ACTIVE):
+                    continue
+                accessible = window
+                while True:
+                    child = accessible.queryComponent().getAccessibleAtPoint(x, y, pyatspi.DESKTOP_COORDS)
+                    if child is None or child == accessible:
+                        break
+                    accessible = child
+                state = accessible.getState()
+                if state.contains(pyatspi.STATE_EDITABLE) and state.contains(pyatspi.STATE_FOCUSED):
+                    return accessible
+                return None
+        return None
+
+def create_input_controller(backend: InputBackend | str = InputBackend.XTEST, connection=None,
+                            delays: Optional[InputDelays] = None) -> InputController:
+    '''Input controller for `backend`, falling back to pyautogui when XTEST cannot be used.'''
+    backend = InputBackend(backend)
+    if backend == InputBackend.XTEST:
+        if connection is not None:
+            try:
+                return XTestInput(connection, delays)
+            except Exception as e:
+                print(f"Warning: XTEST input unavailable ({e}), using pyautogui.")
+        else:
+            print("Warning: No X11 connection for XTEST input, using pyautogui.")
+    return PyAutoGUIInput(delays)
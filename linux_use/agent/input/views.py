@@ -0,0 +1,22 @@
+from linux_use.agent.input.config import MOVE_DELAY, CLICK_DELAY, SCROLL_DELAY, KEY_DELAY, TYPE_DELAY, DRAG_DELAY
+from dataclasses import dataclass
+from enum import Enum
+
+class InputBackend(Enum):
+    PYAUTOGUI = 'pyautogui'
+    XTEST = 'xtest'
+
+@dataclass
+class InputDelays:
+    '''Seconds to let the UI settle after each kind of action.'''
+    move: float = MOVE_DELAY
+    click: float = CLICK_DELAY
+    scroll: float = SCROLL_DELAY
+    key: float = KEY_DELAY
+    type: float = TYPE_DELAY
+    drag: float = DRAG_DELAY
+
+class TextEntryMethod(Enum):
+    ACCESSIBILITY = 'accessibility'
+    CLIPBOARD = 'clipboard'
+    KEYS = 'keys'
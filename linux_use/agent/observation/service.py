@@ -0,0 +1,91 @@
+from linux_use.agent.observation.views import ObservationFormat
+from linux_use.agent.desktop.views import DesktopState, App
+from linux_use.agent.tree.views import TreeState
+import json
+import re
+
+# Text that could run into the next field (or vanish, when empty) unless it is quoted
+AMBIGUOUS_PATTERN = re.compile(r'^$|[\s"\'=(]')
+
+def quote(text: str) -> str:
+    '''`text` as a JSON string when it could be misread as several fields, as it is otherwise.'''
+    return json.dumps(text, ensure_ascii=False) if AMBIGUOUS_PATTERN.search(text) else text
+
+class ObservationEncoder:
+    '''
+    Renders the desktop-state sections of an observation prompt.
+
+    TABLE is the GitHub table of the views' `*_to_string` methods. COMPACT writes one element
+    per line with nothing padded: elements are grouped under an `[App Name]` header instead of
+    repeating the app on every row, names and values are quoted only where they could run into
+    the next field, and empty values, shortcuts and non-scrollable axes are left out. The first
+    line of each section spells out the field order, as the table header does.
+
+    Args:
+        format (ObservationFormat, optional): Output format. Defaults to ObservationFormat.TABLE.
+    '''
+    def __init__(self, format: ObservationFormat | str = ObservationFormat.TABLE):
+        self.format = ObservationFormat(format)
+
+    def active_app(self, desktop_state: DesktopState) -> str:
+        if self.format is ObservationFormat.TABLE or desktop_state.active_app is None:
+            return desktop_state.active_app_to_string()
+        return self.app_line(desktop_state.active_app)
+
+    def apps(self, desktop_state: DesktopState) -> str:
+        if self.format is ObservationFormat.TABLE or not desktop_state.apps:
+            return desktop_state.apps_to_string()
+        return '\n'.join(self.app_line(app) for app in desktop_state.apps)
+
+    def app_line(self, app: App) -> str:
+        return f'{app.name} ({app.status.value}, {app.size.width}x{app.size.height}, depth={app.depth}, handle={app.handle})'
+
+    def interactive_elements(self, tree_state: TreeState) -> str:
+        if self.format is ObservationFormat.TABLE or not tree_state.interactive_nodes:
+            return tree_state.interactive_elements_to_string()
+        lines = ['Label ControlType Name value=Value shortcut=Shortcut (x,y)']
+        app_name = None
+        for label, node in enumerate(tree_state.interactive_nodes):
+            if node.app_name != app_name:
+                app_name = node.app_name
+                lines.append(f'[{app_name}]')
+            line = f'{label} {node.control_type} {quote(node.name)}'
+            if node.value:
+                line = f'{line} value={quote(node.value)}'
+            if node.shortcut:
+                line = f'{line} shortcut={node.shortcut}'
+            lines.append(f'{line} ({node.center.x},{node.center.y})')
+        return '\n'.join(lines)
+
+    def informative_elements(self, tree_state: TreeState) -> str:
+        if self.format is ObservationFormat.TABLE or not tree_state.informative_nodes:
+            return tree_state.informative_elements_to_string()
+        lines = []
+        app_name = None
+        for node in tree_state.informative_nodes:
+            if node.app_name != app_name:
+                app_name = node.app_name
+                lines.append(f'[{app_name}]')
+            # One element per line, so line breaks inside a text collapse into spaces
+            lines.append(' '.join(node.name.split()))
+        return '\n'.join(lines)
+
+    def scrollable_elements(self, tree_state: TreeState) -> str:
+        if self.format is ObservationFormat.TABLE or not tree_state.scrollable_nodes:
+            return tree_state.scrollable_elements_to_string()
+        lines = ['Label ControlType Name (x,y) horizontal=Scroll% vertical=Scroll% focused']
+        base_index = len(tree_state.interactive_nodes)
+        app_name = None
+        for index, node in enumerate(tree_state.scrollable_nodes):
+            if node.app_name != app_name:
+                app_name = node.app_name
+                lines.append(f'[{app_name}]')
+            line = f'{base_index + index} {node.control_type} {quote(node.name)} ({node.center.x},{node.center.y})'
+            if node.horizontal_scrollable:
+                line = f'{line} horizontal={node.horizontal_scroll_percent:g}%'
+            if node.vertical_scrollable:
+                line = f'{line} vertical={node.vertical_scroll_percent:g}%'
+            if node.is_focused:
+                line = f'{line} focused'
+            lines.append(line)
+        return '\n'.join(lines)
@@ -0,0 +1,7 @@
+from enum import Enum
+
+class ObservationFormat(Enum):
+    # GitHub tables (tabulate), one row per element
+    TABLE = 'table'
+    # One unpadded line per element under a header per app, empty fields left out
+    COMPACT = 'compact'
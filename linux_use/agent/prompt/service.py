@@ -1,36 +1,46 @@
 from linux_use.agent.desktop.views import DesktopState, Browser
+from linux_use.agent.observation.service import ObservationEncoder
 from linux_use.agent.registry.views import ToolResult
 from linux_use.agent.desktop.service import Desktop
 from linux_use.agent.views import AgentData
 from langchain.prompts import PromptTemplate
 from importlib.resources import files
-from datetime import datetime
-from getpass import getuser
-from pathlib import Path
-import pyautogui as pg
+from linux_use.agent.repair.config import MAX_ERROR_CHARS
+from functools import cache
+from textwrap import shorten
+
+@cache
+def load_template(name: str) -> PromptTemplate:
+    return PromptTemplate.from_file(files('linux_use.agent.prompt').joinpath(name))
 
 class Prompt:
     @staticmethod
-    def system_prompt(desktop:Desktop,browser: Browser,language: str,tools_prompt:str,max_steps:int,instructions: list[str]=[]) -> str:
-        width, height = pg.size()
-        template =PromptTemplate.from_file(files('windows_use.agent.prompt').joinpath('system.md'))
+    def system_prompt(desktop:Desktop,browser: Browser,language: str,tools_prompt:str,max_steps:int,instructions: list[str]=[],max_batch_actions:int=5,tool_calling:bool=False) -> str:
+        # Only facts fixed for the whole task go in here, so every step sends the same cacheable prefix
+        facts = desktop.facts.get()
+        resolution = facts.resolution
+        template = load_template('system.md')
         return template.format(**{
-            'current_datetime': datetime.now().strftime('%A, %B %d, %Y'),
             'instructions': '\n'.join(instructions),
             'tools_prompt': tools_prompt,
-            'download_directory': Path.home().joinpath('Downloads').as_posix(),
-            'os':desktop.get_windows_version(),
+            'download_directory': facts.host.download_dir,
+            'os':facts.host.os,
             'language':language,
             'browser':browser.value,
-            'home_dir':Path.home().as_posix(),
-            'user':f"{getuser()} ({desktop.get_user_account_type()})",
-            'resolution':f'Primary Monitor ({width}x{height}) with DPI Scale: {desktop.get_dpi_scaling()}',
-            'max_steps': max_steps
+            'home_dir':facts.host.home_dir,
+            'user':f"{facts.host.user} ({facts.host.account_type})",
+            'resolution':f'Primary Monitor ({resolution.width}x{resolution.height}) with DPI Scale: {facts.dpi_scaling}',
+            'max_steps': max_steps,
+            'max_batch_actions': max_batch_actions,
+            # With tool calling the schemas travel as tool definitions and the response is the tool call itself
+            'output_format': load_template('tool_calling_output.md' if tool_calling else 'xml_output.md').format()
         })
     
     @staticmethod
     def action_prompt(agent_data:AgentData) -> str:
-        template = PromptTemplate.from_file(files('windows_use.agent.prompt').joinpath('action.md'))
+        if agent_data.is_batch:
+            return Prompt.batch_action_prompt(agent_data=agent_data)
+        template = load_template('action.md')
         return template.format(**{
             'evaluate': agent_data.evaluate,
             'thought': agent_data.thought,
@@ -38,9 +48,31 @@ class Prompt:
             'action_input': agent_data.action.params
         })
     
+    @staticmethod
+    def tool_call_prompt(agent_data:AgentData) -> str:
+        template = load_template('tool_call.md')
+        return template.format(**{
+            'evaluate': agent_data.evaluate,
+            'thought': agent_data.thought
+        })
+
+    @staticmethod
+    def batch_action_prompt(agent_data:AgentData) -> str:
+        template = load_template('batch_action.md')
+        actions = []
+        for action in agent_data.actions:
+            expect = f'\n            <expect>{action.expect}</expect>' if action.expect is not None else ''
+            actions.append(f'        <action>\n            <action_name>{action.name}</action_name>\n'
+                           f'            <action_input>{action.params}</action_input>{expect}\n        </action>')
+        return template.format(**{
+            'evaluate': agent_data.evaluate,
+            'thought': agent_data.thought,
+            'actions': '\n'.join(actions)
+        })
+
     @staticmethod
     def previous_observation_prompt(steps:int,max_steps:int,observation: str)-> str:
-        template=PromptTemplate.from_file(files('windows_use.agent.prompt').joinpath('previous_observation.md'))
+        template=load_template('previous_observation.md')
         return template.format(**{
             'steps': steps,
             'max_steps': max_steps,
@@ -48,30 +80,39 @@ class Prompt:
         })
          
     @staticmethod
-    def observation_prompt(query:str,steps:int,max_steps:int, tool_result:ToolResult,desktop_state: DesktopState) -> str:
-        cursor_location = pg.position()
+    def observation_prompt(query:str,steps:int,max_steps:int, tool_result:ToolResult,desktop_state: DesktopState,encoder:ObservationEncoder=None) -> str:
+        cursor_location = desktop_state.cursor_location
         tree_state = desktop_state.tree_state
-        template = PromptTemplate.from_file(files('windows_use.agent.prompt').joinpath('observation.md'))
+        encoder = encoder or ObservationEncoder()
+        template = load_template('observation.md')
         return template.format(**{
             'steps': steps,
             'max_steps': max_steps,
             'observation': tool_result.content if tool_result.is_success else tool_result.error,
-            'active_app': desktop_state.active_app_to_string(),
-            'cursor_location': f'({cursor_location.x},{cursor_location.y})',
-            'apps': desktop_state.apps_to_string(),
-            'interactive_elements': tree_state.interactive_elements_to_string() or 'No interactive elements found',
-            'informative_elements': tree_state.informative_elements_to_string() or 'No informative elements found',
-            'scrollable_elements': tree_state.scrollable_elements_to_string() or 'No scrollable elements found',
+            'active_app': encoder.active_app(desktop_state),
+            'cursor_location': f'({cursor_location[0]},{cursor_location[1]})' if cursor_location else 'Unknown',
+            'apps': encoder.apps(desktop_state),
+            'interactive_elements': encoder.interactive_elements(tree_state) or 'No interactive elements found',
+            'informative_elements': encoder.informative_elements(tree_state) or 'No informative elements found',
+            'scrollable_elements': encoder.scrollable_elements(tree_state) or 'No scrollable elements found',
             'query':query
         })
     
     @staticmethod
     def answer_prompt(agent_data: AgentData, tool_result: ToolResult):
-        template = PromptTemplate.from_file(files('windows_use.agent.prompt').joinpath('answer.md'))
+        template = load_template('answer.md')
         return template.format(**{
             'evaluate': agent_data.evaluate,
             'thought': agent_data.thought,
             'final_answer': tool_result.content
         })
 
+    @staticmethod
+    def correction_prompt(error: str, tool_calling: bool = False) -> str:
+        # In tool calling mode the model was never shown the XML output format
+        template = load_template('tool_call_correction.md' if tool_calling else 'correction.md')
+        return template.format(**{
+            'error': shorten(error, MAX_ERROR_CHARS, placeholder='...')
+        })
+
     
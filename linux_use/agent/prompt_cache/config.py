@@ -0,0 +1,2 @@
+# Breakpoint marking the end of the static prefix for providers with explicit prompt caching
+CACHE_CONTROL = {'type': 'ephemeral'}
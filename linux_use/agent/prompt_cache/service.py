@@ -0,0 +1,37 @@
+from linux_use.agent.prompt_cache.config import CACHE_CONTROL
+from linux_use.agent.prompt_cache.views import CacheStats
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, SystemMessage
+from typing import Optional
+
+# Try to import the Anthropic chat model (explicit cache breakpoints)
+try:
+    from langchain_anthropic import ChatAnthropic
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    ANTHROPIC_AVAILABLE = False
+
+def supports_cache_control(llm: Optional[BaseChatModel]) -> bool:
+    '''Whether the model caches only up to explicit `cache_control` breakpoints (providers such as OpenAI cache any repeated prefix unasked).'''
+    # Models wrapped by bind/with_config keep the chat model in `bound`
+    llm = getattr(llm, 'bound', llm)
+    return ANTHROPIC_AVAILABLE and isinstance(llm, ChatAnthropic)
+
+def cached_system_message(prompt: str, cache_control: bool) -> SystemMessage:
+    '''The system message, with a cache breakpoint after it when the provider needs one.'''
+    if not cache_control:
+        return SystemMessage(content=prompt)
+    return SystemMessage(content=[{'type': 'text', 'text': prompt, 'cache_control': CACHE_CONTROL}])
+
+def get_cache_stats(message: BaseMessage) -> Optional[CacheStats]:
+    '''Prompt caching of the call that produced `message`, if the provider reported usage.'''
+    usage = getattr(message, 'usage_metadata', None)
+    if not usage:
+        return None
+    details = usage.get('input_token_details') or {}
+    return CacheStats(
+        input_tokens=usage.get('input_tokens', 0),
+        cache_read=details.get('cache_read', 0),
+        cache_creation=details.get('cache_creation', 0),
+        calls=1
+    )
@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+
+@dataclass
+class CacheStats:
+    '''Prompt tokens of LLM calls and how many of them were read from or written to the provider's cache.'''
+    input_tokens: int = 0
+    cache_read: int = 0
+    cache_creation: int = 0
+    calls: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.cache_read / self.input_tokens if self.input_tokens else 0.0
+
+    def add(self, other: 'CacheStats') -> 'CacheStats':
+        return CacheStats(
+            input_tokens=self.input_tokens + other.input_tokens,
+            cache_read=self.cache_read + other.cache_read,
+            cache_creation=self.cache_creation + other.cache_creation,
+            calls=self.calls + other.calls
+        )
+
+    def to_string(self) -> str:
+        return (f'{self.cache_read}/{self.input_tokens} input tokens from cache ({self.hit_ratio:.0%}), '
+                f'{self.cache_creation} written')
@@ -1,9 +1,14 @@
 from linux_use.agent.registry.views import Tool as ToolData, ToolResult
 from linux_use.agent.desktop.service import Desktop
 from langchain.tools import Tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from textwrap import dedent
 import json
 
+def function_name(tool_name: str) -> str:
+    '''Name of a tool as a function: providers only accept letters, digits, underscores and hyphens.'''
+    return '_'.join(tool_name.lower().split())
+
 class Registry:
     def __init__(self,tools:list[Tool]):
         self.tools=tools
@@ -24,12 +29,30 @@ class Registry:
             name=tool.name,
             description=tool.description,
             params=tool.args,
-            function=tool.run
+            function=tool.run,
+            coroutine=tool.arun,
+            args_schema=tool.args_schema
         ) for tool in self.tools}
     
     def get_tools_prompt(self) -> str:
         tools_prompt = [self.tool_prompt(tool.name) for tool in self.tools]
         return '\n\n'.join(tools_prompt)
+
+    def get_tool_names_prompt(self) -> str:
+        '''The tools by name with the function each is called as, for when their schemas are sent as tool definitions.'''
+        return '\n'.join(f'- {tool.name}: call `{function_name(tool.name)}`' for tool in self.tools)
+
+    def get_tool_definitions(self) -> list[dict]:
+        '''The tools as function definitions for `bind_tools`, without the injected desktop argument.'''
+        definitions = []
+        for tool in self.tools:
+            parameters = convert_to_openai_tool(tool)['function']['parameters']
+            definitions.append({'type': 'function', 'function': {
+                'name': function_name(tool.name),
+                'description': tool.description,
+                'parameters': parameters
+            }})
+        return definitions
     
     def execute(self, tool_name: str, desktop: Desktop, **kwargs) -> ToolResult:
         tool = self.tools_registry.get(tool_name)
@@ -39,4 +62,15 @@ class Registry:
             content = tool.function(tool_input={'desktop':desktop}|kwargs)
             return ToolResult(is_success=True, content=content)
         except Exception as error:
-            return ToolResult(is_success=False, error=str(error))
\ No newline at end of file
+            return ToolResult(is_success=False, error=str(error))
+
+    async def aexecute(self, tool_name: str, desktop: Desktop, **kwargs) -> ToolResult:
+        '''`execute` for the asyncio loop. Tools with a coroutine are awaited; the rest run in the loop's default executor.'''
+        tool = self.tools_registry.get(tool_name)
+        if tool is None:
+            return ToolResult(is_success=False, error=f"Tool '{tool_name}' not found.")
+        try:
+            content = await tool.coroutine(tool_input={'desktop':desktop}|kwargs)
+            return ToolResult(is_success=True, content=content)
+        except Exception as error:
+            return ToolResult(is_success=False, error=str(error))
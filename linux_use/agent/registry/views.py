@@ -1,11 +1,14 @@
 from pydantic import BaseModel
-from typing import Callable
+from typing import Callable, Any
 
 class Tool(BaseModel):
     name:str
     description:str
     function: Callable
+    coroutine: Callable
     params: dict
+    # Pydantic model of the arguments (or a JSON schema), used to repair the model's action inputs
+    args_schema: Any = None
 
 class ToolResult(BaseModel):
     is_success: bool
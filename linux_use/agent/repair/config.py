@@ -0,0 +1,8 @@
+# Tags of the output format; an unclosed tag's content runs to the next of these
+RESPONSE_TAGS = ('output', 'evaluate', 'thought', 'actions', 'action', 'action_name', 'action_input', 'expect')
+
+# JSON literals spelled the Python way, for inputs that mix both notations
+PYTHON_LITERALS = {'true': 'True', 'false': 'False', 'null': 'None'}
+
+# Characters of the parse error quoted back to the model in the corrective message
+MAX_ERROR_CHARS = 300
@@ -0,0 +1,218 @@
+from linux_use.agent.repair.config import RESPONSE_TAGS, PYTHON_LITERALS
+from linux_use.agent.repair.views import ParsedResponse
+from linux_use.agent.registry.service import Registry, function_name
+from linux_use.agent.utils import message_text
+from langchain_core.messages import AIMessage
+from linux_use.agent.views import AgentData, Action
+from pydantic import BaseModel, ValidationError
+from typing import Any, Optional
+import json
+import ast
+import re
+
+FENCE_PATTERN = re.compile(r'^[ \t]*```[\w-]*[ \t]*$', re.MULTILINE)
+NEXT_TAG_PATTERN = re.compile(r'</?(?:%s)>' % '|'.join(RESPONSE_TAGS), re.IGNORECASE)
+TRAILING_COMMA_PATTERN = re.compile(r',\s*([}\]])')
+BARE_KEY_PATTERN = re.compile(r'([{,]\s*)([A-Za-z_]\w*)\s*:')
+# Quoted strings are matched too, so that literals are only replaced outside them
+JSON_LITERAL_PATTERN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|\b(%s)\b' % '|'.join(PYTHON_LITERALS))
+
+def find_tag(text: str, tag: str) -> tuple[Optional[str], bool]:
+    '''Content of the first `tag` in `text` and whether its closing tag was missing.'''
+    match = re.search(rf'<{tag}>(.*?)</{tag}>', text, re.DOTALL | re.IGNORECASE)
+    if match:
+        return match.group(1).strip(), False
+    match = re.search(rf'<{tag}>', text, re.IGNORECASE)
+    if match is None:
+        return None, False
+    rest = text[match.end():]
+    end = NEXT_TAG_PATTERN.search(rest)
+    return (rest[:end.start()] if end else rest).strip(), True
+
+def relaxed_loads(text: str) -> Any:
+    '''The object in `text`, tolerating trailing commas, bare keys, a missing closing brace and mixed JSON/Python literals.'''
+    start = text.find('{')
+    if start < 0:
+        raise ValueError('The action input is not a dictionary')
+    end = text.rfind('}')
+    body = text[start:end + 1] if end > start else text[start:].rstrip().rstrip(',') + '}'
+    body = TRAILING_COMMA_PATTERN.sub(r'\1', body)
+    # Quoting bare keys can touch string values, so it is only the second attempt
+    for candidate in (body, BARE_KEY_PATTERN.sub(r'\1"\2":', body)):
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            pass
+        try:
+            return ast.literal_eval(JSON_LITERAL_PATTERN.sub(lambda match: match.group(1) or PYTHON_LITERALS[match.group(2)], candidate))
+        except (ValueError, SyntaxError, TypeError):
+            pass
+    raise ValueError(f'The action input is not a valid dictionary: {text}')
+
+def parse_params(text: str) -> tuple[dict, bool]:
+    '''Action input as a dictionary (Python literal, then JSON, then relaxed JSON) and whether it needed relaxing.'''
+    try:
+        value, relaxed = ast.literal_eval(text), False
+    except (ValueError, SyntaxError, TypeError):
+        try:
+            value, relaxed = json.loads(text), False
+        except ValueError:
+            value, relaxed = relaxed_loads(text), True
+    if not isinstance(value, dict):
+        raise ValueError(f'The action input must be a dictionary, got {type(value).__name__}')
+    return value, relaxed
+
+def coerce_value(value: Any) -> Any:
+    '''Nearest value of the usual types for one the schema rejected ("(10, 20)" to a tuple, True to 'true', 3 to '3').'''
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, dict) and set(value) == {'x', 'y'}:
+        return (value['x'], value['y'])
+    if isinstance(value, str):
+        try:
+            return ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError, TypeError):
+            return value
+    return value
+
+class ResponseParser:
+    '''
+    Reads agent data from a response in one pass, repairing the usual slips instead of asking again.
+
+    Markdown fences are dropped and a tag without its closing tag ends at the next tag of the
+    format. The action input is read as a Python literal, then as JSON, then as relaxed JSON.
+    Tool names are matched to the registry regardless of case or a missing " Tool" (any other
+    name is reported rather than guessed, since a near miss may be a different tool), and
+    parameters the tool's schema rejects are coerced to the nearest accepted value. What
+    cannot be repaired is reported, so the model can be told exactly what to fix. A response
+    with native tool calls takes its actions from the calls and only its reasoning from the text.
+
+    Args:
+        registry (Registry): Tools whose names and argument schemas the actions are checked against.
+    '''
+    def __init__(self, registry: Registry):
+        self.registry = registry
+        self.names = {name.casefold(): name for name in registry.tools_registry}
+        self.functions = {function_name(name): name for name in registry.tools_registry}
+
+    def parse(self, text: str) -> ParsedResponse:
+        repairs = []
+        try:
+            data = self.extract(text, repairs)
+            data['actions'] = [self.coerce(action, repairs) for action in data['actions']]
+            return ParsedResponse(agent_data=AgentData.model_validate(data), repairs=repairs)
+        except ValueError as error:
+            return ParsedResponse(repairs=repairs, error=str(error))
+
+    def parse_message(self, message: AIMessage, tool_calling: bool = False) -> ParsedResponse:
+        '''Agent data from the tool calls of a response when it has any, from the text format otherwise.'''
+        if not message.tool_calls and not message.invalid_tool_calls:
+            parsed = self.parse(message_text(message))
+            if tool_calling and not parsed.is_success:
+                # The text format is only a fallback here, so the model is asked for what it left out
+                parsed.error = 'The response has no tool call'
+            return parsed
+        repairs = []
+        try:
+            data = self.extract_reasoning(message_text(message), repairs)
+            actions = [{'name': call['name'], 'params': call['args'], 'call_id': call['id']} for call in message.tool_calls]
+            for call in message.invalid_tool_calls:
+                # Arguments the provider could not read as JSON
+                params, _ = parse_params(call['args'] or '{}')
+                repairs.append(f"relaxed the arguments of {call['name']}")
+                actions.append({'name': call['name'] or '', 'params': params, 'call_id': call['id']})
+            data['actions'] = [self.coerce(action, repairs) for action in actions]
+            return ParsedResponse(agent_data=AgentData.model_validate(data), repairs=repairs)
+        except ValueError as error:
+            return ParsedResponse(repairs=repairs, error=str(error))
+
+    def extract(self, text: str, repairs: list[str]) -> dict:
+        data = self.extract_reasoning(text, repairs)
+        stripped = FENCE_PATTERN.sub('', text)
+        blocks = []
+        if re.search(r'<actions>', stripped, re.IGNORECASE):
+            # Each action of a batch ends at its closing tag, at the next action or at the end of the batch
+            blocks = re.findall(r'<action>(.*?)(?=</action>|<action>|</actions>|$)', stripped, re.DOTALL | re.IGNORECASE)
+        data['actions'] = [self.extract_action(block, repairs) for block in blocks] or [self.extract_action(stripped, repairs)]
+        return data
+
+    def extract_reasoning(self, text: str, repairs: list[str]) -> dict:
+        stripped = FENCE_PATTERN.sub('', text)
+        if stripped != text:
+            repairs.append('dropped markdown fences')
+        data = {}
+        for tag in ('evaluate', 'thought'):
+            content, recovered = find_tag(stripped, tag)
+            if content is None:
+                repairs.append(f'missing <{tag}>')
+                content = ''
+            elif recovered:
+                repairs.append(f'closed <{tag}>')
+            data[tag] = content
+        return data
+
+    def extract_action(self, text: str, repairs: list[str]) -> dict:
+        name, recovered = find_tag(text, 'action_name')
+        if not name:
+            raise ValueError('The response has no <action_name>')
+        if recovered:
+            repairs.append('closed <action_name>')
+        action = {'name': name, 'params': {}}
+        action_input, recovered = find_tag(text, 'action_input')
+        if action_input:
+            if recovered:
+                repairs.append('closed <action_input>')
+            action['params'], relaxed = parse_params(action_input)
+            if relaxed:
+                repairs.append(f'relaxed the input of {name}')
+        expect, _ = find_tag(text, 'expect')
+        if expect:
+            action['expect'] = expect
+        return action
+
+    def coerce(self, action: dict, repairs: list[str]) -> Action:
+        name = self.resolve_name(action['name'])
+        if name != action['name'] and action['name'] not in self.functions:
+            repairs.append(f"renamed '{action['name']}' to '{name}'")
+        params = self.coerce_params(name, action['params'], repairs)
+        return Action.model_validate(action | {'name': name, 'params': params})
+
+    def resolve_name(self, name: str) -> str:
+        '''The registered tool `name` refers to, by its exact, case-insensitive or function name.'''
+        if name in self.registry.tools_registry:
+            return name
+        if name in self.functions:
+            return self.functions[name]
+        key = ' '.join(name.casefold().split())
+        for candidate in (key, f'{key} tool'):
+            if candidate in self.names:
+                return self.names[candidate]
+        raise ValueError(f"Unknown tool '{name}'; the tools are: {', '.join(self.registry.tools_registry)}")
+
+    def coerce_params(self, name: str, params: dict, repairs: list[str]) -> dict:
+        tool = self.registry.tools_registry.get(name)
+        schema = tool.args_schema if tool is not None else None
+        if not isinstance(schema, type) or not issubclass(schema, BaseModel):
+            return params
+        try:
+            schema.model_validate(params)
+            return params
+        except ValidationError as error:
+            issues = error.errors()
+        coerced = dict(params)
+        for issue in issues:
+            field = issue['loc'][0] if issue['loc'] else None
+            if field in coerced:
+                coerced[field] = coerce_value(coerced[field])
+            elif issue['type'] == 'missing' and 'x' in coerced and 'y' in coerced:
+                # Coordinates given as separate x and y instead of the (x, y) parameter
+                coerced[field] = (coerced.pop('x'), coerced.pop('y'))
+        try:
+            schema.model_validate(coerced)
+        except ValidationError:
+            # Left as written: executing the tool reports the error to the model
+            return params
+        repairs.append(f'coerced the input of {name}')
+        return coerced
@@ -0,0 +1,14 @@
+from linux_use.agent.views import AgentData
+from dataclasses import dataclass, field
+from typing import Optional
+
+@dataclass
+class ParsedResponse:
+    '''The agent data read from a response, what had to be repaired to read it, or why it could not be read.'''
+    agent_data: Optional[AgentData] = None
+    repairs: list[str] = field(default_factory=list)
+    error: str = ''
+
+    @property
+    def is_success(self) -> bool:
+        return self.agent_data is not None
@@ -0,0 +1,37 @@
+# Encoder defaults (JPEG is markedly faster and smaller than PNG for full desktop frames)
+DEFAULT_QUALITY = 85
+MIN_QUALITY = 40
+QUALITY_STEP = 10
+
+# Lower bound for the budget-driven downscale, relative to the frame handed to the encoder
+MIN_SCALE = 0.4
+
+# zlib level used for PNG (1 trades a little size for a large speed-up over the default 6)
+PNG_COMPRESS_LEVEL = 1
+
+# Initial capacity of the reusable encode buffer (grown on demand, never shrunk)
+INITIAL_BUFFER_SIZE = 512 * 1024
+
+# libwebp effort (0 is the fastest encoder setting, 6 the slowest)
+WEBP_METHOD = 0
+
+# Frame comparison: side of the difference-hash grid (HASH_SIZE**2 bits)
+HASH_SIZE = 16
+
+# Grey-level gap between neighbouring hash cells below which no edge bit is set (keeps flat areas stable)
+HASH_TOLERANCE = 8
+
+# Hamming distance between frame hashes above which the change is treated as a new scene
+FULL_FRAME_HASH_DISTANCE = 64
+
+# Side (px) of the blocks the pixel difference is reduced to
+BLOCK_SIZE = 16
+
+# Per-pixel grey-level difference below which a pixel counts as unchanged (absorbs scaling noise)
+PIXEL_DIFF_THRESHOLD = 24
+
+# Changed area (fraction of the frame) above which a full frame is sent instead of a crop
+PARTIAL_MAX_AREA = 0.5
+
+# Margin (px, annotated frame) kept around a changed region so labels above boxes stay visible
+CROP_MARGIN = 24
@@ -0,0 +1,252 @@
+from linux_use.agent.screenshot.config import (INITIAL_BUFFER_SIZE, WEBP_METHOD, HASH_SIZE, HASH_TOLERANCE, FULL_FRAME_HASH_DISTANCE,
+BLOCK_SIZE, PIXEL_DIFF_THRESHOLD, PARTIAL_MAX_AREA)
+from linux_use.agent.screenshot.views import EncoderConfig, EncodedScreenshot, ImageFormat, FrameChange, FrameChangeType
+from concurrent.futures import ThreadPoolExecutor, Future
+from PIL.Image import Image as PILImage
+from binascii import b2a_base64
+from time import perf_counter
+from threading import Lock
+from typing import Optional
+from PIL import Image, ImageChops
+from math import sqrt
+
+class EncodeBuffer:
+    '''
+    Write-only file object over a bytearray that keeps its allocation between frames,
+    so steady-state encoding does not reallocate the output buffer.
+    '''
+    def __init__(self, capacity: int = INITIAL_BUFFER_SIZE):
+        self.data = bytearray(capacity)
+        self.length = 0
+
+    def reset(self):
+        self.length = 0
+
+    def write(self, chunk) -> int:
+        size = len(chunk)
+        end = self.length + size
+        if end > len(self.data):
+            self.data.extend(bytes(max(end - len(self.data), len(self.data))))
+        self.data[self.length:end] = chunk
+        self.length = end
+        return size
+
+    def flush(self):
+        pass
+
+    def tell(self) -> int:
+        return self.length
+
+    def view(self) -> memoryview:
+        return memoryview(self.data)[:self.length]
+
+class ScreenshotEncoder:
+    '''
+    Encodes screenshots into data URIs with a configurable format, quality and byte budget.
+
+    When a `target_bytes` budget is set, the quality is lowered step by step (lossy formats only)
+    and then the frame is downscaled until the encoded size fits. The settings that fit the last
+    frame are used as the starting point for the next one, so a steady desktop converges to a
+    single attempt per frame.
+
+    Args:
+        config (EncoderConfig, optional): Encoder settings. Defaults to EncoderConfig().
+    '''
+    def __init__(self, config: Optional[EncoderConfig] = None):
+        self.config = config or EncoderConfig()
+        self.buffer = EncodeBuffer()
+        self.lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='screenshot-encoder')
+        self.hint: Optional[tuple[int, float, int]] = None
+
+    def submit(self, image: PILImage) -> Future[EncodedScreenshot]:
+        '''Encode the image on the encoder's worker thread.'''
+        return self.executor.submit(self.encode, image)
+
+    def encode(self, image: PILImage) -> EncodedScreenshot:
+        start = perf_counter()
+        config = self.config
+        with self.lock:
+            quality, scale = self.get_start_point()
+            attempts = 0
+            while True:
+                attempts += 1
+                frame = self.scale_frame(image, scale)
+                size = self.write_frame(frame, quality)
+                if config.target_bytes is None or size <= config.target_bytes:
+                    break
+                if config.format.is_lossy and quality - config.quality_step >= config.min_quality:
+                    quality -= config.quality_step
+                elif scale > config.min_scale:
+                    # Encoded size grows roughly with the pixel count
+                    scale = max(config.min_scale, scale * sqrt(config.target_bytes / size) * 0.95)
+                else:
+                    break
+            self.hint = (quality, scale, size)
+            with self.buffer.view() as view:
+                payload = b2a_base64(view, newline=False).decode('ascii')
+        return EncodedScreenshot(
+            data_uri=f'data:{config.format.mime_type};base64,{payload}',
+            format=config.format,
+            width=frame.width,
+            height=frame.height,
+            quality=quality if config.format.is_lossy else None,
+            scale=scale,
+            size=size,
+            encode_time=perf_counter() - start,
+            attempts=attempts
+        )
+
+    def get_start_point(self) -> tuple[int, float]:
+        config = self.config
+        if config.target_bytes is None or self.hint is None:
+            return config.quality, 1.0
+        quality, scale, size = self.hint
+        if size * 2 <= config.target_bytes:
+            # Plenty of headroom: undo the last reduction, scale first since it was reduced last
+            if scale < 1.0:
+                scale = min(1.0, scale * 1.25)
+            elif quality < config.quality:
+                quality = min(config.quality, quality + config.quality_step)
+        return quality, scale
+
+    def scale_frame(self, image: PILImage, scale: float) -> PILImage:
+        if scale >= 1.0:
+            return image
+        size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+        return image.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+    def write_frame(self, frame: PILImage, quality: int) -> int:
+        self.buffer.reset()
+        match self.config.format:
+            case ImageFormat.JPEG:
+                if frame.mode not in ('RGB', 'L'):
+                    frame = frame.convert('RGB')
+                frame.save(self.buffer, format='JPEG', quality=quality)
+            case ImageFormat.WEBP:
+                frame.save(self.buffer, format='WEBP', quality=quality, method=WEBP_METHOD)
+            case ImageFormat.PNG:
+                frame.save(self.buffer, format='PNG', compress_level=self.config.png_compress_level)
+        return self.buffer.length
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class FrameComparator:
+    '''
+    Classifies each new frame against the frames the model has already seen.
+
+    Two references are kept: the previous frame (to detect "nothing happened") and the last frame
+    sent in full (to locate what differs from the image the model holds). A perceptual difference
+    hash short-circuits scene changes; otherwise the thresholded pixel difference is box-reduced to
+    a block grid and the bounding box of the changed blocks decides between a crop and a full frame.
+    All pixel work runs inside Pillow's C routines.
+
+    Args:
+        hash_size (int, optional): Side of the difference-hash grid. Defaults to HASH_SIZE.
+        full_frame_hash_distance (int, optional): Hash distance treated as a new scene. Defaults to FULL_FRAME_HASH_DISTANCE.
+        block_size (int, optional): Side of a comparison block in pixels. Defaults to BLOCK_SIZE.
+        pixel_diff_threshold (int, optional): Grey-level difference ignored as noise. Defaults to PIXEL_DIFF_THRESHOLD.
+        partial_max_area (float, optional): Largest changed area (fraction) still sent as a crop. Defaults to PARTIAL_MAX_AREA.
+        window (int, optional): Most recent frames, the new one included, whose images the model still holds. A reference
+            older than that is gone from the conversation, so the next frame is sent in full. Defaults to None (no limit).
+    '''
+    def __init__(self, hash_size: int = HASH_SIZE, full_frame_hash_distance: int = FULL_FRAME_HASH_DISTANCE,
+                 block_size: int = BLOCK_SIZE, pixel_diff_threshold: int = PIXEL_DIFF_THRESHOLD,
+                 partial_max_area: float = PARTIAL_MAX_AREA, window: Optional[int] = None):
+        self.hash_size = hash_size
+        self.full_frame_hash_distance = full_frame_hash_distance
+        self.block_size = block_size
+        self.partial_max_area = partial_max_area
+        self.threshold_lut = [0] * (pixel_diff_threshold + 1) + [255] * (255 - pixel_diff_threshold)
+        self.window = window
+        self.previous: Optional[tuple[PILImage, int]] = None
+        self.reference: Optional[tuple[PILImage, int]] = None
+        self.frame_index = 0
+        self.reference_index = 0
+
+    def reset(self):
+        '''Forget all frames, so the next one is sent in full (e.g. at the start of a task).'''
+        self.previous = None
+        self.reference = None
+        self.frame_index = 0
+        self.reference_index = 0
+
+    def holds_reference(self) -> bool:
+        '''Whether the next frame can still be described against the reference (its image is within the window).'''
+        if self.reference is None:
+            return False
+        return self.window is None or self.frame_index + 1 - self.reference_index < self.window
+
+    def skip(self) -> FrameChange:
+        '''Count a frame known to equal the previous one (e.g. no screen damage since it) without capturing it.'''
+        self.frame_index += 1
+        return FrameChange(type=FrameChangeType.UNCHANGED, frame_index=self.frame_index, reference_index=self.reference_index)
+
+    def compare(self, frame: PILImage) -> FrameChange:
+        '''Classify `frame` (the raw, unannotated capture) and update the references.'''
+        start = perf_counter()
+        gray = frame.convert('L')
+        frame_hash = self.perceptual_hash(gray)
+        previous, reference = self.previous, self.reference if self.holds_reference() else None
+        self.previous = (gray, frame_hash)
+        self.frame_index += 1
+
+        def result(change_type: FrameChangeType, **kwargs) -> FrameChange:
+            if change_type == FrameChangeType.FULL:
+                self.reference = (gray, frame_hash)
+                self.reference_index = self.frame_index
+            return FrameChange(type=change_type, compare_time=perf_counter() - start, frame_index=self.frame_index,
+                               reference_index=self.reference_index, **kwargs)
+
+        # Without a reference the model still holds, an unchanged note or a crop would describe an image it cannot see
+        if reference is None or reference[0].size != gray.size:
+            return result(FrameChangeType.FULL)
+
+        if previous is not None and previous[0].size == gray.size and previous[1] == frame_hash:
+            if self.changed_blocks(gray, previous[0]) is None:
+                return result(FrameChangeType.UNCHANGED)
+
+        hash_distance = (frame_hash ^ reference[1]).bit_count()
+        if hash_distance > self.full_frame_hash_distance:
+            return result(FrameChangeType.FULL, hash_distance=hash_distance)
+
+        changed = self.changed_blocks(gray, reference[0])
+        if changed is None and previous is not None and previous[0].size == gray.size:
+            # Back to the reference frame after a transient change (e.g. a closed tooltip)
+            changed = self.changed_blocks(gray, previous[0])
+        if changed is None:
+            return result(FrameChangeType.UNCHANGED, hash_distance=hash_distance)
+
+        bounding_box, changed_ratio = changed
+        left, top, right, bottom = bounding_box
+        if (right - left) * (bottom - top) > self.partial_max_area * gray.width * gray.height:
+            change_type = FrameChangeType.FULL
+        else:
+            change_type = FrameChangeType.PARTIAL
+        return result(change_type, bounding_box=bounding_box, hash_distance=hash_distance, changed_ratio=changed_ratio)
+
+    def perceptual_hash(self, gray: PILImage) -> int:
+        '''Difference hash: one bit per pair of horizontally adjacent cells, set when the left one is clearly brighter.'''
+        size = self.hash_size
+        cells = gray.resize((size + 1, size), Image.Resampling.BOX).tobytes()
+        frame_hash = 0
+        for row in range(size):
+            offset = row * (size + 1)
+            for column in range(size):
+                if cells[offset + column] > cells[offset + column + 1] + HASH_TOLERANCE:
+                    frame_hash |= 1 << (row * size + column)
+        return frame_hash
+
+    def changed_blocks(self, gray: PILImage, other: PILImage) -> Optional[tuple[tuple[int, int, int, int], float]]:
+        '''Bounding box (frame pixels) of the changed blocks and the fraction of blocks that changed.'''
+        mask = ImageChops.difference(gray, other).point(self.threshold_lut)
+        blocks = mask.reduce(self.block_size)
+        bounding_box = blocks.getbbox()
+        if bounding_box is None:
+            return None
+        total = blocks.width * blocks.height
+        changed_ratio = (total - blocks.histogram()[0]) / total
+        left, top, right, bottom = bounding_box
+        size = self.block_size
+        return (left * size, top * size, min(right * size, gray.width), min(bottom * size, gray.height)), changed_ratio
@@ -0,0 +1,62 @@
+from linux_use.agent.screenshot.config import DEFAULT_QUALITY, MIN_QUALITY, QUALITY_STEP, MIN_SCALE, PNG_COMPRESS_LEVEL
+from dataclasses import dataclass
+from typing import Optional
+from enum import Enum
+
+class ImageFormat(Enum):
+    PNG = 'PNG'
+    JPEG = 'JPEG'
+    WEBP = 'WEBP'
+
+    @property
+    def mime_type(self) -> str:
+        return f'image/{self.value.lower()}'
+
+    @property
+    def is_lossy(self) -> bool:
+        return self is not ImageFormat.PNG
+
+@dataclass
+class EncoderConfig:
+    format: ImageFormat = ImageFormat.JPEG
+    quality: int = DEFAULT_QUALITY
+    min_quality: int = MIN_QUALITY
+    quality_step: int = QUALITY_STEP
+    target_bytes: Optional[int] = None
+    min_scale: float = MIN_SCALE
+    png_compress_level: int = PNG_COMPRESS_LEVEL
+
+@dataclass
+class EncodedScreenshot:
+    data_uri: str
+    format: ImageFormat
+    width: int
+    height: int
+    quality: Optional[int]
+    scale: float
+    size: int
+    encode_time: float
+    attempts: int = 1
+
+    def to_string(self) -> str:
+        quality = f' q={self.quality}' if self.quality is not None else ''
+        return f'{self.format.value} {self.width}x{self.height}{quality} scale={self.scale:.2f} {self.size/1024:.1f} KiB in {self.encode_time*1000:.1f} ms ({self.attempts} attempt(s))'
+
+class FrameChangeType(Enum):
+    UNCHANGED = 'unchanged'
+    PARTIAL = 'partial'
+    FULL = 'full'
+
+@dataclass
+class FrameChange:
+    type: FrameChangeType
+    bounding_box: Optional[tuple[int, int, int, int]] = None
+    hash_distance: int = 0
+    changed_ratio: float = 0.0
+    compare_time: float = 0.0
+    frame_index: int = 1
+    reference_index: int = 1
+
+    def to_string(self) -> str:
+        region = f' region={self.bounding_box}' if self.bounding_box else ''
+        return f'{self.type.value}{region} hash_distance={self.hash_distance} changed_blocks={self.changed_ratio:.1%} in {self.compare_time*1000:.1f} ms'
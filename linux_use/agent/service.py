@@ -1,22 +1,37 @@
 from linux_use.agent.tools.service import (click_tool, type_tool, shell_tool, done_tool,
 shortcut_tool, scroll_tool, drag_tool, move_tool, wait_tool, app_tool, scrape_tool, memory_tool )
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from linux_use.agent.utils import extract_agent_data, image_message
+from langchain_core.messages import HumanMessage, AIMessage, BaseMessage, ToolMessage
+from linux_use.agent.utils import message_text, image_message, ResponseStream
 from langchain_core.language_models.chat_models import BaseChatModel
-from linux_use.agent.registry.service import Registry
+from linux_use.agent.input.views import InputBackend, InputDelays
+from linux_use.agent.screenshot.views import EncoderConfig, FrameChangeType
+from linux_use.agent.observation.views import ObservationFormat
+from linux_use.agent.observation.service import ObservationEncoder
+from linux_use.agent.history.service import HistoryManager, get_image_urls
+from linux_use.agent.history.views import HistoryConfig
+from linux_use.agent.prompt_cache.service import supports_cache_control, cached_system_message, get_cache_stats
+from linux_use.agent.prompt_cache.views import CacheStats
+from linux_use.agent.trajectory.service import TrajectoryStore, record_action, resolve_action
+from linux_use.agent.trajectory.views import RecordedAction
+from linux_use.agent.repair.service import ResponseParser
+from linux_use.agent.settle.views import SettleConfig
+from linux_use.agent.registry.service import Registry, function_name
 from linux_use.agent.registry.views import ToolResult
 from linux_use.agent.desktop.service import Desktop
-from linux_use.agent.desktop.views import Browser
+from linux_use.agent.desktop.views import Browser, DesktopState
 from linux_use.agent.prompt.service import Prompt
 from langgraph.graph import START,END,StateGraph
-from linux_use.agent.views import AgentResult
+from linux_use.agent.views import AgentResult, AgentData, Action
 from linux_use.agent.state import AgentState
+from langchain_core.runnables import RunnableLambda
 from langchain_core.tools import BaseTool
 from contextlib import nullcontext
+from collections import deque
 from rich.markdown import Markdown
 from rich.console import Console
 from termcolor import colored
 from textwrap import shorten
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,6 +41,10 @@ formatter = logging.Formatter('%(message)s')
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
+DONE_TOOLS=set(['Done Tool','Done'])
+# Content of the tool messages answering native tool calls; the results are reported once, in the observation
+TOOL_RESULT_NOTE='The result is in the Action Response of the next state.'
+
 class Agent:
     '''
     Linux Use
@@ -41,11 +60,26 @@ class Agent:
         max_steps (int, optional): Maximum number of steps for the agent. Defaults to 100.
         use_vision (bool, optional): Whether to use vision for the agent. Defaults to False.
         auto_minimize (bool, optional): Whether to automatically minimize the IDE while agent is working. Defaults to False.
+        screenshot_config (EncoderConfig, optional): Format, quality and byte budget of the screenshots sent in vision mode. Defaults to None (JPEG, quality 85, no budget).
+        compare_frames (bool, optional): Whether to skip unchanged screenshots and send only the changed region in vision mode. The full screenshot they refer to stays in the conversation beyond `keep_images`. Defaults to True.
+        launch_timeout (float, optional): Seconds `App Tool` waits for a launched app's window to appear. Defaults to 10.
+        input_backend (InputBackend, optional): Backend for pointer and keyboard input ('xtest' or 'pyautogui'). Defaults to 'xtest' (falls back to pyautogui without XTEST).
+        input_delays (InputDelays, optional): Settle delay after each kind of input action. Defaults to None (InputDelays()).
+        accessible_clicks (bool, optional): Whether single left clicks on accessibility-tree elements use the element's action instead of the pointer. Defaults to True.
+        settle_config (SettleConfig, optional): Quiet window and bounds of the wait for the UI to settle before each observation. Defaults to None (SettleConfig()).
+        display_name (str, optional): X display the agent drives, e.g. ':99' for an Xvfb server. Defaults to None ($DISPLAY).
+        atspi_bus (str, optional): Address of that display's AT-SPI bus. Defaults to None (the bus the display publishes).
+        observation_format (ObservationFormat, optional): How apps and elements are written into observations ('table' or the more compact 'compact'). Defaults to 'table'.
+        history_config (HistoryConfig, optional): Steps sent verbatim, the token ceiling of the history (older steps are sent as one summary line each) and the number of screenshots kept. Defaults to None (HistoryConfig()).
+        max_batch_actions (int, optional): Maximum number of actions executed from one response before observing again. Defaults to 5.
+        trajectory_store (TrajectoryStore, optional): Store of successful runs. Finished tasks are recorded, and a task recorded before is replayed without the LLM while its elements can be found in the live tree. Runs are stored as plain JSON, typed text included except in password fields. Defaults to None (no recording or replay).
+        tool_calling (bool, optional): Whether to bind the tools to the LLM and read its actions from native tool calls instead of the XML output format. Needs a model with tool calling. Defaults to False.
+        stream_responses (bool, optional): Whether to stream the LLM's responses and act as soon as the action input is complete, dropping the rest of the generation. Defaults to False.
 
     Returns:
         Agent
     '''
-    def __init__(self,instructions:list[str]=[],additional_tools:list[BaseTool]=[],browser:Browser=Browser.FIREFOX, llm: BaseChatModel=None,max_consecutive_failures:int=3,max_steps:int=25,use_vision:bool=False,auto_minimize:bool=False):
+    def __init__(self,instructions:list[str]=[],additional_tools:list[BaseTool]=[],browser:Browser=Browser.FIREFOX, llm: BaseChatModel=None,max_consecutive_failures:int=3,max_steps:int=25,use_vision:bool=False,auto_minimize:bool=False,screenshot_config:EncoderConfig=None,compare_frames:bool=True,launch_timeout:float=10.0,input_backend:InputBackend=InputBackend.XTEST,input_delays:InputDelays=None,accessible_clicks:bool=True,settle_config:SettleConfig=None,display_name:str=None,atspi_bus:str=None,observation_format:ObservationFormat=ObservationFormat.TABLE,history_config:HistoryConfig=None,max_batch_actions:int=5,trajectory_store:TrajectoryStore=None,tool_calling:bool=False,stream_responses:bool=False):
         self.name='Linux Use'
         self.description='An agent that can interact with GUI elements on Linux desktop environments' 
         self.registry = Registry([
@@ -56,32 +90,109 @@ class Agent:
         self.instructions=instructions
         self.browser=browser
         self.max_steps=max_steps
+        self.max_batch_actions=max_batch_actions
+        self.observation_encoder=ObservationEncoder(observation_format)
+        self.parser=ResponseParser(self.registry)
+        self.history=HistoryManager(history_config,parser=self.parser)
+        # Data URI of the last full frame, which crops and unchanged notes are described against
+        self.reference_image:str|None=None
+        self.trajectory_store=trajectory_store
+        self.recorded_actions:list[RecordedAction]=[]
+        self.replay:deque[RecordedAction]=deque()
+        self.replay_total=0
+        self.completed=False
         self.consecutive_failures=max_consecutive_failures
         self.auto_minimize=auto_minimize
         self.use_vision=use_vision
         self.llm = llm
-        self.desktop = Desktop()
+        self.tool_calling=tool_calling
+        self.chat_llm=llm.bind_tools(self.registry.get_tool_definitions()) if tool_calling else llm
+        # Anthropic models cache the system prompt (and the tool catalog in it) only when marked
+        self.cache_control=supports_cache_control(llm)
+        self.cache_stats=CacheStats()
+        # Tool calls are only complete at the end of the stream, so streaming stops early in the XML format only
+        self.stream_responses=stream_responses and not tool_calling
+        # The reference frame is pinned in the conversation, so the comparator needs no retention window
+        self.desktop = Desktop(encoder_config=screenshot_config,compare_frames=compare_frames,launch_timeout=launch_timeout,input_backend=input_backend,input_delays=input_delays,accessible_clicks=accessible_clicks,settle_config=settle_config,display_name=display_name,atspi_bus=atspi_bus)
         self.console=Console()
         self.graph=self.create_graph()
 
     def reason(self,state:AgentState):
-        steps=state.get('steps')
-        max_steps=state.get('max_steps')
-        max_consecutive_failures=state.get('max_consecutive_failures')
         consecutive_failures=state.get('consecutive_failures')
-        messages=state.get('messages')
+        agent_data=self.replay_step()
+        if agent_data is not None:
+            return self.reasoned(state=state,agent_data=agent_data,consecutive_failures=consecutive_failures,error='')
         error=''
-        
-        while consecutive_failures<=max_consecutive_failures:
-            message=self.llm.invoke(messages)
-            try:
-                agent_data = extract_agent_data(message=message)
+        messages=self.history.view(state.get('messages'),pinned=self.reference_image)
+        self.log_payload(messages)
+        while consecutive_failures<=state.get('max_consecutive_failures'):
+            message=self.stream(messages) if self.stream_responses else self.chat_llm.invoke(messages)
+            self.record_cache_stats(message)
+            agent_data,error=self.parse_response(message=message,consecutive_failures=consecutive_failures)
+            if agent_data is not None:
                 break
-            except Exception as e:
-                error=e
-                print(message.content)
-                logger.error(f"[Retry {consecutive_failures}] Failed to extract agent data\nError:{e}")
-                consecutive_failures+=1
+            messages=messages+self.correction_messages(message=message,error=error)
+            consecutive_failures+=1
+        return self.reasoned(state=state,agent_data=agent_data,consecutive_failures=consecutive_failures,error=error)
+
+    async def areason(self,state:AgentState):
+        consecutive_failures=state.get('consecutive_failures')
+        agent_data=self.replay_step()
+        if agent_data is not None:
+            return self.reasoned(state=state,agent_data=agent_data,consecutive_failures=consecutive_failures,error='')
+        error=''
+        messages=self.history.view(state.get('messages'),pinned=self.reference_image)
+        self.log_payload(messages)
+        while consecutive_failures<=state.get('max_consecutive_failures'):
+            message=await self.astream(messages) if self.stream_responses else await self.chat_llm.ainvoke(messages)
+            self.record_cache_stats(message)
+            agent_data,error=self.parse_response(message=message,consecutive_failures=consecutive_failures)
+            if agent_data is not None:
+                break
+            messages=messages+self.correction_messages(message=message,error=error)
+            consecutive_failures+=1
+        return self.reasoned(state=state,agent_data=agent_data,consecutive_failures=consecutive_failures,error=error)
+
+    def stream(self,messages:list[BaseMessage])->AIMessage:
+        response=ResponseStream()
+        chunks=self.llm.stream(messages)
+        try:
+            for chunk in chunks:
+                if response.feed(chunk):
+                    break
+        finally:
+            # Closing the generator ends the provider's stream instead of reading it to the end
+            chunks.close()
+        return response.message()
+
+    async def astream(self,messages:list[BaseMessage])->AIMessage:
+        response=ResponseStream()
+        chunks=self.llm.astream(messages)
+        try:
+            async for chunk in chunks:
+                if response.feed(chunk):
+                    break
+        finally:
+            await chunks.aclose()
+        return response.message()
+
+    def parse_response(self,message:AIMessage,consecutive_failures:int)->tuple[AgentData|None,str]:
+        parsed=self.parser.parse_message(message,tool_calling=self.tool_calling)
+        if parsed.repairs and parsed.is_success:
+            logger.info(colored(f"🩹: Repaired the response ({', '.join(parsed.repairs)})",color='light_yellow'))
+        if not parsed.is_success:
+            print(message.content)
+            logger.error(f"[Retry {consecutive_failures}] Failed to extract agent data\nError:{parsed.error}")
+        return parsed.agent_data,parsed.error
+
+    def correction_messages(self,message:AIMessage,error:str)->list[BaseMessage]:
+        '''The unreadable response and what was wrong with it, so the retry corrects it instead of sampling the same context again.'''
+        return [AIMessage(content=message_text(message)),HumanMessage(content=Prompt.correction_prompt(error=error,tool_calling=self.tool_calling))]
+
+    def reasoned(self,state:AgentState,agent_data:AgentData|None,consecutive_failures:int,error:Exception|str):
+        steps=state.get('steps')
+        max_steps=state.get('max_steps')
+        max_consecutive_failures=state.get('max_consecutive_failures')
         if consecutive_failures>max_consecutive_failures:
             return {**state,'agent_data':None,'error':f"Failed to extract agent data after {max_consecutive_failures} retries.\nError:{error}"}
 
@@ -89,58 +200,227 @@ class Agent:
         logger.info(colored(f"📝: Evaluate: {agent_data.evaluate}",color='yellow',attrs=['bold']))
         logger.info(colored(f"💭: Thought: {agent_data.thought}",color='light_magenta',attrs=['bold']))
 
-        last_message = state.get('messages').pop()
+        messages=state.get('messages')
+        last_message = messages.pop()
         if isinstance(last_message, HumanMessage):
-            message=HumanMessage(content=Prompt.previous_observation_prompt(steps=steps,max_steps=max_steps,observation=state.get('previous_observation')))
+            prompt=Prompt.previous_observation_prompt(steps=steps,max_steps=max_steps,observation=state.get('previous_observation'))
+            # The observation stays in the history as its action result, with its screenshot while that is among the most recent ones or is the reference frame
+            images=[image for image in get_image_urls(last_message)[:1] if self.history.config.keep_images>1 or image==self.reference_image]
+            message=image_message(prompt=prompt,image=images[0]) if images else HumanMessage(content=prompt)
+            # Room for the next observation's screenshot and, if kept, this one
+            self.history.retain_images(messages,keep=self.history.config.keep_images-1-len(images),pinned=self.reference_image)
             return {**state,'agent_data':agent_data,'messages':[message],'steps':steps+1}
-        
+
     def action(self,state:AgentState):
-        steps=state.get('steps')
-        max_steps=state.get('max_steps')
         agent_data=state.get('agent_data')
-        name = agent_data.action.name
-        params = agent_data.action.params
-        logger.info(colored(f"🔧: Action: {name}({', '.join(f'{k}={v}' for k, v in params.items())})",color='blue',attrs=['bold']))
-        ai_message = AIMessage(content=Prompt.action_prompt(agent_data=agent_data))
-        tool_result = self.registry.execute(tool_name=name, desktop=self.desktop, **params)
+        results=[]
+        for index,action in enumerate(agent_data.actions[:self.max_batch_actions]):
+            if index>0:
+                # Let the previous action land before checking the screen and acting on it again
+                self.desktop.settle.wait()
+            reason=self.check_action(action=action)
+            if reason:
+                results.append((action,reason))
+                break
+            self.log_action(action=action)
+            tool_result = self.registry.execute(tool_name=action.name, desktop=self.desktop, **action.params)
+            self.log_observation(tool_result=tool_result)
+            results.append((action,tool_result))
+            if not tool_result.is_success:
+                self.stop_replay(reason=f'{action.name} failed')
+                break
+            self.record_action(action=action)
+        desktop_state = self.desktop.get_state(use_vision=self.use_vision)
+        return self.acted(state=state,tool_result=self.batch_result(agent_data=agent_data,results=results),desktop_state=desktop_state)
+
+    async def aaction(self,state:AgentState):
+        agent_data=state.get('agent_data')
+        results=[]
+        for index,action in enumerate(agent_data.actions[:self.max_batch_actions]):
+            if index>0:
+                await self.desktop.settle.await_settled()
+            reason=await asyncio.to_thread(self.check_action,action=action)
+            if reason:
+                results.append((action,reason))
+                break
+            self.log_action(action=action)
+            tool_result = await self.registry.aexecute(tool_name=action.name, desktop=self.desktop, **action.params)
+            self.log_observation(tool_result=tool_result)
+            results.append((action,tool_result))
+            if not tool_result.is_success:
+                self.stop_replay(reason=f'{action.name} failed')
+                break
+            self.record_action(action=action)
+        desktop_state = await self.desktop.aget_state(use_vision=self.use_vision)
+        return self.acted(state=state,tool_result=self.batch_result(agent_data=agent_data,results=results),desktop_state=desktop_state)
+
+    def start_trajectory(self,query:str):
+        self.recorded_actions=[]
+        self.completed=False
+        trajectory=self.trajectory_store.get(query) if self.trajectory_store is not None else None
+        self.replay=deque(trajectory.actions if trajectory is not None else [])
+        self.replay_total=len(self.replay)
+        if self.replay:
+            logger.info(colored(f"🎬: Replaying a recorded run of this task ({self.replay_total} actions)",color='light_blue',attrs=['bold']))
+
+    def replay_step(self)->AgentData|None:
+        '''The next recorded action, moved onto the live elements, or None once the LLM has to decide.'''
+        if not self.replay:
+            return None
+        desktop_state=self.desktop.desktop_state
+        action=resolve_action(self.replay[0],desktop_state.tree_state) if desktop_state is not None else None
+        if action is None:
+            self.stop_replay(reason=f'{self.replay[0].name} cannot be replayed on this screen')
+            return None
+        self.replay.popleft()
+        number=self.replay_total-len(self.replay)
+        return AgentData(evaluate='Neutral - replaying a recorded run of this task.',thought=f'Recorded action {number} of {self.replay_total}.',actions=[action])
+
+    def stop_replay(self,reason:str):
+        if self.replay:
+            logger.info(colored(f"🎬: Replay stopped, {reason}; continuing with the LLM",color='light_blue',attrs=['bold']))
+            self.replay.clear()
+
+    def record_action(self,action:Action):
+        if self.trajectory_store is None:
+            return
+        desktop_state=self.desktop.desktop_state
+        # Element parameters refer to the observation the action was chosen from, which is still the latest one
+        self.recorded_actions.append(record_action(action,desktop_state.tree_state if desktop_state is not None else None))
+
+    def finish_trajectory(self,query:str):
+        if self.trajectory_store is not None and self.completed and self.recorded_actions:
+            self.trajectory_store.record(query,self.recorded_actions)
 
+    def check_action(self,action:Action)->str:
+        '''Why the action must not run (empty if it may).'''
+        if action.name in DONE_TOOLS:
+            return f'`{action.name}` must be the only action of a step'
+        if action.expect is None:
+            return ''
+        in_place=self.desktop.is_element_in_place(action.expect)
+        if in_place is None:
+            # Without the accessibility tree the guard cannot tell, so the action runs as if unguarded
+            logger.info(colored(f"⚠️: Cannot check element {action.expect} before {action.name}, running it unguarded",color='yellow'))
+        elif not in_place:
+            return f'element {action.expect} is no longer in place, so the screen changed unexpectedly'
+        return ''
+
+    def batch_result(self,agent_data:AgentData,results:list[tuple[Action,ToolResult|str]])->ToolResult:
+        '''One result for the actions of a step: the tool's own for a single action, a numbered report for a batch.'''
+        if not agent_data.is_batch and isinstance(results[0][1],ToolResult):
+            return results[0][1]
+        lines=[]
+        is_success=True
+        for number,(action,result) in enumerate(results,start=1):
+            if isinstance(result,str):
+                logger.info(colored(f"⛔: Stopped before {action.name}: {result}",color='red',attrs=['bold']))
+                lines.append(f'{number}. {action.name}: not executed, {result}.')
+                is_success=False
+            else:
+                lines.append(f'{number}. {action.name}: {result.content if result.is_success else result.error}')
+                is_success=is_success and result.is_success
+        skipped=len(agent_data.actions)-len(results)
+        if skipped:
+            lines.append(f'The remaining {skipped} action(s) were not executed.')
+        report='\n'.join(lines)
+        if is_success:
+            return ToolResult(is_success=True,content=report)
+        return ToolResult(is_success=False,error=report)
+
+    def log_action(self,action:Action):
+        logger.info(colored(f"🔧: Action: {action.name}({', '.join(f'{k}={v}' for k, v in action.params.items())})",color='blue',attrs=['bold']))
+
+    def log_observation(self,tool_result:ToolResult):
         observation=tool_result.content if tool_result.is_success else tool_result.error
-        previous_observation=observation
         logger.info(colored(f"🔭: Observation: {shorten(observation,500,placeholder='...')}",color='green',attrs=['bold']))
-        desktop_state = self.desktop.get_state(use_vision=self.use_vision)
-        prompt=Prompt.observation_prompt(query=state.get('input'),steps=steps,max_steps=max_steps, tool_result=tool_result, desktop_state=desktop_state)
-        human_message=image_message(prompt=prompt,image=desktop_state.screenshot) if self.use_vision and desktop_state.screenshot else HumanMessage(content=prompt)
-        return {**state,'agent_data':None,'messages':[ai_message, human_message],'previous_observation':previous_observation}
 
-    def answer(self,state:AgentState):
+    def acted(self,state:AgentState,tool_result:ToolResult,desktop_state:DesktopState):
         steps=state.get('steps')
         max_steps=state.get('max_steps')
         agent_data=state.get('agent_data')
-        name = agent_data.action.name
-        params = agent_data.action.params
-        if steps<max_steps:
-            tool_result = self.registry.execute(tool_name=name, desktop=None, **params)
+        ai_messages=self.tool_call_messages(agent_data=agent_data,steps=steps) if self.tool_calling else [AIMessage(content=Prompt.action_prompt(agent_data=agent_data))]
+        previous_observation=tool_result.content if tool_result.is_success else tool_result.error
+        self.log_desktop_state(desktop_state)
+        prompt=Prompt.observation_prompt(query=state.get('input'),steps=steps,max_steps=max_steps, tool_result=tool_result, desktop_state=desktop_state, encoder=self.observation_encoder)
+        human_message=self.observation_message(prompt=prompt,desktop_state=desktop_state)
+        return {**state,'agent_data':None,'messages':[*ai_messages, human_message],'previous_observation':previous_observation}
+
+    def tool_call_messages(self,agent_data:AgentData,steps:int)->list[BaseMessage]:
+        '''The step as the model's tool calls, each answered by a tool message; the results themselves follow in the observation.'''
+        call_ids=[action.call_id or f'call_{steps}_{index}' for index,action in enumerate(agent_data.actions)]
+        tool_calls=[{'name':function_name(action.name),'args':action.params,'id':call_id} for action,call_id in zip(agent_data.actions,call_ids)]
+        ai_message=AIMessage(content=Prompt.tool_call_prompt(agent_data=agent_data),tool_calls=tool_calls)
+        return [ai_message]+[ToolMessage(content=TOOL_RESULT_NOTE,tool_call_id=call_id) for call_id in call_ids]
+
+    def answer(self,state:AgentState):
+        agent_data=state.get('agent_data')
+        if state.get('steps')<state.get('max_steps'):
+            tool_result = self.registry.execute(tool_name=agent_data.action.name, desktop=None, **agent_data.action.params)
+        else:
+            tool_result=ToolResult(is_success=False,content="The agent has reached the maximum number of steps.")
+        return self.answered(state=state,tool_result=tool_result)
+
+    async def aanswer(self,state:AgentState):
+        agent_data=state.get('agent_data')
+        if state.get('steps')<state.get('max_steps'):
+            tool_result = await self.registry.aexecute(tool_name=agent_data.action.name, desktop=None, **agent_data.action.params)
         else:
             tool_result=ToolResult(is_success=False,content="The agent has reached the maximum number of steps.")
-        ai_message = AIMessage(content=Prompt.answer_prompt(agent_data=agent_data, tool_result=tool_result))
+        return self.answered(state=state,tool_result=tool_result)
+
+    def answered(self,state:AgentState,tool_result:ToolResult):
+        ai_message = AIMessage(content=Prompt.answer_prompt(agent_data=state.get('agent_data'), tool_result=tool_result))
         logger.info(colored(f"📜: Final Answer: {shorten(tool_result.content,500,placeholder='...')}",color='cyan',attrs=['bold']))
+        self.completed=tool_result.is_success
         return {**state,'agent_data':None,'messages':[ai_message],'previous_observation':None,'output':tool_result.content}
 
+    def record_cache_stats(self,message:AIMessage):
+        stats=get_cache_stats(message)
+        if stats is None:
+            return
+        self.cache_stats=self.cache_stats.add(stats)
+        logger.info(colored(f"🗄️: Prompt Cache: {stats.to_string()} (task: {self.cache_stats.hit_ratio:.0%} over {self.cache_stats.calls} calls)",color='light_blue',attrs=['bold']))
+
+    def log_payload(self,messages:list[BaseMessage]):
+        logger.info(colored(f"📦: Request: {self.history.report(messages).to_string()}",color='light_blue',attrs=['bold']))
+
+    def log_desktop_state(self,desktop_state:DesktopState):
+        logger.info(colored(f"⏱️: Desktop State: {desktop_state.timings_to_string()}",color='light_blue',attrs=['bold']))
+        if desktop_state.frame_change is not None:
+            logger.info(colored(f"🎞️: Frame: {desktop_state.frame_change.to_string()}",color='light_blue',attrs=['bold']))
+        screenshot_info=desktop_state.screenshot_info
+        if screenshot_info is not None:
+            logger.info(colored(f"🖼️: Screenshot: {screenshot_info.to_string()}",color='light_blue',attrs=['bold']))
+
+    def observation_message(self,prompt:str,desktop_state:DesktopState)->HumanMessage:
+        if not desktop_state.settled:
+            prompt=f'{prompt}\nNote: the screen was still changing when this state was captured (e.g. a page still loading).'
+        if desktop_state.screenshot_note:
+            prompt=f'{prompt}\n{desktop_state.screenshot_note}'
+        frame_change=desktop_state.frame_change
+        if frame_change is not None and frame_change.type==FrameChangeType.FULL:
+            self.reference_image=desktop_state.screenshot
+        if self.use_vision and desktop_state.screenshot:
+            return image_message(prompt=prompt,image=desktop_state.screenshot)
+        return HumanMessage(content=prompt)
+
     def main_controller(self,state:AgentState):
         if state.get("error"):
             return END
         if state.get('steps')<state.get('max_steps'):
             agent_data=state.get('agent_data')
             action_name=agent_data.action.name
-            if action_name not in set(['Done Tool','Done']):
+            if action_name not in DONE_TOOLS:
                 return 'action'
         return 'answer'    
 
     def create_graph(self):
         graph=StateGraph(AgentState)
-        graph.add_node('reason',self.reason)
-        graph.add_node('action',self.action)
-        graph.add_node('answer',self.answer)
+        # Each node has a sync and an async body: graph.invoke runs the first, graph.ainvoke the second
+        graph.add_node('reason',RunnableLambda(self.reason,afunc=self.areason))
+        graph.add_node('action',RunnableLambda(self.action,afunc=self.aaction))
+        graph.add_node('answer',RunnableLambda(self.answer,afunc=self.aanswer))
 
         graph.add_edge(START,'reason')
         graph.add_conditional_edges('reason',self.main_controller)
@@ -151,28 +431,34 @@ class Agent:
 
     def invoke(self,query: str)->AgentResult:
         with (self.desktop.auto_minimize() if self.auto_minimize else nullcontext()):
+            if self.desktop.frame_comparator is not None:
+                self.desktop.frame_comparator.reset()
             desktop_state = self.desktop.get_state(use_vision=self.use_vision)
-            language=self.desktop.get_default_language()
-            tools_prompt = self.registry.get_tools_prompt()
-            system_prompt=Prompt.system_prompt(desktop=self.desktop,browser=self.browser,language=language,instructions=self.instructions,tools_prompt=tools_prompt,max_steps=self.max_steps)
-            system_message=SystemMessage(content=system_prompt)
-            human_prompt=Prompt.observation_prompt(query=query,steps=1,max_steps=self.max_steps,tool_result=ToolResult(is_success=True, content="The desktop is ready to operate."), desktop_state=desktop_state)
-            human_message=image_message(prompt=human_prompt,image=desktop_state.screenshot) if self.use_vision and desktop_state.screenshot else HumanMessage(content=human_prompt)
-            messages=[system_message,human_message]
-            state={
-                'input':query,
-                'steps':1,
-                'max_steps':self.max_steps,
-                'output':'',
-                'error':'',
-                'consecutive_failures':1,
-                'max_consecutive_failures':self.consecutive_failures,
-                'agent_data':None,
-                'messages':messages,
-                'previous_observation':None
-            }
+            state=self.initial_state(query=query,desktop_state=desktop_state)
+            try:
+                response=self.graph.invoke(state,config={'recursion_limit':self.max_steps*10})
+                self.finish_trajectory(query=query)
+            except Exception as error:
+                response={
+                    'output':None,
+                    'error':f"Error: {error}"
+                }
+        return AgentResult(content=response['output'], error=response['error'])
+
+    async def ainvoke(self,query: str)->AgentResult:
+        '''
+        `invoke` on the asyncio loop: LLM calls, waits and observations are awaited, and input
+        tools run in the loop's executor, so several agents (each with its own display) or a UI
+        can share one loop.
+        '''
+        with (self.desktop.auto_minimize() if self.auto_minimize else nullcontext()):
+            if self.desktop.frame_comparator is not None:
+                self.desktop.frame_comparator.reset()
+            desktop_state = await self.desktop.aget_state(use_vision=self.use_vision)
+            state=self.initial_state(query=query,desktop_state=desktop_state)
             try:
-                response=self.graph.invoke(state,config={'recursion_limit':self.max_steps*10})         
+                response=await self.graph.ainvoke(state,config={'recursion_limit':self.max_steps*10})
+                self.finish_trajectory(query=query)
             except Exception as error:
                 response={
                     'output':None,
@@ -180,6 +466,39 @@ class Agent:
                 }
         return AgentResult(content=response['output'], error=response['error'])
 
+    def initial_state(self,query:str,desktop_state:DesktopState)->AgentState:
+        self.log_desktop_state(desktop_state)
+        language=self.desktop.get_default_language()
+        # Bound tools carry their schemas, so the prompt only maps their names to the functions
+        tools_prompt = self.registry.get_tool_names_prompt() if self.tool_calling else self.registry.get_tools_prompt()
+        system_prompt=Prompt.system_prompt(desktop=self.desktop,browser=self.browser,language=language,instructions=self.instructions,tools_prompt=tools_prompt,max_steps=self.max_steps,max_batch_actions=self.max_batch_actions,tool_calling=self.tool_calling)
+        system_message=cached_system_message(prompt=system_prompt,cache_control=self.cache_control)
+        self.cache_stats=CacheStats()
+        self.start_trajectory(query=query)
+        human_prompt=Prompt.observation_prompt(query=query,steps=1,max_steps=self.max_steps,tool_result=ToolResult(is_success=True, content="The desktop is ready to operate."), desktop_state=desktop_state, encoder=self.observation_encoder)
+        human_message=self.observation_message(prompt=human_prompt,desktop_state=desktop_state)
+        messages=[system_message,human_message]
+        return {
+            'input':query,
+            'steps':1,
+            'max_steps':self.max_steps,
+            'output':'',
+            'error':'',
+            'consecutive_failures':1,
+            'max_consecutive_failures':self.consecutive_failures,
+            'agent_data':None,
+            'messages':messages,
+            'previous_observation':None
+        }
+
     def print_response(self,query: str):
         response=self.invoke(query)
         self.console.print(Markdown(response.content or response.error))
+
+    async def aprint_response(self,query: str):
+        response=await self.ainvoke(query)
+        self.console.print(Markdown(response.content or response.error))
+
+    def close(self):
+        '''Release the desktop: its worker threads, shell sessions and X connections. The agent is unusable afterwards.'''
+        self.desktop.close()
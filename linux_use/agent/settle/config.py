@@ -0,0 +1,28 @@
+# The UI counts as settled once no damage or accessibility event arrived for this long (s)
+QUIET_WINDOW = 0.1
+
+# Bounds (s) on a single settle wait
+MIN_SETTLE_WAIT = 0.0
+MAX_SETTLE_WAIT = 3.0
+
+# Wait (s) used instead when no activity source is available (no X server, no DAMAGE, no AT-SPI)
+FALLBACK_SETTLE_WAIT = 0.3
+
+# Time (s) the first wait gives the monitors to connect
+MONITOR_STARTUP_TIMEOUT = 0.5
+
+# Interval (s) between dispatches of pending AT-SPI events; other pyatspi calls can run in between
+ACCESSIBILITY_DISPATCH_INTERVAL = 0.02
+
+# AT-SPI events that mean the UI is still changing
+ACCESSIBILITY_EVENTS = [
+    'object:children-changed',
+    'object:state-changed',
+    'object:property-change',
+    'object:text-changed',
+    'object:bounds-changed',
+    'window:create',
+    'window:destroy',
+    'document:load-complete',
+    'document:reload'
+]
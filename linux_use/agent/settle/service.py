@@ -0,0 +1,159 @@
+from linux_use.agent.settle.config import FALLBACK_SETTLE_WAIT, MONITOR_STARTUP_TIMEOUT, ACCESSIBILITY_EVENTS, ACCESSIBILITY_DISPATCH_INTERVAL
+from linux_use.agent.display.service import atspi_lock
+from linux_use.agent.settle.views import SettleConfig, SettleResult
+from linux_use.agent.damage.service import DamageTracker
+from abc import ABC, abstractmethod
+from threading import Thread, Event, Lock
+from time import monotonic, sleep
+from typing import Optional
+import asyncio
+
+# Try to import AT-SPI2 libraries
+try:
+    import pyatspi
+    from gi.repository import GLib
+    ATSPI_AVAILABLE = True
+except ImportError:
+    ATSPI_AVAILABLE = False
+
+class ActivityMonitor(ABC):
+    '''Records the time of the latest UI activity seen by a background listener thread.'''
+    name: str = 'activity'
+
+    def __init__(self):
+        self.last_activity = 0.0
+        self.available = False
+        self.ready = Event()
+        self.thread: Optional[Thread] = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = Thread(target=self.run_listener, name=f'settle-{self.name}', daemon=True)
+            self.thread.start()
+
+    def run_listener(self):
+        try:
+            self.listen()
+        except Exception:
+            # Source unavailable or connection lost: stop counting it as a signal
+            self.available = False
+        finally:
+            self.ready.set()
+
+    @abstractmethod
+    def listen(self):
+        pass
+
+    def touch(self):
+        self.last_activity = monotonic()
+
+class AccessibilityMonitor(ActivityMonitor):
+    '''
+    Tree, state and text changes reported on the AT-SPI bus (e.g. a page still building its DOM).
+
+    libatspi is not thread-safe, so instead of running the registry's main loop next to the
+    tree reads, the pending events are dispatched in short rounds under `atspi_lock`, the
+    lock every other pyatspi call holds.
+    '''
+    name = 'accessibility'
+
+    def listen(self):
+        if not ATSPI_AVAILABLE:
+            return
+        context = GLib.MainContext.default()
+        with atspi_lock:
+            pyatspi.Registry.registerEventListener(self.on_event, *ACCESSIBILITY_EVENTS)
+        while True:
+            with atspi_lock:
+                while context.pending():
+                    context.iteration(False)
+            if not self.ready.is_set():
+                # Events are being dispatched from here on
+                self.available = True
+                self.ready.set()
+            sleep(ACCESSIBILITY_DISPATCH_INTERVAL)
+
+    def on_event(self, event):
+        self.touch()
+
+accessibility_monitor: Optional[AccessibilityMonitor] = None
+accessibility_monitor_lock = Lock()
+
+def get_accessibility_monitor() -> AccessibilityMonitor:
+    '''Return the process-wide AT-SPI monitor (pyatspi runs one registry loop per process).'''
+    global accessibility_monitor
+    with accessibility_monitor_lock:
+        if accessibility_monitor is None:
+            accessibility_monitor = AccessibilityMonitor()
+            accessibility_monitor.start()
+        return accessibility_monitor
+
+class SettleDetector:
+    '''
+    Waits until the UI is idle instead of sleeping for a fixed time.
+
+    The UI counts as settled once neither screen damage nor accessibility events have arrived
+    for `quiet_window` seconds since the wait began, bounded by `min_wait` and `max_wait`.
+    A click that repaints a button settles within a few tens of milliseconds; a page load keeps
+    the wait going until rendering stops (or `max_wait`).
+
+    Args:
+        config (SettleConfig, optional): Quiet window and bounds. Defaults to SettleConfig().
+        display_name (str, optional): X display to watch. Defaults to None ($DISPLAY).
+        monitors (list[ActivityMonitor | DamageTracker], optional): Activity sources. Defaults to screen damage and AT-SPI events.
+        accessibility (bool, optional): Whether the default sources include AT-SPI events. Defaults to True.
+        damage_tracker (DamageTracker, optional): Screen damage source shared with other consumers. Defaults to None (its own).
+    '''
+    def __init__(self, config: Optional[SettleConfig] = None, display_name: Optional[str] = None,
+                 monitors: Optional[list[ActivityMonitor | DamageTracker]] = None, accessibility: bool = True,
+                 damage_tracker: Optional[DamageTracker] = None):
+        self.config = config or SettleConfig()
+        if monitors is None:
+            monitors = [damage_tracker or DamageTracker(display_name)] + ([get_accessibility_monitor()] if accessibility else [])
+        self.monitors = monitors
+        for monitor in self.monitors:
+            monitor.start()
+
+    def wait(self, config: Optional[SettleConfig] = None) -> SettleResult:
+        config = config or self.config
+        start = monotonic()
+        monitors = [monitor for monitor in self.monitors if monitor.ready.wait(MONITOR_STARTUP_TIMEOUT) and monitor.available]
+        while True:
+            result, delay = self.check(config, start, monitors)
+            if result is not None:
+                return result
+            sleep(delay)
+
+    async def await_settled(self, config: Optional[SettleConfig] = None) -> SettleResult:
+        '''`wait` for the asyncio loop: sleeps on the loop instead of blocking its thread.'''
+        config = config or self.config
+        start = monotonic()
+        for monitor in self.monitors:
+            if not monitor.ready.is_set():
+                # Only while the monitors connect, normally during the first wait
+                await asyncio.to_thread(monitor.ready.wait, MONITOR_STARTUP_TIMEOUT)
+        monitors = [monitor for monitor in self.monitors if monitor.ready.is_set() and monitor.available]
+        while True:
+            result, delay = self.check(config, start, monitors)
+            if result is not None:
+                return result
+            await asyncio.sleep(delay)
+
+    def check(self, config: SettleConfig, start: float, monitors: list) -> tuple[Optional[SettleResult], float]:
+        '''The result once the wait that began at `start` is over, otherwise how long to sleep before checking again.'''
+        now = monotonic()
+        if not monitors:
+            end = start + min(FALLBACK_SETTLE_WAIT, config.max_wait)
+            if now >= end:
+                return SettleResult(elapsed=now - start, monitored=False), 0.0
+            return None, end - now
+        earliest = start + config.min_wait
+        deadline = start + config.max_wait
+        # Activity from before the wait does not count, so quiet is measured from the start at the earliest
+        last_activity = max([start] + [monitor.last_activity for monitor in monitors])
+        settle_at = max(earliest, last_activity + config.quiet_window)
+        if now >= settle_at:
+            return SettleResult(elapsed=now - start), 0.0
+        if now >= deadline:
+            return SettleResult(elapsed=now - start, timed_out=True), 0.0
+        return None, min(settle_at, deadline) - now
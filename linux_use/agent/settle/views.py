@@ -0,0 +1,16 @@
+from linux_use.agent.settle.config import QUIET_WINDOW, MIN_SETTLE_WAIT, MAX_SETTLE_WAIT
+from dataclasses import dataclass
+
+@dataclass
+class SettleConfig:
+    quiet_window: float = QUIET_WINDOW
+    min_wait: float = MIN_SETTLE_WAIT
+    max_wait: float = MAX_SETTLE_WAIT
+
+@dataclass
+class SettleResult:
+    elapsed: float
+    # True when max_wait expired with the UI still changing
+    timed_out: bool = False
+    # False when no activity source was available and a fixed fallback wait was used
+    monitored: bool = True
@@ -0,0 +1,31 @@
+from tempfile import gettempdir
+from pathlib import Path
+
+SHELL_EXECUTABLE = '/bin/bash'
+
+# Seconds a command may run before its processes are killed (the session survives)
+DEFAULT_COMMAND_TIMEOUT = 25.0
+
+# Seconds to wait for the session to report back after a timed-out command was killed
+KILL_GRACE_PERIOD = 2.0
+
+# Bytes of output kept from the start and from the end of a command; the middle is only in the spill file
+OUTPUT_HEAD_BYTES = 4 * 1024
+OUTPUT_TAIL_BYTES = 12 * 1024
+
+# Directory for the full output of commands that exceed the head and tail budget
+SPILL_DIRECTORY = Path(gettempdir()) / 'linux-use-shell'
+
+# Spill files kept per session: the oldest is deleted when another command spills, all of them when the session closes
+SPILL_FILES_KEPT = 4
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# Environment overrides that keep commands from waiting on a pager or a terminal
+SHELL_ENVIRONMENT = {
+    'TERM': 'dumb',
+    'PAGER': 'cat',
+    'GIT_PAGER': 'cat',
+    'SYSTEMD_PAGER': '',
+    'DEBIAN_FRONTEND': 'noninteractive'
+}
@@ -0,0 +1,289 @@
+from linux_use.agent.shell.config import (SHELL_EXECUTABLE, DEFAULT_COMMAND_TIMEOUT, KILL_GRACE_PERIOD, OUTPUT_HEAD_BYTES,
+OUTPUT_TAIL_BYTES, SPILL_DIRECTORY, SPILL_FILES_KEPT, READ_CHUNK_SIZE, SHELL_ENVIRONMENT)
+from linux_use.agent.shell.views import CommandResult
+from tempfile import NamedTemporaryFile
+from time import perf_counter, monotonic
+from psutil import Process, Error
+from typing import Optional, BinaryIO
+from base64 import b64encode
+from collections import deque
+from threading import Lock
+from select import select
+from uuid import uuid4
+import subprocess
+import signal
+import os
+
+class OutputBuffer:
+    '''
+    Bounded command output: the first `head_size` bytes, a ring of the last `tail_size` bytes
+    and, once the output outgrows both, a spill file holding all of it.
+    '''
+    def __init__(self, head_size: int = OUTPUT_HEAD_BYTES, tail_size: int = OUTPUT_TAIL_BYTES):
+        self.head_size = head_size
+        self.tail_size = tail_size
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self.spill: Optional[BinaryIO] = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.spill is not None
+
+    @property
+    def spill_path(self) -> Optional[str]:
+        return self.spill.name if self.spill is not None else None
+
+    def write(self, data: bytes):
+        if not data:
+            return
+        self.total += len(data)
+        if len(self.head) < self.head_size:
+            room = self.head_size - len(self.head)
+            self.head += data[:room]
+            data = data[room:]
+        if self.spill is not None:
+            self.spill.write(data)
+        elif len(self.tail) + len(data) > self.tail_size:
+            # Until now head + tail held everything, so the spill file starts complete
+            SPILL_DIRECTORY.mkdir(parents=True, exist_ok=True)
+            self.spill = NamedTemporaryFile(mode='wb', prefix='output-', suffix='.log', dir=SPILL_DIRECTORY, delete=False)
+            self.spill.write(self.head)
+            self.spill.write(self.tail)
+            self.spill.write(data)
+        self.tail += data
+        if len(self.tail) > self.tail_size:
+            del self.tail[:len(self.tail) - self.tail_size]
+
+    def close(self):
+        if self.spill is not None:
+            self.spill.close()
+
+    def discard(self):
+        '''Close and delete the spill file.'''
+        self.close()
+        if self.spill is not None:
+            try:
+                os.unlink(self.spill.name)
+            except OSError:
+                pass
+
+    def text(self) -> str:
+        head = self.head.decode('utf-8', errors='replace')
+        tail = self.tail.decode('utf-8', errors='replace')
+        if not self.truncated:
+            return head + tail
+        omitted = self.total - len(self.head) - len(self.tail)
+        return f'{head}\n... [{omitted} bytes omitted] ...\n{tail}'
+
+class ShellSession:
+    '''
+    A long-lived bash process that runs one command at a time.
+
+    Each command is sent base64-encoded and run with `eval` in the session itself, so `cd`,
+    `export` and shell variables persist between commands, and a syntax error cannot swallow
+    the framing. After the command a unique sentinel line carries its exit status. Output is
+    streamed into an OutputBuffer as it arrives instead of being collected whole; the spill
+    files of the last SPILL_FILES_KEPT commands are kept for the model to read and deleted after.
+    Job control gives every command its own process group, so a timeout kills that command and
+    not the background jobs of earlier ones.
+
+    Args:
+        cwd (str, optional): Initial working directory. Defaults to the user's home.
+        env (dict[str, str], optional): Base environment of the shell. Defaults to None (this process's).
+    '''
+    def __init__(self, cwd: Optional[str] = None, env: Optional[dict[str, str]] = None):
+        self.cwd = cwd or os.path.expanduser('~')
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+        self.spilled: deque[OutputBuffer] = deque()
+        self.lock = Lock()
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        env = (self.env or os.environ) | SHELL_ENVIRONMENT
+        self.process = subprocess.Popen(
+            [SHELL_EXECUTABLE, '--noprofile', '--norc'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            cwd=self.cwd, env=env, start_new_session=True
+        )
+        # Enabled here rather than with -m, which warns on the output that there is no terminal
+        self.process.stdin.write(b'set -m\n')
+        self.process.stdin.flush()
+
+    def stop(self) -> Optional[int]:
+        '''Stop the shell and return its exit code.'''
+        if self.process is None:
+            return None
+        if self.process.poll() is None:
+            try:
+                # After EOF on its output the shell is normally exiting already
+                self.process.wait(timeout=0.1)
+            except subprocess.TimeoutExpired:
+                self.kill_children()
+                # The shell leads its own group, which also holds processes no longer below it (e.g. orphans of a subshell)
+                try:
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        returncode = self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            stream.close()
+        self.process = None
+        return returncode
+
+    def close(self):
+        '''Stop the shell and delete the spill files it kept.'''
+        self.stop()
+        while self.spilled:
+            self.spilled.popleft().discard()
+
+    def execute(self, command: str, timeout: float = DEFAULT_COMMAND_TIMEOUT) -> CommandResult:
+        with self.lock:
+            restarted = self.process is not None and not self.is_alive
+            if not self.is_alive:
+                self.stop()
+                self.start()
+            start = perf_counter()
+            sentinel = f'__linux_use_{uuid4().hex}__'.encode('ascii')
+            encoded = b64encode(command.encode('utf-8')).decode('ascii')
+            script = (f"eval \"$(printf '%s' {encoded} | base64 -d)\" </dev/null\n"
+                      f"printf '\\n%s %d\\n' {sentinel.decode()} $?\n")
+            buffer = OutputBuffer()
+            # Background jobs of earlier commands, which a timeout leaves running
+            jobs = self.process_groups()
+            try:
+                self.process.stdin.write(script.encode('ascii'))
+                self.process.stdin.flush()
+                status, timed_out = self.read_until(sentinel, buffer, timeout, jobs)
+                if status is None:
+                    # Killing the command's processes did not bring the session back (e.g. a builtin loop or `exit`)
+                    returncode = self.stop()
+                    restarted = True
+                    status = 124 if timed_out else returncode if returncode is not None and returncode >= 0 else 1
+            except (BrokenPipeError, OSError):
+                self.stop()
+                restarted, timed_out, status = True, False, 1
+            finally:
+                buffer.close()
+            if buffer.truncated:
+                self.spilled.append(buffer)
+                if len(self.spilled) > SPILL_FILES_KEPT:
+                    self.spilled.popleft().discard()
+        return CommandResult(
+            output=buffer.text(),
+            status=status,
+            elapsed=perf_counter() - start,
+            total_bytes=buffer.total,
+            truncated=buffer.truncated,
+            spill_path=buffer.spill_path,
+            timed_out=timed_out,
+            session_restarted=restarted
+        )
+
+    def read_until(self, sentinel: bytes, buffer: OutputBuffer, timeout: float, jobs: set[int]) -> tuple[Optional[int], bool]:
+        '''
+        Stream output into `buffer` until the sentinel line; returns the exit status (None if it never came)
+        and whether the command timed out. A timeout kills the command's processes, sparing the process groups `jobs`.
+        '''
+        marker = b'\n' + sentinel + b' '
+        fd = self.process.stdout.fileno()
+        pending = bytearray()
+        deadline = monotonic() + timeout
+        timed_out = False
+        while True:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                if timed_out:
+                    return None, True
+                timed_out = True
+                self.kill_command(jobs)
+                deadline = monotonic() + KILL_GRACE_PERIOD
+                continue
+            ready, _, _ = select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, READ_CHUNK_SIZE)
+            if not chunk:
+                buffer.write(bytes(pending))
+                return None, timed_out
+            pending += chunk
+            index = pending.find(marker)
+            if index >= 0:
+                end = pending.find(b'\n', index + len(marker))
+                if end < 0:
+                    continue
+                buffer.write(bytes(pending[:index]))
+                return int(pending[index + len(marker):end]), timed_out
+            # Keep enough bytes back to recognise a marker split across reads
+            keep = len(marker) - 1
+            if len(pending) > keep:
+                buffer.write(bytes(pending[:-keep]))
+                del pending[:-keep]
+
+    def process_groups(self) -> set[int]:
+        '''Process groups of the shell's descendants other than the shell's own.'''
+        groups = set()
+        for child in self.descendants():
+            try:
+                groups.add(os.getpgid(child.pid))
+            except OSError:
+                pass
+        groups.discard(self.process.pid)
+        return groups
+
+    def descendants(self) -> list[Process]:
+        try:
+            return Process(self.process.pid).children(recursive=True)
+        except Error:
+            return []
+
+    def kill_command(self, jobs: set[int]):
+        '''Kill the processes of the running command, leaving the shell and the process groups `jobs` alive.'''
+        for child in self.descendants():
+            try:
+                group = os.getpgid(child.pid)
+                if group == self.process.pid:
+                    # Command substitutions and other subshells stay in the shell's own group
+                    child.kill()
+                elif group not in jobs:
+                    os.killpg(group, signal.SIGKILL)
+            except (OSError, Error):
+                pass
+
+    def kill_children(self):
+        '''Kill every process the shell started, background jobs included, leaving the shell itself alive.'''
+        for child in self.descendants():
+            try:
+                child.kill()
+            except Error:
+                pass
+
+class ShellSessionManager:
+    '''Named persistent shell sessions, started on first use.'''
+    def __init__(self, cwd: Optional[str] = None, env: Optional[dict[str, str]] = None):
+        self.cwd = cwd
+        self.env = env
+        self.sessions: dict[str, ShellSession] = {}
+        self.lock = Lock()
+
+    def get_session(self, name: str = 'default') -> ShellSession:
+        with self.lock:
+            if name not in self.sessions:
+                self.sessions[name] = ShellSession(cwd=self.cwd, env=self.env)
+            return self.sessions[name]
+
+    def execute(self, command: str, timeout: Optional[float] = None, session: str = 'default') -> CommandResult:
+        return self.get_session(session).execute(command, timeout=timeout or DEFAULT_COMMAND_TIMEOUT)
+
+    def close(self, name: Optional[str] = None):
+        with self.lock:
+            names = [name] if name is not None else list(self.sessions)
+            for session_name in names:
+                session = self.sessions.pop(session_name, None)
+                if session is not None:
+                    session.close()
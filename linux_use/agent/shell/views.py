@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class CommandResult:
+    output: str
+    status: int
+    elapsed: float
+    total_bytes: int = 0
+    truncated: bool = False
+    spill_path: Optional[str] = None
+    timed_out: bool = False
+    session_restarted: bool = False
+
+    def to_string(self) -> str:
+        notes = []
+        if self.timed_out:
+            notes.append(f'Command timed out after {self.elapsed:.1f} s and was killed.')
+        if self.session_restarted:
+            notes.append('The shell session was restarted, so the working directory and environment were reset.')
+        if self.truncated:
+            notes.append(f'Output was {self.total_bytes} bytes, only the start and end are shown; full output in {self.spill_path}.')
+        return '\n'.join([self.output, *notes]) if notes else self.output
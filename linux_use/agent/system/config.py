@@ -0,0 +1,5 @@
+# Seconds before an account-type lookup (getent may hit LDAP/SSSD) is abandoned
+ACCOUNT_LOOKUP_TIMEOUT = 2.0
+
+# Reference DPI for a scale factor of 1.0
+BASE_DPI = 96.0
@@ -0,0 +1,192 @@
+from linux_use.agent.system.config import ACCOUNT_LOOKUP_TIMEOUT, BASE_DPI
+from linux_use.agent.system.views import SystemFacts, HostFacts, ScreenFacts
+from linux_use.agent.desktop.views import Size
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import Lock, Thread
+from typing import Optional, Callable
+from getpass import getuser
+from pathlib import Path
+import subprocess
+import screeninfo
+import distro
+import os
+
+# Try to import X11 libraries
+try:
+    from Xlib import display, X, Xatom
+    from Xlib.ext import randr
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+class SystemFactsProvider:
+    '''
+    Process-wide snapshot of the host and screen facts the agent puts into its prompts.
+
+    Every fact is probed once, concurrently, on first use (or on `prefetch`). Host facts stay
+    cached for the life of the process; screen facts are dropped when the X server reports a
+    RandR screen change (or the root window is resized) and re-probed lazily on the next read.
+    `refresh` forces a full re-probe.
+
+    Args:
+        display_name (str, optional): X display to describe. Defaults to None ($DISPLAY).
+    '''
+    def __init__(self, display_name: Optional[str] = None):
+        self.display_name = display_name
+        self.lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix='system-facts')
+        self.futures: dict[str, Future] = {}
+        self.watcher: Optional[Thread] = None
+        self.probes: dict[str, Callable] = {
+            'os': self.probe_os,
+            'user': getuser,
+            'account_type': self.probe_account_type,
+            'language': self.probe_language,
+            'resolution': self.probe_resolution,
+            'dpi_scaling': self.probe_dpi_scaling
+        }
+
+    def prefetch(self):
+        '''Start probing every missing fact in the background.'''
+        with self.lock:
+            for name, probe in self.probes.items():
+                if name not in self.futures:
+                    self.futures[name] = self.executor.submit(probe)
+        self.start_watching()
+
+    def get(self) -> SystemFacts:
+        self.prefetch()
+        with self.lock:
+            futures = dict(self.futures)
+        facts = {name: future.result() for name, future in futures.items()}
+        home = Path.home()
+        return SystemFacts(
+            host=HostFacts(
+                os=facts['os'],
+                user=facts['user'],
+                account_type=facts['account_type'],
+                language=facts['language'],
+                home_dir=home.as_posix(),
+                download_dir=home.joinpath('Downloads').as_posix()
+            ),
+            screen=ScreenFacts(resolution=facts['resolution'], dpi_scaling=facts['dpi_scaling'])
+        )
+
+    def refresh(self) -> SystemFacts:
+        '''Drop every cached fact and probe again.'''
+        with self.lock:
+            self.futures.clear()
+        return self.get()
+
+    def invalidate_screen(self):
+        with self.lock:
+            self.futures.pop('resolution', None)
+            self.futures.pop('dpi_scaling', None)
+
+    def start_watching(self):
+        if not XLIB_AVAILABLE:
+            return
+        with self.lock:
+            if self.watcher is not None:
+                return
+            self.watcher = Thread(target=self.watch_screen_changes, name='system-facts-randr', daemon=True)
+        self.watcher.start()
+
+    def watch_screen_changes(self):
+        '''Block on a dedicated X connection and invalidate the screen facts on every screen change.'''
+        try:
+            connection = display.Display(self.display_name)
+            root = connection.screen().root
+            root.change_attributes(event_mask=X.StructureNotifyMask)
+            screen_change_type = None
+            if connection.has_extension('RANDR'):
+                screen_change_type = connection.query_extension('RANDR').first_event + randr.RRScreenChangeNotify
+                root.xrandr_select_input(randr.RRScreenChangeNotifyMask)
+            connection.flush()
+            while True:
+                event = connection.next_event()
+                if event.type == screen_change_type or (event.type == X.ConfigureNotify and event.window.id == root.id):
+                    self.invalidate_screen()
+        except Exception:
+            # No X server or the connection was lost: facts stay cached until an explicit refresh
+            return
+
+    def probe_os(self) -> str:
+        """Get Linux distribution name and version."""
+        try:
+            return f"{distro.name()} {distro.version()}".strip() or "Linux"
+        except Exception:
+            return "Linux"
+
+    def probe_account_type(self) -> str:
+        """Detect local vs LDAP/domain account."""
+        try:
+            username = os.environ.get('USER') or getuser()
+            result = subprocess.run(['getent', 'passwd', username], capture_output=True, text=True, timeout=ACCOUNT_LOOKUP_TIMEOUT)
+            if result.returncode != 0:
+                return "Unknown Account Type"
+            # The LDAP lookup can hang on unreachable directory servers, hence the timeout
+            result_ldap = subprocess.run(['getent', '-s', 'ldap', 'passwd', username], capture_output=True, text=True, timeout=ACCOUNT_LOOKUP_TIMEOUT)
+            if result_ldap.returncode == 0:
+                return "LDAP/Domain Account"
+            return "Local Account"
+        except subprocess.TimeoutExpired:
+            return "Unknown Account Type"
+        except Exception:
+            return "Local Account"
+
+    def probe_language(self) -> str:
+        """Get system default language."""
+        lang = os.environ.get('LANG', 'en_US.UTF-8')
+        if lang:
+            return lang.split('.')[0].replace('_', ' ')
+        return "English (US)"
+
+    def probe_resolution(self) -> Size:
+        """Get primary screen resolution."""
+        try:
+            # screeninfo only reads the ambient $DISPLAY
+            monitors = screeninfo.get_monitors() if self.display_name in (None, os.environ.get('DISPLAY')) else []
+            if monitors:
+                primary = next((monitor for monitor in monitors if monitor.is_primary), monitors[0])
+                return Size(width=primary.width, height=primary.height)
+        except Exception:
+            pass
+        try:
+            connection = display.Display(self.display_name)
+            screen = connection.screen()
+            size = Size(width=screen.width_in_pixels, height=screen.height_in_pixels)
+            connection.close()
+            return size
+        except Exception:
+            return Size(width=1920, height=1080)
+
+    def probe_dpi_scaling(self) -> float:
+        """Get DPI scaling factor for HiDPI displays from the Xft.dpi resource set by the desktop environment."""
+        try:
+            connection = display.Display(self.display_name)
+            try:
+                resources = connection.screen().root.get_full_property(Xatom.RESOURCE_MANAGER, Xatom.STRING)
+            finally:
+                connection.close()
+            if resources is not None:
+                value = resources.value.decode() if isinstance(resources.value, bytes) else str(resources.value)
+                for line in value.splitlines():
+                    key, _, dpi = line.partition(':')
+                    if key.strip() == 'Xft.dpi' and dpi.strip():
+                        return round(float(dpi) / BASE_DPI, 2)
+        except Exception:
+            pass
+        return 1.0
+
+providers: dict[Optional[str], SystemFactsProvider] = {}
+providers_lock = Lock()
+
+def get_system_facts_provider(display_name: Optional[str] = None) -> SystemFactsProvider:
+    '''Return the process-wide provider for `display_name` (defaults to $DISPLAY).'''
+    key = display_name or os.environ.get('DISPLAY')
+    with providers_lock:
+        provider = providers.get(key)
+        if provider is None:
+            provider = providers[key] = SystemFactsProvider(display_name)
+        return provider
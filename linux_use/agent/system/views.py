@@ -0,0 +1,29 @@
+from linux_use.agent.desktop.views import Size
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ScreenFacts:
+    resolution: Size
+    dpi_scaling: float
+
+@dataclass(frozen=True)
+class HostFacts:
+    os: str
+    user: str
+    account_type: str
+    language: str
+    home_dir: str
+    download_dir: str
+
+@dataclass(frozen=True)
+class SystemFacts:
+    host: HostFacts
+    screen: ScreenFacts
+
+    @property
+    def resolution(self) -> Size:
+        return self.screen.resolution
+
+    @property
+    def dpi_scaling(self) -> float:
+        return self.screen.dpi_scaling
@@ -4,11 +4,9 @@ from markdownify import markdownify
 from typing import Literal,Optional
 from langchain.tools import tool
 from pathlib import Path
-import pyautogui as pg
+from time import sleep
 import requests
-
-pg.FAILSAFE=False
-pg.PAUSE=1.0
+import asyncio
 
 memory_path=Path.cwd()/'.memories'
 
@@ -38,16 +36,9 @@ def app_tool(mode:Literal['launch','resize','switch'],name:Optional[str]=None,lo
     desktop:Desktop=kwargs['desktop']
     match mode:
         case 'launch':
-            response,status=desktop.launch_app(name)
-            if status!=0:
-                return response
-            consecutive_waits=3
-            for _ in range(consecutive_waits):
-                if not desktop.is_app_running(name):
-                    pg.sleep(1.25)
-                else:
-                    return f'{name.title()} launched.'
-            return f'Launching {name.title()} wait for it to come load.'
+            # Blocks until the app's window is mapped (or the launch timeout expires)
+            response,_=desktop.launch_app(name)
+            return response
         case 'resize':
             _,status=desktop.resize_app(size=size,loc=loc)
             if status!=0:
@@ -172,7 +163,7 @@ def memory_tool(mode: Literal['view','read','write','delete','update'],path: Opt
     return "Invalid mode. Use 'view', 'write', 'read', 'update', or 'delete'."
 
 @tool('Shell Tool',args_schema=Shell)
-def shell_tool(command: str,**kwargs) -> str:
+def shell_tool(command: str,timeout:Optional[int]=25,**kwargs) -> str:
     '''
     Executes bash shell commands and returns output with status codes.
     
@@ -182,11 +173,12 @@ def shell_tool(command: str,**kwargs) -> str:
         - Automate file operations and system tasks
         - Access Linux management utilities (apt, systemctl, etc.)
     
-    The working directory is set to the user's HOME directory by default. 
-    Returns both command output and exit status code for error handling.
+    Commands run in a persistent bash session that starts in the user's HOME directory,
+    so `cd` and `export` carry over between calls. Long output is cut to its start and end,
+    with the full output saved to a file. Returns both command output and exit status code.
     '''
     desktop:Desktop=kwargs['desktop']
-    response,status=desktop.execute_command(command)
+    response,status=desktop.execute_command(command,timeout=timeout)
     return f'Response: {response}\nStatus Code: {status}'
 
 @tool('Click Tool',args_schema=Click)
@@ -202,11 +194,17 @@ def click_tool(loc:tuple[int,int],button:Literal['left','right','middle']='left'
     
     Essential for all point-and-click UI operations on Linux desktop.
     '''
+    desktop:Desktop=kwargs['desktop']
     x,y=loc
-    pg.moveTo(x,y)
-    pg.sleep(0.1)
-    pg.click(x=x, y=y, button=button, clicks=clicks)
-    pg.sleep(0.1)
+    if button=='left' and clicks==1:
+        # Elements from the accessibility tree are activated directly; the pointer is the fallback
+        node=desktop.activate_element(loc)
+        if node is not None:
+            return f'Activated {node.name} ({node.control_type}) at ({x},{y}).'
+    if clicks==0:
+        desktop.input.move(x,y)
+    else:
+        desktop.input.click(x,y,button=button,clicks=clicks)
     num_clicks={1:'Single',2:'Double',3:'Triple'}
     return f'{num_clicks.get(clicks)} {button} click at ({x},{y}).'
 
@@ -224,21 +222,18 @@ def type_tool(loc:tuple[int,int],text:str,clear:Literal['true','false']='false',
     Use for form filling, search queries, text editing, and any text input operation.
     Always click on the target element coordinates first to ensure proper focus.
     '''
+    desktop:Desktop=kwargs['desktop']
     x,y=loc
-    pg.leftClick(x,y)
+    desktop.input.click(x,y)
     if caret_position == 'start':
-        pg.press('home')
+        desktop.input.press('home')
     elif caret_position == 'end':
-        pg.press('end')
+        desktop.input.press('end')
     else:
         pass
-    if clear=='true':
-        pg.hotkey('ctrl','a')
-        pg.press('backspace')
-    pg.typewrite(text,interval=0.02)
-    pg.sleep(0.05)
+    desktop.enter_text(text,loc=loc,clear=clear=='true')
     if press_enter=='true':
-        pg.press('enter')
+        desktop.input.press('enter')
     return f'Typed {text} at ({x},{y}).'
 
 @tool('Scroll Tool',args_schema=Scroll)
@@ -257,28 +252,19 @@ def scroll_tool(loc:tuple[int,int]=None,type:Literal['horizontal','vertical']='v
     
     Essential tool for accessing content beyond the visible viewport.
     '''
-    if loc:
-        x,y=loc
-        pg.moveTo(x,y)
+    desktop:Desktop=kwargs['desktop']
+    x,y=loc if loc else (None,None)
     match type:
         case 'vertical':
-            match direction:
-                case 'up':
-                    pg.scroll(wheel_times * 100)  # Positive for up
-                case 'down':
-                    pg.scroll(-wheel_times * 100)  # Negative for down
-                case _:
-                    return 'Invalid direction. Use "up" or "down".'
+            if direction not in ('up','down'):
+                return 'Invalid direction. Use "up" or "down".'
         case 'horizontal':
-            match direction:
-                case 'left':
-                    pg.hscroll(-wheel_times * 100)  # Negative for left
-                case 'right':
-                    pg.hscroll(wheel_times * 100)  # Positive for right
-                case _:
-                    return 'Invalid direction. Use "left" or "right".'
+            if direction not in ('left','right'):
+                return 'Invalid direction. Use "left" or "right".'
         case _:
             return 'Invalid type. Use "horizontal" or "vertical".'
+    # One wheel time is one wheel notch (X buttons 4-7)
+    desktop.input.scroll(direction,wheel_times,x,y)
     return f'Scrolled {type} {direction} by {wheel_times} wheel times.'
 
 @tool('Drag Tool',args_schema=Drag)
@@ -295,11 +281,10 @@ def drag_tool(from_loc:tuple[int,int],to_loc:tuple[int,int],**kwargs)->str:
     Simulates holding down the mouse button at the source location and releasing 
     at the destination, enabling drag-based interactions.
     '''
+    desktop:Desktop=kwargs['desktop']
     x1,y1=from_loc
     x2,y2=to_loc
-    pg.moveTo(x1,y1)
-    pg.sleep(0.01)
-    pg.dragTo(x2,y2)
+    desktop.input.drag(from_loc,to_loc)
     return f'Dragged the element from ({x1},{y1}) to ({x2},{y2}).'
 
 @tool('Move Tool',args_schema=Move)
@@ -315,9 +300,9 @@ def move_tool(to_loc:tuple[int,int],**kwargs)->str:
     
     Non-invasive cursor positioning for setup and hover-based interactions.
     '''
+    desktop:Desktop=kwargs['desktop']
     x,y=to_loc
-    pg.moveTo(x,y)
-    pg.sleep(0.01)
+    desktop.input.move(x,y)
     return f'Moved the mouse pointer to ({x},{y}).'
 
 @tool('Shortcut Tool',args_schema=Shortcut)
@@ -334,11 +319,12 @@ def shortcut_tool(shortcut:str,**kwargs)->str:
     and application-specific shortcuts. More efficient than mouse-based navigation 
     for many operations.
     '''
+    desktop:Desktop=kwargs['desktop']
     shortcut=shortcut.split('+')
     if len(shortcut)>1:
-        pg.hotkey(*shortcut)
+        desktop.input.hotkey(*shortcut)
     else:
-        pg.press(''.join(shortcut))
+        desktop.input.press(''.join(shortcut))
     shortcut_str = '+'.join(shortcut)
     return f'Pressed {shortcut_str}.'
 
@@ -356,9 +342,16 @@ def wait_tool(duration:int,**kwargs)->str:
     Use strategic waits to improve reliability when operations need time to complete.
     Duration is specified in seconds.
     '''
-    pg.sleep(duration)
+    sleep(duration)
     return f'Waited for {duration} seconds.'
 
+async def await_wait(duration:int,**kwargs)->str:
+    await asyncio.sleep(duration)
+    return f'Waited for {duration} seconds.'
+
+# Under Agent.ainvoke the wait sleeps on the event loop instead of holding an executor thread
+wait_tool.coroutine=await_wait
+
 @tool('Scrape Tool',args_schema=Scrape)
 def scrape_tool(url:str,**kwargs)->str:
     '''
@@ -87,14 +87,19 @@ class Click(SharedBaseModel):
 class Shell(SharedBaseModel):
     command: str = Field(
         ...,
-        description="PowerShell command to execute. Working directory is set to user's HOME. Returns output and exit status code",
+        description="Bash command to execute in a persistent session that starts in the user's HOME; the working directory, exported variables and shell variables carry over to later commands. Returns output (stdout and stderr) and exit status code",
         examples=[
-            'Get-Process',
-            'ls',
-            'Get-ChildItem -Path C:\\Users -Recurse',
+            'ps aux --sort=-%mem | head',
+            'cd ~/Documents && ls -la',
+            'find ~ -name "*.pdf" -mtime -7',
             'echo "Hello World"'
         ]
     )
+    timeout: Optional[int] = Field(
+        description="Seconds the command may run before it is killed (the session is kept). Raise it for long installs or builds",
+        examples=[25, 300],
+        default=25
+    )
 
 class Type(SharedBaseModel):
     loc: tuple[int, int] = Field(
@@ -0,0 +1,16 @@
+from pathlib import Path
+
+# Where recorded trajectories are kept, one JSON file per task fingerprint
+TRAJECTORY_DIRECTORY = Path.home() / '.cache' / 'linux-use' / 'trajectories'
+
+# Parameters of each tool that point at an element, recorded as selectors and re-resolved on replay
+ELEMENT_PARAMS = {
+    'Click Tool': ['loc'],
+    'Type Tool': ['loc'],
+    'Scroll Tool': ['loc'],
+    'Drag Tool': ['from_loc', 'to_loc'],
+    'Move Tool': ['to_loc'],
+}
+
+# Control type of password fields, whose typed text is never written to a trajectory
+PASSWORD_CONTROL_TYPE = 'Password_Text'
@@ -0,0 +1,108 @@
+from linux_use.agent.trajectory.config import TRAJECTORY_DIRECTORY, ELEMENT_PARAMS, PASSWORD_CONTROL_TYPE
+from linux_use.agent.trajectory.views import Trajectory, RecordedAction, ElementSelector
+from linux_use.agent.tree.views import TreeState
+from linux_use.agent.views import Action
+from typing import Optional
+from pathlib import Path
+from hashlib import sha256
+from time import time
+import json
+import os
+
+def fingerprint(task: str) -> str:
+    '''Key of a task: its text with case and whitespace normalized.'''
+    return sha256(' '.join(task.casefold().split()).encode('utf-8')).hexdigest()
+
+def get_elements(tree_state: TreeState) -> list:
+    return tree_state.interactive_nodes + tree_state.scrollable_nodes
+
+def select_element(tree_state: TreeState, loc) -> Optional[ElementSelector]:
+    '''Selector of the element observed at `loc` (actions address elements by their centre).'''
+    x, y = loc
+    for node in get_elements(tree_state):
+        if node.center.x == x and node.center.y == y:
+            return ElementSelector(role=node.control_type, name=node.name, app=node.app_name, loc=(x, y))
+    return None
+
+def find_element(tree_state: TreeState, selector: ElementSelector) -> Optional[tuple[int, int]]:
+    '''Current centre of the element matching `selector`, the one nearest its recorded place if several do.'''
+    matches = [node.center for node in get_elements(tree_state)
+               if node.control_type == selector.role and node.name == selector.name and node.app_name == selector.app]
+    if not matches:
+        return None
+    x, y = selector.loc
+    center = min(matches, key=lambda center: (center.x - x) ** 2 + (center.y - y) ** 2)
+    return (center.x, center.y)
+
+class TrajectoryStore:
+    '''
+    Recorded successful runs, one per task, as JSON files keyed by the task's fingerprint.
+
+    A run is recorded as the actions it executed successfully, with a selector (role, name,
+    app) for every parameter that pointed at an element. Replaying an action looks the
+    selectors up in the live tree and uses the elements' current positions, so a moved
+    window does not break the replay; a missing element stops it.
+
+    The files are plain JSON, typed text included. Text typed into a password field (or into
+    a field not found in the tree) is left out, and the replay hands such a step to the LLM.
+
+    Args:
+        directory (Path, optional): Where trajectories are kept. Defaults to TRAJECTORY_DIRECTORY.
+    '''
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory or TRAJECTORY_DIRECTORY)
+
+    def path(self, task: str) -> Path:
+        return self.directory / f'{fingerprint(task)}.json'
+
+    def get(self, task: str) -> Optional[Trajectory]:
+        try:
+            with open(self.path(task)) as file:
+                return Trajectory.from_dict(json.load(file))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, trajectory: Trajectory):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(trajectory.task)
+        temporary = path.with_suffix('.tmp')
+        with open(temporary, 'w') as file:
+            json.dump(trajectory.to_dict(), file, indent=2)
+        # Readers never see a half-written file
+        os.replace(temporary, path)
+
+    def record(self, task: str, actions: list[RecordedAction]):
+        self.put(Trajectory(task=task, fingerprint=fingerprint(task), actions=actions, recorded_at=time()))
+
+def record_action(action: Action, tree_state: Optional[TreeState]) -> RecordedAction:
+    '''An executed action with selectors for the elements it pointed at in the observation it was chosen from.'''
+    selectors = {}
+    for param in ELEMENT_PARAMS.get(action.name, []):
+        loc = action.params.get(param)
+        if tree_state is None or not isinstance(loc, (list, tuple)) or len(loc) != 2:
+            continue
+        selector = select_element(tree_state, loc)
+        if selector is not None:
+            selectors[param] = selector
+    params = dict(action.params)
+    if action.name == 'Type Tool' and (selectors.get('loc') is None or selectors['loc'].role == PASSWORD_CONTROL_TYPE):
+        params.pop('text', None)
+    return RecordedAction(name=action.name, params=params, selectors=selectors)
+
+def resolve_action(recorded: RecordedAction, tree_state: TreeState) -> Optional[Action]:
+    '''
+    The recorded action with its element parameters moved to the live elements, or None if one
+    is missing, was never matched to an element, or its typed text was not recorded.
+    '''
+    params = dict(recorded.params)
+    for param in ELEMENT_PARAMS.get(recorded.name, []):
+        if params.get(param) is None:
+            continue
+        selector = recorded.selectors.get(param)
+        loc = find_element(tree_state, selector) if selector is not None else None
+        if loc is None:
+            return None
+        params[param] = loc
+    if recorded.name == 'Type Tool' and 'text' not in params:
+        return None
+    return Action(name=recorded.name, params=params)
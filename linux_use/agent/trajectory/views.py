@@ -0,0 +1,35 @@
+from dataclasses import dataclass, field, asdict
+
+@dataclass
+class ElementSelector:
+    role: str
+    name: str
+    app: str
+    # Where the element was when recorded, to choose between equal candidates
+    loc: tuple[int, int] = (0, 0)
+
+@dataclass
+class RecordedAction:
+    name: str
+    params: dict
+    # Selectors of the parameters that pointed at an element, by parameter name
+    selectors: dict[str, ElementSelector] = field(default_factory=dict)
+
+@dataclass
+class Trajectory:
+    task: str
+    fingerprint: str
+    actions: list[RecordedAction]
+    recorded_at: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Trajectory':
+        actions = [RecordedAction(
+            name=action['name'],
+            params=action['params'],
+            selectors={param: ElementSelector(**{**selector, 'loc': tuple(selector['loc'])}) for param, selector in action['selectors'].items()}
+        ) for action in data['actions']]
+        return cls(task=data['task'], fingerprint=data['fingerprint'], actions=actions, recorded_at=data.get('recorded_at', 0.0))
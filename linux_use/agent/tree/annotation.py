@@ -0,0 +1,152 @@
+from linux_use.agent.tree.config import (LABEL_FONT_NAMES, LABEL_FONT_SIZE, LABEL_PADDING, BOX_OUTLINE_WIDTH,
+LABEL_GRID_CELL, ANNOTATION_PALETTE)
+from linux_use.agent.tree.views import TreeElementNode
+from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
+from math import ceil
+
+Rect = tuple[int, int, int, int]
+
+@lru_cache(maxsize=None)
+def load_label_font(size: int) -> ImageFont.ImageFont | ImageFont.FreeTypeFont:
+    '''First available label font at `size`, loaded once per process.'''
+    for name in LABEL_FONT_NAMES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 only has the fixed-size bitmap font
+        return ImageFont.load_default()
+
+class LabelGrid:
+    '''Placed label rectangles bucketed into square cells, so an overlap test only looks at nearby labels.'''
+    def __init__(self, cell_size: int = LABEL_GRID_CELL):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        self.rects: list[Rect] = []
+
+    def get_overlapping(self, rect: Rect, first: bool = False) -> set[int]:
+        '''Indices of the placed labels that intersect `rect` (only the first one found if `first`).'''
+        left, top, right, bottom = rect
+        size, cells, rects = self.cell_size, self.cells, self.rects
+        hits = set()
+        for column in range(left // size, (right - 1) // size + 1):
+            for row in range(top // size, (bottom - 1) // size + 1):
+                for index in cells.get((column, row), ()):
+                    other_left, other_top, other_right, other_bottom = rects[index]
+                    if left < other_right and other_left < right and top < other_bottom and other_top < bottom:
+                        hits.add(index)
+                        if first:
+                            return hits
+        return hits
+
+    def is_free(self, rect: Rect) -> bool:
+        return not self.get_overlapping(rect, first=True)
+
+    def overlaps(self, rect: Rect) -> int:
+        '''Number of placed labels that intersect `rect`.'''
+        return len(self.get_overlapping(rect))
+
+    def add(self, rect: Rect):
+        index = len(self.rects)
+        self.rects.append(rect)
+        left, top, right, bottom = rect
+        size = self.cell_size
+        for column in range(left // size, (right - 1) // size + 1):
+            for row in range(top // size, (bottom - 1) // size + 1):
+                self.cells.setdefault((column, row), []).append(index)
+
+class AnnotationRenderer:
+    '''
+    Draws numbered element boxes onto a screenshot in place.
+
+    The font, the palette and the label tiles are prepared once (tiles on first use of an index),
+    so a render only draws the box outlines and pastes one tile per element. Each element keeps the same colour for the same
+    index, all boxes are drawn before any label so outlines never cross a number, and every
+    label takes the first free spot around its box (above, inside, below) that stays on the
+    frame and clear of labels already placed.
+
+    Args:
+        font_size (int, optional): Label text height in frame pixels. Defaults to LABEL_FONT_SIZE.
+    '''
+    def __init__(self, font_size: int = LABEL_FONT_SIZE):
+        self.font = load_label_font(font_size)
+        left, top, right, bottom = self.font.getbbox('0123456789')
+        self.text_height = bottom - top
+        self.glyphs: dict[str, Image.Image] = {}
+        for digit in '0123456789':
+            mask = Image.new('L', (ceil(self.font.getlength(digit)), self.text_height))
+            ImageDraw.Draw(mask).text((0, -top), digit, fill=255, font=self.font)
+            self.glyphs[digit] = mask
+        self.label_height = self.text_height + 2 * LABEL_PADDING
+        # Dark text on light fills, white text on dark ones
+        self.palette = [(color, (0, 0, 0) if 0.299 * color[0] + 0.587 * color[1] + 0.114 * color[2] > 150 else (255, 255, 255))
+                        for color in ANNOTATION_PALETTE]
+        self.tiles: list[Image.Image] = []
+
+    def get_tile(self, index: int) -> Image.Image:
+        '''The label of element `index`: its number on its palette colour.'''
+        while len(self.tiles) <= index:
+            label = str(len(self.tiles))
+            fill, text_fill = self.palette[len(self.tiles) % len(self.palette)]
+            tile = Image.new('RGB', (self.get_label_width(label), self.label_height), fill)
+            draw = ImageDraw.Draw(tile)
+            x = LABEL_PADDING
+            for digit in label:
+                glyph = self.glyphs[digit]
+                draw.bitmap((x, LABEL_PADDING), glyph, fill=text_fill)
+                x += glyph.width
+            self.tiles.append(tile)
+        return self.tiles[index]
+
+    def render(self, frame: Image.Image, nodes: list[TreeElementNode], scale: float) -> Image.Image:
+        '''Annotate `frame` (a capture at `scale`) with the boxes and indices of `nodes`.'''
+        if frame.mode != 'RGB':
+            frame = frame.convert('RGB')
+        draw = ImageDraw.Draw(frame)
+        boxes = []
+        for index, node in enumerate(nodes):
+            box = node.bounding_box
+            rect = (int(box.left * scale), int(box.top * scale), int(box.right * scale), int(box.bottom * scale))
+            boxes.append(rect)
+            draw.rectangle(rect, outline=self.palette[index % len(self.palette)][0], width=BOX_OUTLINE_WIDTH)
+        grid = LabelGrid()
+        for index, rect in enumerate(boxes):
+            tile = self.get_tile(index)
+            left, top, _, _ = self.place(rect, tile.width, frame.size, grid)
+            frame.paste(tile, (left, top))
+        return frame
+
+    def get_label_width(self, label: str) -> int:
+        return sum(self.glyphs[digit].width for digit in label) + 2 * LABEL_PADDING
+
+    def place(self, box: Rect, width: int, frame_size: tuple[int, int], grid: LabelGrid) -> Rect:
+        '''Pick and reserve the label rectangle for `box`.'''
+        left, top, right, bottom = box
+        height = self.label_height
+        frame_width, frame_height = frame_size
+        candidates = [
+            (right - width, top - height),  # above, right-aligned
+            (left, top - height),           # above, left-aligned
+            (right - width, top),           # inside, top right
+            (left, top),                    # inside, top left
+            (right - width, bottom),        # below, right-aligned
+            (left, bottom),                 # below, left-aligned
+        ]
+        rects = []
+        for x, y in candidates:
+            # Keep the label on the frame (boxes at the edges would otherwise lose their number)
+            x = min(max(x, 0), frame_width - width)
+            y = min(max(y, 0), frame_height - height)
+            rect = (x, y, x + width, y + height)
+            if grid.is_free(rect):
+                grid.add(rect)
+                return rect
+            rects.append(rect)
+        # Crowded everywhere: take the spot that covers the fewest labels
+        best = min(rects, key=grid.overlaps)
+        grid.add(best)
+        return best
@@ -10,8 +10,33 @@ DEFAULT_ACTIONS=set([
     'Click','Press','Jump','Check','Uncheck','Double Click'
 ])
 
+# AT-SPI action names that stand for a single left click, in order of preference
+CLICK_ACTION_NAMES=['click','press','jump','activate','toggle']
+
 INFORMATIVE_CONTROL_TYPE_NAMES=set([
     'TextControl','ImageControl'
 ])
 
-THREAD_MAX_RETRIES = 3
\ No newline at end of file
+THREAD_MAX_RETRIES = 3
+
+# Fonts tried for the element labels (bold sans for legible digits), before Pillow's built-in font
+LABEL_FONT_NAMES = ['DejaVuSans-Bold.ttf', 'LiberationSans-Bold.ttf', 'FreeSansBold.ttf', 'arial.ttf']
+
+# Label text height (px) on the annotated frame, independent of the capture scale
+LABEL_FONT_SIZE = 12
+
+# Space (px) between the label text and the edge of its background
+LABEL_PADDING = 2
+
+# Width (px) of the box drawn around each element
+BOX_OUTLINE_WIDTH = 2
+
+# Side (px) of the grid cells used to find overlapping labels
+LABEL_GRID_CELL = 32
+
+# Box and label colours, cycled by element index (distinct hues that stay readable under JPEG)
+ANNOTATION_PALETTE = [
+    (230, 25, 75), (60, 180, 75), (0, 130, 200), (245, 130, 48),
+    (145, 30, 180), (0, 150, 150), (240, 50, 230), (128, 128, 0),
+    (170, 110, 40), (0, 0, 128), (128, 0, 0), (255, 200, 0)
+]
\ No newline at end of file
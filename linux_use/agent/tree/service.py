@@ -1,13 +1,13 @@
-from linux_use.agent.tree.config import INTERACTIVE_CONTROL_TYPE_NAMES, INFORMATIVE_CONTROL_TYPE_NAMES
+from linux_use.agent.tree.config import INTERACTIVE_CONTROL_TYPE_NAMES, INFORMATIVE_CONTROL_TYPE_NAMES, CLICK_ACTION_NAMES
 from linux_use.agent.tree.views import TreeElementNode, TextElementNode, ScrollElementNode, Center, BoundingBox, TreeState
 from linux_use.agent.desktop.config import AVOIDED_APPS, EXCLUDED_APPS
-from PIL import Image, ImageFont, ImageDraw
-from typing import TYPE_CHECKING
-from time import sleep
-import random
+from linux_use.agent.display.service import atspi_lock
+from PIL import Image
+from typing import TYPE_CHECKING, Optional, Any
 
 if TYPE_CHECKING:
     from linux_use.agent.desktop.service import Desktop
+    from linux_use.agent.desktop.views import App
 
 # Try to import AT-SPI2 libraries
 try:
@@ -22,13 +22,12 @@ class Tree:
         self.desktop = desktop
         self.screen_resolution = self.desktop.get_screen_resolution()
 
-    def get_state(self) -> TreeState:
-        """Get the current UI tree state."""
-        sleep(0.1)
-        
-        if ATSPI_AVAILABLE:
+    def get_state(self, apps: Optional[list['App']] = None) -> TreeState:
+        """Get the current UI tree state (of the applications owning `apps`, the visible windows, when given)."""
+        if ATSPI_AVAILABLE and self.desktop.accessibility:
             try:
-                interactive_nodes, informative_nodes, scrollable_nodes = self.get_nodes_atspi()
+                with atspi_lock:
+                    interactive_nodes, informative_nodes, scrollable_nodes = self.get_nodes_atspi(apps)
             except Exception as e:
                 print(f"AT-SPI error: {e}. Falling back to basic mode.")
                 interactive_nodes, informative_nodes, scrollable_nodes = self.get_nodes_fallback()
@@ -47,7 +46,7 @@ class Tree:
         # The agent will rely more on vision mode or manual coordinate specification
         return ([], [], [])
     
-    def get_nodes_atspi(self) -> tuple[list[TreeElementNode], list[TextElementNode], list[ScrollElementNode]]:
+    def get_nodes_atspi(self, apps: Optional[list['App']] = None) -> tuple[list[TreeElementNode], list[TextElementNode], list[ScrollElementNode]]:
         """Get UI nodes using AT-SPI2 accessibility API."""
         interactive_nodes = []
         informative_nodes = []
@@ -57,10 +56,10 @@ class Tree:
             # Get the desktop accessibility object
             desktop = pyatspi.Registry.getDesktop(0)
             
-            # Iterate through all applications
-            for app_index in range(desktop.childCount):
+            # Only the applications behind the visible windows when they are known (none without a visible window), otherwise all of them
+            targets = self.join_apps(desktop, apps) if apps is not None else [(index, desktop.getChildAtIndex(index)) for index in range(desktop.childCount)]
+            for app_index, app in targets:
                 try:
-                    app = desktop.getChildAtIndex(app_index)
                     if not app:
                         continue
                     
@@ -75,7 +74,8 @@ class Tree:
                         app, app_name, 
                         interactive_nodes, 
                         informative_nodes, 
-                        scrollable_nodes
+                        scrollable_nodes,
+                        path=(app_index,)
                     )
                 except Exception as e:
                     print(f"Error processing app at index {app_index}: {e}")
@@ -85,7 +85,39 @@ class Tree:
         
         return (interactive_nodes, informative_nodes, scrollable_nodes)
     
-    def _traverse_accessible(self, accessible, app_name, interactive_nodes, informative_nodes, scrollable_nodes, depth=0, max_depth=20):
+    def join_apps(self, desktop, apps: list['App']) -> list[tuple[int, Any]]:
+        """
+        AT-SPI applications owning one of `apps`, as (index on the desktop, application), linking each
+        window to its application root. Windows are matched by process id, then (for sandboxed apps,
+        whose window carries a namespaced pid) by WM_CLASS or process name against the application name.
+        """
+        by_pid: dict[int, tuple[int, Any]] = {}
+        by_name: dict[str, tuple[int, Any]] = {}
+        for index in range(desktop.childCount):
+            try:
+                application = desktop.getChildAtIndex(index)
+                if application is None:
+                    continue
+                by_pid.setdefault(application.get_process_id(), (index, application))
+                if application.name:
+                    by_name.setdefault(application.name.lower(), (index, application))
+            except Exception:
+                continue
+        targets: dict[int, tuple[int, Any]] = {}
+        for app in apps:
+            match = by_pid.get(app.pid) if app.pid else None
+            if match is None:
+                names = [part.lower() for part in app.wm_class.split('.') if part]
+                if app.pid:
+                    names.append(self.desktop.app_index.get_process_name(app.pid).lower())
+                match = next((by_name[name] for name in names if name in by_name), None)
+            if match is None:
+                continue
+            app.accessible = match[1]
+            targets[match[0]] = match
+        return list(targets.values())
+
+    def _traverse_accessible(self, accessible, app_name, interactive_nodes, informative_nodes, scrollable_nodes, depth=0, max_depth=20, path=()):
         """Recursively traverse accessible tree."""
         if depth > max_depth:
             return
@@ -149,7 +181,9 @@ class Tree:
                     shortcut="",
                     bounding_box=bounding_box,
                     center=center,
-                    app_name=app_name
+                    app_name=app_name,
+                    element_id=path,
+                    accessible=accessible
                 ))
             
             # Text/informative elements
@@ -190,7 +224,7 @@ class Tree:
                         self._traverse_accessible(
                             child, app_name, 
                             interactive_nodes, informative_nodes, scrollable_nodes,
-                            depth + 1, max_depth
+                            depth + 1, max_depth, path + (i,)
                         )
                 except Exception as e:
                     continue
@@ -244,59 +278,78 @@ class Tree:
         except Exception:
             return False
     
-    def get_random_color(self):
-        return "#{:06x}".format(random.randint(0, 0xFFFFFF))
-
-    def annotated_screenshot(self, nodes: list[TreeElementNode], scale: float = 0.7) -> Image.Image:
-        """Create annotated screenshot with bounding boxes."""
-        screenshot = self.desktop.get_screenshot(scale=scale)
-        sleep(0.10)
-        
-        # Add padding
-        padding = 20
-        width = screenshot.width + (2 * padding)
-        height = screenshot.height + (2 * padding)
-        padded_screenshot = Image.new("RGB", (width, height), color=(255, 255, 255))
-        padded_screenshot.paste(screenshot, (padding, padding))
-
-        draw = ImageDraw.Draw(padded_screenshot)
-        font_size = 12
+    def resolve_node(self, node: TreeElementNode):
+        """Live accessible for a node: its reference if still valid, else the element at its path with the same role and name."""
+        if not ATSPI_AVAILABLE:
+            return None
+        accessible = node.accessible
         try:
-            font = ImageFont.truetype('arial.ttf', font_size)
-        except IOError:
-            font = ImageFont.load_default()
-
-        def draw_annotation(label, node: TreeElementNode):
-            box = node.bounding_box
-            color = self.get_random_color()
-
-            # Scale and pad the bounding box
-            adjusted_box = (
-                int(box.left * scale) + padding,
-                int(box.top * scale) + padding,
-                int(box.right * scale) + padding,
-                int(box.bottom * scale) + padding
-            )
-            # Draw bounding box
-            draw.rectangle(adjusted_box, outline=color, width=2)
+            if accessible is not None and not accessible.getState().contains(pyatspi.STATE_DEFUNCT):
+                return accessible
+        except Exception:
+            pass
+        if not node.element_id:
+            return None
+        try:
+            accessible = pyatspi.Registry.getDesktop(0)
+            for index in node.element_id:
+                accessible = accessible.getChildAtIndex(index)
+                if accessible is None:
+                    return None
+            role_name = accessible.getRole().value_name
+            if role_name.replace('ROLE_', '').title() != node.control_type or (accessible.name or role_name) != node.name:
+                return None
+        except Exception:
+            return None
+        node.accessible = accessible
+        return accessible
 
-            # Label dimensions
-            label_width = draw.textlength(str(label), font=font)
-            label_height = font_size
-            left, top, right, bottom = adjusted_box
+    def is_node_in_place(self, node: TreeElementNode) -> bool:
+        """Whether the node's element is still showing and still covers the centre it was observed at."""
+        accessible = self.resolve_node(node)
+        if accessible is None:
+            return False
+        try:
+            if not accessible.getState().contains(pyatspi.STATE_SHOWING):
+                return False
+            return bool(accessible.queryComponent().contains(node.center.x, node.center.y, pyatspi.DESKTOP_COORDS))
+        except Exception:
+            return False
 
-            # Label position above bounding box
-            label_x1 = right - label_width
-            label_y1 = top - label_height - 4
-            label_x2 = label_x1 + label_width
-            label_y2 = label_y1 + label_height + 4
+    def activate_node(self, node: TreeElementNode) -> bool:
+        """Trigger the node's click-like AT-SPI action instead of simulating the pointer."""
+        accessible = self.resolve_node(node)
+        if accessible is None:
+            return False
+        try:
+            # Other roles map these actions to something else than a click: 'activate' on list items, table cells
+            # and tree rows is a double click (GTK row-activated) and 'toggle' on check cells skips the selection,
+            # while text fields and value controls need real focus or a drag
+            if accessible.getRole() not in self._activatable_roles():
+                return False
+            action = accessible.queryAction()
+            names = [action.getName(i).lower() for i in range(action.nActions)]
+            for action_name in CLICK_ACTION_NAMES:
+                if action_name in names:
+                    return bool(action.doAction(names.index(action_name)))
+        except Exception:
+            return False
+        return False
 
-            # Draw label background and text
-            draw.rectangle([(label_x1, label_y1), (label_x2, label_y2)], fill=color)
-            draw.text((label_x1 + 2, label_y1 + 2), str(label), fill=(255, 255, 255), font=font)
+    def _activatable_roles(self) -> list:
+        return [
+            pyatspi.ROLE_PUSH_BUTTON,
+            pyatspi.ROLE_TOGGLE_BUTTON,
+            pyatspi.ROLE_LINK,
+            pyatspi.ROLE_MENU_ITEM,
+            pyatspi.ROLE_CHECK_MENU_ITEM,
+            pyatspi.ROLE_RADIO_MENU_ITEM,
+            pyatspi.ROLE_CHECK_BOX,
+            pyatspi.ROLE_RADIO_BUTTON,
+        ]
 
-        # Draw annotations
-        for idx, node in enumerate(nodes):
-            draw_annotation(idx, node)
-        
-        return padded_screenshot
+    def annotated_screenshot(self, nodes: list[TreeElementNode], scale: float = 0.7, screenshot: Image.Image = None) -> Image.Image:
+        """Draw numbered boxes for `nodes` onto a frame at `scale` (captures one unless given; a given frame is drawn on in place)."""
+        if screenshot is None:
+            screenshot = self.desktop.get_screenshot(scale=scale)
+        return self.desktop.annotator.render(screenshot, nodes, scale)
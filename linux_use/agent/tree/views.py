@@ -1,5 +1,6 @@
 from dataclasses import dataclass,field
 from tabulate import tabulate
+from typing import Any
 
 @dataclass
 class TreeState:
@@ -70,6 +71,9 @@ class TreeElementNode:
     bounding_box: BoundingBox
     center: Center
     app_name: str
+    # Child-index path from the AT-SPI desktop, used to re-resolve the element if its reference goes stale
+    element_id: tuple[int, ...] = ()
+    accessible: Any = field(default=None, repr=False, compare=False)
 
     def to_row(self, index: int):
         return [index, self.app_name, self.control_type, self.name, self.value, self.shortcut, self.center.to_string()]
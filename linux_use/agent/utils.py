@@ -1,42 +1,66 @@
-from langchain_core.messages import BaseMessage,HumanMessage
-from linux_use.agent.views import AgentData
-import json
-import ast
-import re
+from langchain_core.messages import BaseMessage,HumanMessage,AIMessage
+from langchain_core.messages.ai import UsageMetadata, add_usage
 
 def read_file(file_path: str) -> str:
     with open(file_path, 'r') as file:
         return file.read()
     
-def extract_agent_data(message: BaseMessage) -> AgentData:
-    text = message.content
-    # Dictionary to store extracted values
-    result = {}
-    # Extract Evaluate
-    evaluate_match = re.search(r"<evaluate>(.*?)<\/evaluate>", text, re.DOTALL)
-    if evaluate_match:
-        result['evaluate'] = evaluate_match.group(1).strip()
-    # Extract Thought
-    thought_match = re.search(r"<thought>(.*?)<\/thought>", text, re.DOTALL)
-    if thought_match:
-        result['thought'] = thought_match.group(1).strip()
-    # Extract Action-Name
-    action = {}
-    action_name_match = re.search(r"<action_name>(.*?)<\/action_name>", text, re.DOTALL)
-    if action_name_match:
-        action['name'] = action_name_match.group(1).strip()
-    # Extract and convert Action-Input to a dictionary
-    action_input_match = re.search(r"<action_input>(.*?)<\/action_input>", text, re.DOTALL)
-    if action_input_match:
-        action_input_str = action_input_match.group(1).strip()
-        try:
-            # Convert string to dictionary safely using ast.literal_eval
-            action['params'] = ast.literal_eval(action_input_str)
-        except (ValueError, SyntaxError):
-            # If there's an issue with conversion, store it as raw string
-            action['params'] = json.loads(action_input_str)
-    result['action'] = action
-    return  AgentData.model_validate(result)
+ACTION_END_TAG='</action_input>'
+BATCH_START_TAG='<actions>'
+BATCH_END_TAG='</actions>'
+
+def message_text(message: BaseMessage) -> str:
+    '''Text of a message or chunk whose content is a string or a list of content blocks.'''
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return ''.join(block if isinstance(block, str) else block.get('text', '') for block in content
+                   if isinstance(block, str) or block.get('type') == 'text')
+
+class ResponseStream:
+    '''
+    Collects a streamed response until its action is complete.
+
+    The output format puts <evaluate>, <thought> and <action_name> before <action_input>, so
+    once `</action_input>` (or `</actions>` for an action batch) has arrived the rest of the
+    generation is not needed. Each chunk is searched together with the few characters before
+    it, so a tag split across chunks is still found.
+    '''
+    def __init__(self):
+        self.parts: list[str] = []
+        self.tail = ''
+        self.batch = False
+        self.complete = False
+        # Providers report prompt usage (and cache hits) on the first chunks, so it survives an early stop
+        self.usage: UsageMetadata | None = None
+
+    def feed(self, chunk: BaseMessage) -> bool:
+        '''Add a chunk; True once the action input is closed (later chunks are ignored).'''
+        if self.complete:
+            return True
+        usage = getattr(chunk, 'usage_metadata', None)
+        if usage:
+            self.usage = add_usage(self.usage, usage)
+        text = message_text(chunk)
+        window = self.tail + text
+        # A batch opens before its first action, so this is known before any `</action_input>`
+        self.batch = self.batch or BATCH_START_TAG in window
+        end_tag = BATCH_END_TAG if self.batch else ACTION_END_TAG
+        index = window.find(end_tag)
+        if index < 0:
+            self.parts.append(text)
+            self.tail = window[-(len(ACTION_END_TAG) - 1):]
+            return False
+        self.parts.append(text[:index + len(end_tag) - len(self.tail)])
+        self.complete = True
+        return True
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.parts)
+
+    def message(self) -> AIMessage:
+        return AIMessage(content=self.text, usage_metadata=self.usage)
 
 def image_message(prompt,image)->HumanMessage:
     return HumanMessage(content=[
@@ -1,4 +1,4 @@
-from pydantic import BaseModel,Field
+from pydantic import BaseModel,Field,model_validator
     
 class AgentResult(BaseModel):
     content:str|None=None
@@ -7,8 +7,28 @@ class AgentResult(BaseModel):
 class Action(BaseModel):
     name:str
     params: dict=Field(default_factory=dict)
+    # Label of the interactive element that must still be in place when the action runs
+    expect: int|None=None
+    # Id of the tool call the action came from, when the model called tools natively
+    call_id: str|None=None
 
 class AgentData(BaseModel):
     evaluate: str
     thought: str
-    action: Action
+    actions: list[Action]=Field(min_length=1)
+
+    @model_validator(mode='before')
+    @classmethod
+    def single_action(cls,data):
+        if isinstance(data,dict) and 'action' in data and 'actions' not in data:
+            data={key:value for key,value in data.items() if key!='action'}|{'actions':[data['action']]}
+        return data
+
+    @property
+    def action(self)->Action:
+        '''The first (or only) action of the step.'''
+        return self.actions[0]
+
+    @property
+    def is_batch(self)->bool:
+        return len(self.actions)>1
@@ -244,6 +244,8 @@ class DashboardScreen(Screen):
     
     def action_quit(self) -> None:
         """Quit the application"""
+        if self.agent_service:
+            self.agent_service.close_agent()
         self.app.exit()
     
     async def execute_agent_task(self, task: str) -> None:
@@ -1,6 +1,5 @@
 """Agent Manager Service"""
 
-import asyncio
 from typing import Optional, Callable
 from dataclasses import dataclass
 import time
@@ -57,7 +56,8 @@ class AgentManager:
                 timeout=60
             )
             
-            # Create agent
+            # Create agent, releasing the desktop of the one it replaces
+            self.close_agent()
             self.agent = Agent(
                 instructions=config.get('instructions', ["You are a helpful Linux automation assistant"]),
                 browser=Browser.FIREFOX,
@@ -85,7 +85,7 @@ class AgentManager:
             self.is_running = True
             
             # Execute task
-            result = await asyncio.to_thread(self.agent.print_response, task)
+            result = await self.agent.aprint_response(task)
             
             self.status.steps_completed += 1
             self._update_status('idle', 'Task completed')
@@ -108,6 +108,12 @@ class AgentManager:
         self.is_running = False
         self._update_status('idle', 'Stopped by user')
     
+    def close_agent(self):
+        """Release the agent's desktop (threads, shells, X connections)"""
+        if self.agent:
+            self.agent.close()
+            self.agent = None
+    
     def get_status(self) -> AgentStatus:
         """Get current agent status"""
         return self.status
@@ -99,6 +99,12 @@ class AgentService:
         self.is_running = False
         self.current_task = None
     
+    def close_agent(self):
+        """Release the agent's desktop (threads, shells, X connections)"""
+        if self.agent:
+            self.agent.close()
+            self.agent = None
+    
     def get_status(self) -> dict:
         """Get current agent status"""
         return {
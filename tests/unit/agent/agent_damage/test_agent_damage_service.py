@@ -0,0 +1,81 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from time import monotonic
+from Xlib import X
+
+from linux_use.agent.damage.service import DamageTracker, TrackedWindow
+
+DAMAGE_NOTIFY = 91
+
+
+def rectangle(x, y, width, height):
+    return SimpleNamespace(x=x, y=y, width=width, height=height)
+
+
+def damage_event(window, area, geometry):
+    return SimpleNamespace(type=DAMAGE_NOTIFY, drawable=SimpleNamespace(id=window), area=area, drawable_geometry=geometry)
+
+
+@pytest.fixture
+def tracker():
+    """Provides a tracker on a 1000x800 screen with one client window (frame 10, client 11) at (100, 100)."""
+    tracker = DamageTracker(history_size=8)
+    tracker.connection = MagicMock()
+    tracker.root = SimpleNamespace(id=1)
+    tracker.screen_size = (1000, 800)
+    tracker.notify_type = DAMAGE_NOTIFY
+    tracker.available = True
+    tracker.started = tracker.truncated_at = monotonic()
+    tracker.windows[10] = TrackedWindow(damage_id=500, client=11, geometry=(100, 100, 500, 400))
+    return tracker
+
+
+class TestDamageTracker:
+    def test_damage_is_reported_in_screen_coordinates_per_client(self, tracker):
+        since = monotonic()
+        damaged = set()
+        tracker.handle_event(damage_event(10, rectangle(10, 20, 30, 40), rectangle(100, 100, 400, 300)), damaged)
+        tracker.handle_event(damage_event(10, rectangle(200, 200, 10, 10), rectangle(100, 100, 400, 300)), damaged)
+
+        changes = tracker.get_changes(since)
+        assert changes.complete and changes.windows == [11]
+        assert changes.regions[11] == (110, 120, 310, 310)
+        assert damaged == {500}
+        assert tracker.idle_since() >= since
+
+    def test_nothing_changed_since_last_query(self, tracker):
+        tracker.handle_event(damage_event(10, rectangle(0, 0, 5, 5), rectangle(100, 100, 400, 300)), set())
+        changes = tracker.get_changes(monotonic())
+        assert not changes.changed and changes.bounding_box is None
+
+    def test_regions_are_clipped_to_the_screen(self, tracker):
+        since = monotonic()
+        tracker.handle_event(damage_event(10, rectangle(0, 0, 2000, 50), rectangle(-50, 0, 2000, 50)), set())
+        tracker.handle_event(damage_event(10, rectangle(0, 0, 10, 10), rectangle(1200, 0, 10, 10)), set())
+        assert tracker.changed_regions(since) == [(0, 0, 1000, 50)]
+
+    def test_move_changes_old_and_new_area(self, tracker):
+        since = monotonic()
+        event = SimpleNamespace(type=X.ConfigureNotify, window=SimpleNamespace(id=10), x=300, y=100, width=400, height=300)
+        tracker.handle_event(event, set())
+        assert tracker.get_changes(since).regions[11] == (100, 100, 700, 400)
+        assert tracker.windows[10].geometry == (300, 100, 700, 400)
+
+    def test_unmap_exposes_the_window_area(self, tracker):
+        since = monotonic()
+        tracker.handle_event(SimpleNamespace(type=X.UnmapNotify, window=SimpleNamespace(id=10)), set())
+        assert 10 not in tracker.windows
+        tracker.connection.damage_destroy.assert_called_once_with(500)
+        assert tracker.changed_regions(since) == [(100, 100, 500, 400)]
+
+    def test_dropped_history_makes_older_queries_incomplete(self, tracker):
+        since = monotonic()
+        for _ in range(10):
+            tracker.handle_event(damage_event(10, rectangle(0, 0, 5, 5), rectangle(100, 100, 400, 300)), set())
+        assert not tracker.get_changes(since).complete
+        assert tracker.get_changes(tracker.history[0][0]).complete
+
+    def test_unavailable_tracker_reports_unknown_changes(self):
+        changes = DamageTracker().get_changes(monotonic())
+        assert changes.changed and not changes.complete
@@ -0,0 +1,55 @@
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from linux_use.agent.display import service
+from linux_use.agent.display.service import bind_accessibility_bus, get_accessibility_bus
+from linux_use.agent.display.views import DisplayTarget
+
+
+@pytest.fixture
+def unbound():
+    """Resets the process-wide AT-SPI bus binding and its environment variable around a test."""
+    with patch.object(service, 'bound_bus', service.UNBOUND), patch.dict(os.environ, clear=False):
+        os.environ.pop('AT_SPI_BUS_ADDRESS', None)
+        yield
+
+
+class TestBindAccessibilityBus:
+    def test_first_binding_sets_the_bus_for_the_process(self, unbound):
+        assert bind_accessibility_bus('unix:path=/tmp/bus-99')
+        assert os.environ['AT_SPI_BUS_ADDRESS'] == 'unix:path=/tmp/bus-99'
+        assert bind_accessibility_bus('unix:path=/tmp/bus-99')
+
+    def test_other_bus_is_refused_once_bound(self, unbound):
+        assert bind_accessibility_bus(None)
+        assert not bind_accessibility_bus('unix:path=/tmp/bus-99')
+        assert 'AT_SPI_BUS_ADDRESS' not in os.environ
+
+
+class TestGetAccessibilityBus:
+    def test_reads_root_window_property(self):
+        connection = MagicMock()
+        connection.screen.return_value.root.get_full_property.return_value = SimpleNamespace(value=b'unix:path=/tmp/bus-99\x00')
+        assert get_accessibility_bus(connection) == 'unix:path=/tmp/bus-99'
+
+    def test_missing_property(self):
+        connection = MagicMock()
+        connection.screen.return_value.root.get_full_property.return_value = None
+        assert get_accessibility_bus(connection) is None
+        assert get_accessibility_bus(None) is None
+
+
+class TestDisplayTarget:
+    def test_environment_routes_helpers_to_the_display(self):
+        env = DisplayTarget(name=':99', atspi_bus='unix:path=/tmp/bus-99').environment()
+        assert env['DISPLAY'] == ':99'
+        assert env['AT_SPI_BUS_ADDRESS'] == 'unix:path=/tmp/bus-99'
+
+    def test_ambient_target_keeps_environment(self):
+        with patch.dict(os.environ, {'DISPLAY': ':0'}):
+            target = DisplayTarget()
+            assert target.is_ambient and DisplayTarget(name=':0').is_ambient
+            assert not DisplayTarget(name=':99').is_ambient
+            assert target.environment()['DISPLAY'] == ':0'
@@ -0,0 +1,168 @@
+from unittest.mock import MagicMock, patch
+
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+
+from linux_use.agent.history.config import IMAGE_PLACEHOLDER
+from linux_use.agent.history.service import HistoryManager, estimate_tokens, get_image_urls
+from linux_use.agent.history.views import HistoryConfig
+from linux_use.agent.prompt.service import Prompt
+from linux_use.agent.registry.service import Registry
+from linux_use.agent.repair.service import ResponseParser
+from linux_use.agent.tools.service import click_tool
+from linux_use.agent.utils import image_message, message_text
+from linux_use.agent.views import AgentData
+from linux_use.agent.desktop.views import DesktopState
+from linux_use.agent.screenshot.views import FrameChange, FrameChangeType
+from linux_use.agent.tree.views import TreeState
+
+PARSER = ResponseParser(Registry([click_tool]))
+
+
+def transcript(steps, result_size=400):
+    """A transcript as the agent builds it: system, opening observation, then action and result per step, then the current observation."""
+    messages = [SystemMessage(content="system " * 500), HumanMessage(content=Prompt.previous_observation_prompt(1, 100, None))]
+    for step in range(1, steps + 1):
+        agent_data = AgentData(evaluate="ok", thought="next", action={"name": "Click Tool", "params": {"loc": [step, step]}})
+        messages.append(AIMessage(content=Prompt.action_prompt(agent_data)))
+        result = f"Clicked element {step}. " + "x" * result_size
+        messages.append(HumanMessage(content=Prompt.previous_observation_prompt(step + 1, 100, result)))
+    messages.append(HumanMessage(content="current observation " * 200))
+    return messages
+
+
+def history_tokens(view):
+    return sum(estimate_tokens(message) for message in view[1:-1])
+
+
+class TestHistoryManager:
+    def test_short_transcript_is_unchanged(self):
+        messages = transcript(3)
+        assert HistoryManager(HistoryConfig(keep_steps=6)).view(messages) == messages
+
+    def test_old_steps_are_summarized(self):
+        """
+        What is being tested:
+            - The last K steps are sent verbatim, older ones as one summary line each.
+            - The system prompt and the current observation are always kept.
+        """
+        messages = transcript(10)
+        view = HistoryManager(HistoryConfig(keep_steps=2, max_tokens=100000), parser=PARSER).view(messages)
+
+        assert view[0] is messages[0] and view[-1] is messages[-1]
+        assert view[2:-1] == messages[-5:-1]
+        summary = view[1].content
+        assert "Step 1: Click Tool(loc=[1, 1]) -> Clicked element 1." in summary
+        assert "Step 8: Click Tool(loc=[8, 8])" in summary
+        assert "Step 9:" not in summary
+
+    def test_ceiling_keeps_cost_flat(self):
+        """
+        What is being tested:
+            - The history never exceeds the token ceiling, so step 40 costs about what step 4 costs.
+        """
+        manager = HistoryManager(HistoryConfig(keep_steps=6, max_tokens=1500), parser=PARSER)
+        early = history_tokens(manager.view(transcript(4)))
+        late = history_tokens(manager.view(transcript(40)))
+
+        assert late <= 1500
+        assert late < 2 * early
+
+    def test_request_never_opens_with_an_action(self):
+        """
+        What is being tested:
+            - When only the opening observation would be folded it stays verbatim, so the system prompt is followed by a user message.
+        """
+        history = HistoryManager(HistoryConfig(keep_steps=2), parser=PARSER)
+        for steps in range(1, 6):
+            view = history.view(transcript(steps))
+            assert not isinstance(view[1], AIMessage)
+
+    def test_oldest_summary_lines_are_dropped(self):
+        view = HistoryManager(HistoryConfig(keep_steps=0, max_tokens=200), parser=PARSER).view(transcript(40))
+
+        assert history_tokens(view) <= 200
+        assert "earlier steps omitted" in view[1].content
+        assert "Step 40:" in view[1].content
+
+
+def observation(step):
+    return image_message(prompt=f"observation {step}", image=f"data:image/jpeg;base64,{'A' * 1000}{step}")
+
+
+class TestImageRetention:
+    def test_only_newest_images_are_kept(self):
+        """
+        What is being tested:
+            - The newest image messages keep their images; older ones become text with a placeholder, in place.
+        """
+        messages = [SystemMessage(content="system")]
+        for step in range(5):
+            messages += [AIMessage(content=f"action {step}"), observation(step)]
+        HistoryManager().retain_images(messages, keep=2)
+
+        kept = [message for message in messages if get_image_urls(message)]
+        assert [message_text(message) for message in kept] == ["observation 3", "observation 4"]
+        assert messages[2].content == f"observation 0\n{IMAGE_PLACEHOLDER}"
+        assert len(messages) == 11
+
+    def test_pinned_image_is_kept(self):
+        """
+        What is being tested:
+            - The reference frame keeps its image beyond the newest ones, and its step is never folded into the summary.
+        """
+        messages = [SystemMessage(content="system"), observation(0)]
+        for step in range(1, 5):
+            messages += [AIMessage(content=f"action {step}"), observation(step)]
+        pinned = get_image_urls(messages[1])[0]
+        history = HistoryManager(HistoryConfig(keep_steps=1, keep_images=2))
+        history.retain_images(messages, keep=1, pinned=pinned)
+
+        kept = [message_text(message) for message in messages if get_image_urls(message)]
+        assert kept == ["observation 0", "observation 4"]
+        view = history.view(messages, pinned=pinned)
+        assert view == messages
+
+    def test_report_counts_payload(self):
+        messages = [SystemMessage(content="system"), observation(1), observation(2)]
+        report = HistoryManager().report(messages)
+
+        assert report.messages == 3 and report.images == 2
+        assert report.image_bytes == 2 * len(get_image_urls(messages[1])[0])
+        assert report.rss > 0
+        HistoryManager().retain_images(messages, keep=1)
+        assert HistoryManager().report(messages).image_bytes == report.image_bytes // 2
+
+
+def click(step):
+    return AIMessage(content=f"<evaluate>ok</evaluate><thought>step {step}</thought>"
+                             "<action_name>Click Tool</action_name><action_input>{'loc': [10, 20]}</action_input>")
+
+
+class TestAgentReferenceFrame:
+    def test_reference_frame_outlives_the_kept_images(self):
+        """
+        What is being tested:
+            - With the default configuration (one kept image) the full frame that later crops refer to is still sent with them.
+            - The agent's desktop compares frames without a retention window.
+        """
+        frames = [("A", FrameChangeType.FULL), ("B", FrameChangeType.PARTIAL), ("C", FrameChangeType.PARTIAL)]
+        states = [DesktopState(apps=[], active_app=None, screenshot=f"data:image/png;base64,{image}", tree_state=TreeState(),
+                               frame_change=FrameChange(type=change, frame_index=index + 1, reference_index=1))
+                  for index, (image, change) in enumerate(frames)]
+        llm = MagicMock()
+        llm.invoke.side_effect = [click(1), click(2), AIMessage(content=(
+            "<evaluate>ok</evaluate><thought>done</thought>"
+            "<action_name>Done Tool</action_name><action_input>{'answer': 'done'}</action_input>"))]
+        with patch("linux_use.agent.service.Desktop") as MockDesktop:
+            desktop = MockDesktop.return_value
+            desktop.frame_comparator = None
+            desktop.get_state.side_effect = states
+            desktop.get_default_language.return_value = "English"
+            from linux_use.agent.service import Agent
+            result = Agent(llm=llm, use_vision=True).invoke("click twice")
+
+        assert result.content == "done"
+        assert "keep_images" not in MockDesktop.call_args.kwargs
+        last_request = llm.invoke.call_args_list[-1].args[0]
+        images = [image for message in last_request for image in get_image_urls(message)]
+        assert images == ["data:image/png;base64,A", "data:image/png;base64,C"]
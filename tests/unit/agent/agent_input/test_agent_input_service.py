@@ -0,0 +1,195 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from Xlib import X, XK
+
+from linux_use.agent.input.service import InputController, XTestInput, PyAutoGUIInput, TextEntry, Clipboard, create_input_controller
+from linux_use.agent.input.views import InputBackend, InputDelays, TextEntryMethod
+
+
+# Keycodes of a minimal US layout: keysym -> (keycode, level)
+KEYMAP = {
+    XK.string_to_keysym('a'): (38, 0),
+    XK.string_to_keysym('A'): (38, 1),
+    XK.string_to_keysym('exclam'): (10, 1),
+    XK.string_to_keysym('1'): (10, 0),
+    XK.string_to_keysym('Return'): (36, 0),
+    XK.string_to_keysym('Control_L'): (37, 0),
+    XK.string_to_keysym('Shift_L'): (50, 0),
+    XK.string_to_keysym('F5'): (71, 0),
+}
+
+
+@pytest.fixture
+def connection():
+    """Provides a mock X connection with the XTEST extension and a small keyboard map."""
+    connection = MagicMock()
+    connection.query_extension.return_value.present = True
+    connection.keysym_to_keycode.side_effect = lambda keysym: KEYMAP.get(keysym, (0, 0))[0]
+
+    def keycode_to_keysym(keycode, index):
+        return next((keysym for keysym, (code, level) in KEYMAP.items() if code == keycode and level == index), 0)
+
+    connection.keycode_to_keysym.side_effect = keycode_to_keysym
+    # Keycodes 8-99, of which 98 and 99 carry no keysyms
+    connection.display.info.min_keycode = 8
+    connection.display.info.max_keycode = 99
+    connection.get_keyboard_mapping.return_value = [[1, 1]] * 90 + [[0, 0], [0, 0]]
+    return connection
+
+
+@pytest.fixture
+def events():
+    """Records the events injected through XTEST as (type, detail) pairs."""
+    recorded = []
+    with patch('linux_use.agent.input.service.xtest.fake_input',
+               side_effect=lambda connection, event_type, detail=0, **kwargs: recorded.append((event_type, detail or kwargs))):
+        yield recorded
+
+
+class TestXTestInput:
+    def test_click_moves_then_presses_button_and_flushes_once(self, connection, events):
+        controller = XTestInput(connection, InputDelays(click=0))
+        controller.click(10, 20, button='right', clicks=2)
+        assert events == [(X.MotionNotify, {'x': 10, 'y': 20}), (X.ButtonPress, 3), (X.ButtonRelease, 3),
+                          (X.ButtonPress, 3), (X.ButtonRelease, 3)]
+        connection.sync.assert_called_once()
+
+    def test_scroll_uses_wheel_buttons(self, connection, events):
+        XTestInput(connection, InputDelays(scroll=0)).scroll('left', 2)
+        assert events == [(X.ButtonPress, 6), (X.ButtonRelease, 6), (X.ButtonPress, 6), (X.ButtonRelease, 6)]
+
+    def test_hotkey_releases_in_reverse_order(self, connection, events):
+        XTestInput(connection, InputDelays(key=0)).hotkey('ctrl', 'a')
+        assert events == [(X.KeyPress, 37), (X.KeyPress, 38), (X.KeyRelease, 38), (X.KeyRelease, 37)]
+
+    def test_key_names_follow_pyautogui(self, connection, events):
+        controller = XTestInput(connection, InputDelays(key=0))
+        controller.press('enter')
+        controller.press('f5')
+        assert [detail for _, detail in events] == [36, 36, 71, 71]
+        with pytest.raises(ValueError):
+            controller.press('nosuchkey')
+
+    def test_type_text_adds_shift_for_shifted_characters(self, connection, events):
+        XTestInput(connection, InputDelays(type=0)).type_text('aA!')
+        assert events == [(X.KeyPress, 38), (X.KeyRelease, 38),
+                          (X.KeyPress, 50), (X.KeyPress, 38), (X.KeyRelease, 38), (X.KeyRelease, 50),
+                          (X.KeyPress, 50), (X.KeyPress, 10), (X.KeyRelease, 10), (X.KeyRelease, 50)]
+        connection.sync.assert_called_once()
+
+    def test_type_text_remaps_spare_keycodes_for_unmapped_characters(self, connection, events):
+        controller = XTestInput(connection, InputDelays(type=0))
+        with patch('linux_use.agent.input.service.sleep'):
+            controller.type_text('éжéж€')
+        assert [detail for event_type, detail in events if event_type == X.KeyPress] == [98, 99, 98, 99, 98]
+        mappings = [call.args for call in connection.change_keyboard_mapping.call_args_list]
+        # é and ж share the two spare keycodes, € reuses the first once both are taken, then both are released
+        assert mappings == [(98, [(0xe9, 0xe9)]), (99, [(0x1000436, 0x1000436)]), (98, [(0x10020ac, 0x10020ac)]),
+                            (98, [(0, 0)]), (99, [(0, 0)])]
+
+    def test_settle_delay_per_action(self, connection, events):
+        controller = XTestInput(connection, InputDelays(move=0.0, click=0.25))
+        with patch('linux_use.agent.input.service.sleep') as sleep:
+            controller.move(1, 1)
+            sleep.assert_not_called()
+            controller.click(1, 1)
+            sleep.assert_called_once_with(0.25)
+
+
+class TestPyAutoGUIInput:
+    def test_click_after_moving_to_a_corner(self):
+        import pyautogui as pg
+        pointer = [(100, 100)]
+
+        def fail_safe(*args, **kwargs):
+            # pyautogui checks the pointer before every call, even with _pause=False
+            if pg.FAILSAFE and pointer[0] == (0, 0):
+                raise RuntimeError("fail-safe triggered")
+
+        def move_to(x, y, **kwargs):
+            fail_safe()
+            pointer[0] = (x, y)
+
+        with patch.object(pg, "moveTo", side_effect=move_to), \
+                patch.object(pg, "mouseDown", side_effect=fail_safe) as mouse_down, \
+                patch.object(pg, "mouseUp", side_effect=fail_safe):
+            controller = PyAutoGUIInput(InputDelays(move=0, click=0))
+            controller.move(0, 0)
+            controller.click()
+
+        mouse_down.assert_called_once_with(button="left", _pause=False)
+
+
+class TestCreateInputController:
+    def test_falls_back_to_pyautogui_without_xtest(self, connection):
+        connection.query_extension.return_value.present = False
+        assert isinstance(create_input_controller(InputBackend.XTEST, connection), PyAutoGUIInput)
+        assert isinstance(create_input_controller('xtest', None), PyAutoGUIInput)
+
+    def test_selects_backend(self, connection):
+        assert create_input_controller('xtest', connection).backend == InputBackend.XTEST
+        assert create_input_controller('pyautogui', connection).backend == InputBackend.PYAUTOGUI
+
+    def test_incomplete_backend_fails_at_construction(self):
+        class PointerOnlyInput(InputController):
+            def position(self):
+                return (0, 0)
+
+            def move_pointer(self, x, y):
+                pass
+
+        with pytest.raises(TypeError, match="button_event"):
+            PointerOnlyInput()
+
+
+class TestTextEntry:
+    @pytest.fixture
+    def controller(self):
+        controller = MagicMock()
+        controller.is_on_keymap.side_effect = str.isascii
+        return controller
+
+    @pytest.fixture
+    def entry(self):
+        entry = TextEntry()
+        entry.clipboard = MagicMock(available=True)
+        entry.clipboard.paste.return_value = True
+        return entry
+
+    def test_prefers_accessibility(self, entry, controller):
+        with patch.object(TextEntry, 'insert_accessible', return_value=True) as insert:
+            assert entry.enter(controller, 'hello', loc=(5, 5), clear=True) == TextEntryMethod.ACCESSIBILITY
+        insert.assert_called_once_with('hello', (5, 5), True)
+        controller.hotkey.assert_not_called()
+
+    def test_pastes_long_or_off_keymap_text(self, entry, controller):
+        with patch.object(TextEntry, 'insert_accessible', return_value=False):
+            assert entry.enter(controller, 'x' * 2048, loc=(5, 5)) == TextEntryMethod.CLIPBOARD
+            assert entry.enter(controller, 'héllo', loc=(5, 5)) == TextEntryMethod.CLIPBOARD
+        controller.type_text.assert_not_called()
+
+    def test_types_short_text_and_when_paste_fails(self, entry, controller):
+        with patch.object(TextEntry, 'insert_accessible', return_value=False):
+            assert entry.enter(controller, 'hello', loc=(5, 5), clear=True) == TextEntryMethod.KEYS
+            entry.clipboard.paste.return_value = False
+            assert entry.enter(controller, 'x' * 64) == TextEntryMethod.KEYS
+        controller.hotkey.assert_called_once_with('ctrl', 'a')
+        assert controller.type_text.call_count == 2
+
+
+class TestClipboard:
+    def test_paste_restores_previous_text_once(self):
+        clipboard = Clipboard()
+        clipboard.commands = (['read'], ['write'])
+        controller = MagicMock()
+        with patch.object(Clipboard, 'get', return_value='previous') as get, \
+             patch.object(Clipboard, 'set', return_value=True) as set_text, \
+             patch('linux_use.agent.input.service.Timer') as timer:
+            assert clipboard.paste(controller, 'first')
+            assert clipboard.paste(controller, 'second')
+            clipboard.restore()
+        # The second paste happens before the restore, so the user's text is read only once
+        get.assert_called_once()
+        timer.return_value.cancel.assert_called_once()
+        assert [call.args[0] for call in set_text.call_args_list] == ['first', 'second', 'previous']
+        controller.hotkey.assert_called_with('ctrl', 'v')
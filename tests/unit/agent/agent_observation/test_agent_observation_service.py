@@ -0,0 +1,72 @@
+from linux_use.agent.desktop.views import DesktopState, App, Size, Status
+from linux_use.agent.observation.service import ObservationEncoder
+from linux_use.agent.observation.views import ObservationFormat
+from linux_use.agent.tree.views import TreeState, TreeElementNode, TextElementNode, ScrollElementNode, BoundingBox, Center
+
+
+def element(name, app_name, x, y, value="", shortcut="", control_type="Push_Button"):
+    box = BoundingBox(left=x - 10, top=y - 5, right=x + 10, bottom=y + 5, width=20, height=10)
+    return TreeElementNode(name=name, control_type=control_type, value=value, shortcut=shortcut,
+                           bounding_box=box, center=Center(x, y), app_name=app_name)
+
+
+def tree():
+    box = BoundingBox(left=0, top=0, right=100, bottom=100, width=100, height=100)
+    return TreeState(
+        interactive_nodes=[
+            element("Back", "Firefox", 10, 20),
+            element('Say "hi"', "Firefox", 30, 20, value="hello", control_type="Entry"),
+            element("Open", "Files", 50, 60, shortcut="Ctrl+O"),
+        ],
+        informative_nodes=[TextElementNode(name="Welcome\nback", app_name="Firefox")],
+        scrollable_nodes=[ScrollElementNode(name="Page", control_type="Scroll_Pane", app_name="Firefox", bounding_box=box,
+                                            center=Center(50, 50), horizontal_scrollable=False, horizontal_scroll_percent=0.0,
+                                            vertical_scrollable=True, vertical_scroll_percent=12.5, is_focused=True)],
+    )
+
+
+class TestObservationEncoder:
+    def test_table_is_the_default(self):
+        state = tree()
+        assert ObservationEncoder().interactive_elements(state) == state.interactive_elements_to_string()
+
+    def test_compact_interactive_elements(self):
+        """
+        What is being tested:
+            - One line per element under a header per app, with labels kept from the full list.
+            - Empty values and shortcuts are left out.
+            - Names and values are quoted only when they hold a space, a quote, "=" or "(" (or are empty).
+        """
+        state = tree()
+        state.interactive_nodes.append(element("Save as", "Files", 70, 60, value="a=b"))
+        state.interactive_nodes.append(element("", "Files", 90, 60))
+        lines = ObservationEncoder(ObservationFormat.COMPACT).interactive_elements(state).splitlines()
+
+        assert lines[1:] == [
+            "[Firefox]",
+            "0 Push_Button Back (10,20)",
+            '1 Entry "Say \\"hi\\"" value=hello (30,20)',
+            "[Files]",
+            "2 Push_Button Open shortcut=Ctrl+O (50,60)",
+            '3 Push_Button "Save as" value="a=b" (70,60)',
+            '4 Push_Button "" (90,60)',
+        ]
+
+    def test_compact_informative_and_scrollable(self):
+        encoder = ObservationEncoder("compact")
+        assert encoder.informative_elements(tree()) == "[Firefox]\nWelcome back"
+        # Scrollable labels continue after the interactive ones
+        assert encoder.scrollable_elements(tree()).splitlines()[2] == '3 Scroll_Pane Page (50,50) vertical=12.5% focused'
+
+    def test_compact_apps(self):
+        app = App(name="Firefox", depth=0, status=Status.MAXIMIZED, size=Size(width=1920, height=1080), handle=42)
+        state = DesktopState(apps=[app], active_app=None, screenshot=None, tree_state=TreeState())
+        encoder = ObservationEncoder(ObservationFormat.COMPACT)
+
+        assert encoder.apps(state) == "Firefox (Maximized, 1920x1080, depth=0, handle=42)"
+        assert encoder.active_app(state) == state.active_app_to_string()
+
+    def test_compact_is_smaller(self):
+        state = tree()
+        table, compact = ObservationEncoder(), ObservationEncoder(ObservationFormat.COMPACT)
+        assert len(compact.interactive_elements(state)) < len(table.interactive_elements(state))
@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from linux_use.agent.desktop.views import DesktopState
+from linux_use.agent.prompt_cache.config import CACHE_CONTROL
+from linux_use.agent.prompt_cache.service import cached_system_message, get_cache_stats, supports_cache_control
+from linux_use.agent.tree.views import TreeState
+
+
+def response(name, params):
+    return (f"<evaluate>ok</evaluate><thought>t</thought>"
+            f"<action_name>{name}</action_name><action_input>{params!r}</action_input>")
+
+
+class RecordingChatModel(BaseChatModel):
+    """Answers from a script, records every request and reports the system prompt as cached once it was seen."""
+    responses: list[str]
+    requests: list = []
+    seen_prefixes: set = set()
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.requests.append(messages)
+        prefix = repr(messages[0].content)
+        prefix_tokens, total = len(prefix) // 4, sum(len(repr(message.content)) for message in messages) // 4
+        cached = prefix_tokens if prefix in self.seen_prefixes else 0
+        self.seen_prefixes.add(prefix)
+        usage = {"input_tokens": total, "output_tokens": 10, "total_tokens": total + 10,
+                 "input_token_details": {"cache_read": cached, "cache_creation": prefix_tokens - cached}}
+        message = AIMessage(content=self.responses[len(self.requests) - 1], usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class TestPromptCache:
+    def test_anthropic_models_get_a_breakpoint(self):
+        llm = ChatAnthropic(model="claude-sonnet-4-5", api_key="test")
+        assert supports_cache_control(llm)
+        assert supports_cache_control(llm.bind(stop=["</output>"]))
+        payload = llm._get_request_payload([cached_system_message("static prefix", True), HumanMessage(content="step")])
+        assert payload["system"] == [{"type": "text", "text": "static prefix", "cache_control": CACHE_CONTROL}]
+
+    def test_other_models_get_plain_text(self):
+        assert not supports_cache_control(RecordingChatModel(responses=[]))
+        assert cached_system_message("static prefix", False).content == "static prefix"
+
+    def test_stats_from_usage(self):
+        message = AIMessage(content="", usage_metadata={"input_tokens": 100, "output_tokens": 1, "total_tokens": 101,
+                                                          "input_token_details": {"cache_read": 80}})
+        stats = get_cache_stats(message)
+        assert stats.cache_read == 80 and stats.hit_ratio == 0.8
+        assert get_cache_stats(AIMessage(content="")) is None
+
+    def test_prefix_is_stable_across_steps(self):
+        """
+        What is being tested:
+            - Every request of a task starts with the byte-identical system message.
+            - Cache hits reported by the model are added up for the task.
+        """
+        state = DesktopState(apps=[], active_app=None, screenshot=None, tree_state=TreeState())
+        llm = RecordingChatModel(responses=[response("Wait Tool", {"duration": 0})] * 3 + [response("Done Tool", {"answer": "done"})])
+        with patch("linux_use.agent.service.Desktop") as MockDesktop:
+            desktop = MockDesktop.return_value
+            desktop.frame_comparator = None
+            desktop.get_state.return_value = state
+            desktop.get_default_language.return_value = "English"
+            from linux_use.agent.service import Agent
+            agent = Agent(llm=llm)
+            result = agent.invoke("wait a bit")
+
+        assert result.content == "done"
+        assert len(llm.requests) == 4
+        assert len({request[0].content for request in llm.requests}) == 1
+        assert agent.cache_stats.calls == 4
+        assert agent.cache_stats.cache_read == 3 * (len(repr(llm.requests[0][0].content)) // 4)
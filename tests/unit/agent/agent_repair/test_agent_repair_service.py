@@ -0,0 +1,119 @@
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+
+from linux_use.agent.desktop.views import DesktopState
+from linux_use.agent.registry.service import Registry
+from linux_use.agent.repair.service import ResponseParser, parse_params
+from linux_use.agent.tools.service import click_tool, done_tool, type_tool, scroll_tool
+from linux_use.agent.tree.views import TreeState
+
+
+@pytest.fixture
+def parser():
+    return ResponseParser(Registry([click_tool, type_tool, scroll_tool, done_tool]))
+
+
+class RecordingChatModel(FakeMessagesListChatModel):
+    """Answers from a script and records every request."""
+    requests: list = []
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.requests.append(messages)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+class TestParams:
+    @pytest.mark.parametrize("text, expected, relaxed", [
+        ("{'loc': (10, 20)}", {"loc": (10, 20)}, False),
+        ('{"clear": true, "text": null}', {"clear": True, "text": None}, False),
+        ("{'clear': true, 'text': 'a'}", {"clear": True, "text": "a"}, True),
+        ("{'clear': 'true', 'enter': false, 'text': 'null'}", {"clear": "true", "enter": False, "text": "null"}, True),
+        ('{"loc": [10, 20], "clear": true,}', {"loc": [10, 20], "clear": True}, True),
+        ("{loc: [10, 20], text: 'hi'}", {"loc": [10, 20], "text": "hi"}, True),
+        ('{"text": "hi"', {"text": "hi"}, True),
+    ])
+    def test_parse_chain(self, text, expected, relaxed):
+        assert parse_params(text) == (expected, relaxed)
+
+    def test_not_a_dictionary(self):
+        with pytest.raises(ValueError):
+            parse_params("[10, 20]")
+
+
+class TestResponseParser:
+    def test_well_formed_response_needs_no_repair(self, parser):
+        parsed = parser.parse("<evaluate>ok</evaluate><thought>t</thought>"
+                              "<action_name>Click Tool</action_name><action_input>{'loc': (10, 20)}</action_input>")
+        assert parsed.is_success and parsed.repairs == []
+        assert parsed.agent_data.action.params == {"loc": (10, 20)}
+
+    def test_fenced_response_with_unclosed_input(self, parser):
+        parsed = parser.parse("```xml\n<output>\n<evaluate>ok</evaluate>\n<thought>t</thought>\n"
+                              "<action_name>Click Tool</action_name>\n<action_input>{\"loc\": [10, 20]}\n</output>\n```")
+        assert parsed.is_success
+        assert parsed.agent_data.action.params == {"loc": [10, 20]}
+        assert parsed.repairs == ["dropped markdown fences", "closed <action_input>"]
+
+    def test_names_and_params_are_coerced_to_the_schema(self, parser):
+        parsed = parser.parse("<evaluate>ok</evaluate><thought>t</thought><action_name>type</action_name>"
+                              "<action_input>{'loc': '(10, 20)', 'text': 42, 'press_enter': True}</action_input>")
+        action = parsed.agent_data.action
+        assert action.name == "Type Tool"
+        assert action.params == {"loc": (10, 20), "text": "42", "press_enter": "true"}
+
+    def test_split_coordinates(self, parser):
+        parsed = parser.parse("<evaluate>ok</evaluate><thought>t</thought><action_name>click_tool</action_name>"
+                              "<action_input>{'x': 10, 'y': 20}</action_input>")
+        assert parsed.agent_data.action.name == "Click Tool"
+        assert parsed.agent_data.action.params == {"loc": (10, 20)}
+
+    def test_unknown_or_misspelt_tool_is_reported(self, parser):
+        for name in ("Teleport Tool", "Clik Tool"):
+            parsed = parser.parse("<evaluate>ok</evaluate><thought>t</thought>"
+                                  f"<action_name>{name}</action_name><action_input>{{}}</action_input>")
+            assert not parsed.is_success
+            assert f"Unknown tool '{name}'" in parsed.error
+
+    def test_batch_with_an_unclosed_action(self, parser):
+        parsed = parser.parse("<evaluate>ok</evaluate><thought>t</thought><actions>"
+                              "<action><action_name>Click Tool</action_name><action_input>{'loc': (1, 2)}</action_input>"
+                              "<action><action_name>Done Tool</action_name><action_input>{'answer': 'ok'}</action_input></action>"
+                              "</actions>")
+        assert [action.name for action in parsed.agent_data.actions] == ["Click Tool", "Done Tool"]
+
+    def test_unreadable_response_reports_why(self, parser):
+        parsed = parser.parse("I will click the button now.")
+        assert not parsed.is_success
+        assert "action_name" in parsed.error
+
+
+class TestCorrection:
+    def test_retry_gets_a_corrective_message(self):
+        """
+        What is being tested:
+            - An unrepairable response is sent back with a short note on what was wrong.
+            - The corrected response is used, and the note does not stay in the conversation.
+        """
+        state = DesktopState(apps=[], active_app=None, screenshot=None, tree_state=TreeState())
+        llm = RecordingChatModel(responses=[
+            AIMessage(content="Done, the task is finished."),
+            AIMessage(content="<evaluate>ok</evaluate><thought>t</thought><action_name>Done Tool</action_name>"
+                              "<action_input>{'answer': 'done'}</action_input>"),
+        ])
+        with patch("linux_use.agent.service.Desktop") as MockDesktop:
+            desktop = MockDesktop.return_value
+            desktop.frame_comparator = None
+            desktop.get_state.return_value = state
+            desktop.get_default_language.return_value = "English"
+            from linux_use.agent.service import Agent
+            agent = Agent(llm=llm)
+            result = agent.invoke("finish")
+
+        assert result.content == "done"
+        first, retry = llm.requests
+        assert retry[:len(first)] == first
+        assert retry[-2].content == "Done, the task is finished."
+        assert "could not be read" in retry[-1].content and "action_name" in retry[-1].content
@@ -0,0 +1,185 @@
+import pytest
+import base64
+from io import BytesIO
+from PIL import Image, ImageDraw
+
+from linux_use.agent.screenshot.service import ScreenshotEncoder, EncodeBuffer, FrameComparator
+from linux_use.agent.screenshot.views import EncoderConfig, ImageFormat, FrameChangeType
+
+
+@pytest.fixture
+def frame():
+    """Provides a busy synthetic desktop frame that does not compress trivially."""
+    image = Image.new("RGB", (1280, 720), color=(255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    for i in range(300):
+        x, y = (i * 37) % 1240, (i * 53) % 700
+        draw.rectangle((x, y, x + 40, y + 20), outline=((i * 7) % 255, (i * 13) % 255, (i * 29) % 255), width=2)
+        draw.text((x + 2, y + 2), str(i), fill=(0, 0, 0))
+    return image
+
+
+def decode(data_uri: str) -> Image.Image:
+    header, payload = data_uri.split(",", 1)
+    return Image.open(BytesIO(base64.b64decode(payload)))
+
+
+class TestEncodeBuffer:
+    """Tests for the reusable encode buffer."""
+
+    def test_grows_and_keeps_allocation(self):
+        """
+        What is being tested:
+            - Writes past the initial capacity grow the buffer.
+            - `reset` rewinds without releasing the allocation.
+        """
+        buffer = EncodeBuffer(capacity=4)
+        buffer.write(b"abcdefgh")
+        assert bytes(buffer.view()) == b"abcdefgh"
+        capacity = len(buffer.data)
+
+        buffer.reset()
+        buffer.write(b"xy")
+        assert bytes(buffer.view()) == b"xy"
+        assert len(buffer.data) == capacity
+
+
+class TestScreenshotEncoder:
+    """Tests for the ScreenshotEncoder service class."""
+
+    @pytest.mark.parametrize("image_format", list(ImageFormat))
+    def test_encode_formats(self, frame, image_format):
+        """
+        What is being tested:
+            - Every format produces a decodable data URI with the matching MIME type.
+            - The reported size matches the decoded payload size.
+        """
+        encoder = ScreenshotEncoder(EncoderConfig(format=image_format))
+        result = encoder.encode(frame)
+
+        assert result.data_uri.startswith(f"data:{image_format.mime_type};base64,")
+        assert decode(result.data_uri).size == (1280, 720)
+        assert result.size == len(base64.b64decode(result.data_uri.split(",", 1)[1]))
+        assert result.quality == (None if image_format is ImageFormat.PNG else 85)
+        assert result.encode_time >= 0
+
+    def test_target_bytes_lowers_quality_then_scale(self, frame):
+        """
+        What is being tested:
+            - A tight budget first lowers the quality down to `min_quality`, then downscales.
+            - The result fits the budget.
+        """
+        config = EncoderConfig(format=ImageFormat.JPEG, target_bytes=20_000, min_quality=50, min_scale=0.2)
+        result = ScreenshotEncoder(config).encode(frame)
+
+        assert result.size <= 20_000
+        assert result.quality == 55
+        assert result.scale < 1.0
+        assert result.width < frame.width
+        assert result.attempts > 1
+
+    def test_settings_are_reused_for_next_frame(self, frame):
+        """
+        What is being tested:
+            - The settings that fit the previous frame are the starting point for the next one.
+        """
+        encoder = ScreenshotEncoder(EncoderConfig(format=ImageFormat.JPEG, target_bytes=20_000, min_scale=0.2))
+        first = encoder.encode(frame)
+        second = encoder.encode(frame)
+
+        assert second.attempts == 1
+        assert (second.quality, second.scale) == (first.quality, first.scale)
+
+    def test_submit_runs_on_worker_thread(self, frame):
+        """
+        What is being tested:
+            - `submit` returns a future resolving to the same result as `encode`.
+        """
+        encoder = ScreenshotEncoder(EncoderConfig(format=ImageFormat.PNG))
+        result = encoder.submit(frame).result(timeout=10)
+
+        assert result.data_uri == encoder.encode(frame).data_uri
+        encoder.close()
+
+
+class TestFrameComparator:
+    """Tests for the FrameComparator service class."""
+
+    def test_first_frame_is_full(self, frame):
+        """
+        What is being tested:
+            - With no reference the frame is classified as FULL and becomes the reference.
+        """
+        comparator = FrameComparator()
+        change = comparator.compare(frame)
+
+        assert change.type == FrameChangeType.FULL
+        assert change.frame_index == change.reference_index == 1
+
+    def test_identical_frame_is_unchanged(self, frame):
+        """
+        What is being tested:
+            - A pixel-identical frame is classified as UNCHANGED without moving the reference.
+        """
+        comparator = FrameComparator()
+        comparator.compare(frame)
+        change = comparator.compare(frame.copy())
+
+        assert change.type == FrameChangeType.UNCHANGED
+        assert change.reference_index == 1
+
+    def test_small_change_is_partial_with_bounding_box(self, frame):
+        """
+        What is being tested:
+            - A localized change yields PARTIAL with a block-aligned box covering the change.
+            - The reference stays on the last full frame.
+        """
+        comparator = FrameComparator(block_size=16)
+        comparator.compare(frame)
+        changed = frame.copy()
+        ImageDraw.Draw(changed).rectangle((100, 100, 150, 130), fill=(0, 0, 0))
+        change = comparator.compare(changed)
+
+        assert change.type == FrameChangeType.PARTIAL
+        left, top, right, bottom = change.bounding_box
+        assert left <= 100 and top <= 100 and right >= 151 and bottom >= 131
+        assert right - left <= 80 and bottom - top <= 64
+        assert change.reference_index == 1 and change.frame_index == 2
+
+    def test_large_change_is_full(self, frame):
+        """
+        What is being tested:
+            - A scene change (e.g. switching apps) yields FULL and moves the reference.
+        """
+        comparator = FrameComparator()
+        comparator.compare(frame)
+        change = comparator.compare(Image.new("RGB", frame.size, color=(20, 20, 20)))
+
+        assert change.type == FrameChangeType.FULL
+        assert change.reference_index == 2
+
+    def test_reset_forgets_reference(self, frame):
+        """
+        What is being tested:
+            - After `reset` the next frame is FULL again and indices restart.
+        """
+        comparator = FrameComparator()
+        comparator.compare(frame)
+        comparator.reset()
+        change = comparator.compare(frame)
+
+        assert change.type == FrameChangeType.FULL
+        assert change.frame_index == 1
+
+    def test_reference_outside_window_is_full(self, frame):
+        """
+        What is being tested:
+            - A reference older than the window is not compared against, so the frame is FULL and becomes the reference.
+        """
+        comparator = FrameComparator(window=2)
+        comparator.compare(frame)
+        assert comparator.compare(frame.copy()).type == FrameChangeType.UNCHANGED
+        change = comparator.compare(frame.copy())
+
+        assert change.type == FrameChangeType.FULL
+        assert change.reference_index == 3
@@ -0,0 +1,139 @@
+import pytest
+import asyncio
+from threading import Thread
+from time import monotonic, sleep
+from unittest.mock import MagicMock, patch
+
+from linux_use.agent.display.service import atspi_lock
+from linux_use.agent.settle.service import ActivityMonitor, AccessibilityMonitor, SettleDetector
+from linux_use.agent.settle.views import SettleConfig
+
+
+class FakeMonitor(ActivityMonitor):
+    """Activity source driven by the test."""
+    name = 'fake'
+
+    def __init__(self, available=True):
+        super().__init__()
+        self.is_available = available
+
+    def listen(self):
+        self.available = self.is_available
+        self.ready.set()
+
+
+def make_detector(*monitors, **config):
+    return SettleDetector(SettleConfig(**config), monitors=list(monitors))
+
+
+class TestActivityMonitor:
+    def test_monitor_without_listener_fails_at_construction(self):
+        class SilentMonitor(ActivityMonitor):
+            name = 'silent'
+
+        with pytest.raises(TypeError, match="listen"):
+            SilentMonitor()
+
+
+class TestAccessibilityMonitor:
+    def test_events_are_dispatched_under_the_atspi_lock(self):
+        """
+        What is being tested:
+            - Pending events are dispatched while holding the lock every pyatspi call takes, not by a free-running main loop.
+            - The monitor is only ready once dispatching has started.
+        """
+        dispatched = []
+
+        def lock_is_free_elsewhere():
+            free = []
+            def probe():
+                free.append(atspi_lock.acquire(blocking=False))
+                if free[-1]:
+                    atspi_lock.release()
+            thread = Thread(target=probe)
+            thread.start()
+            thread.join()
+            return free[0]
+
+        context = MagicMock()
+        context.pending.side_effect = [True, False] + [False] * 1000
+        context.iteration.side_effect = lambda may_block: dispatched.append(lock_is_free_elsewhere())
+        glib = MagicMock()
+        glib.MainContext.default.return_value = context
+        with patch('linux_use.agent.settle.service.pyatspi', create=True) as atspi, \
+             patch('linux_use.agent.settle.service.GLib', glib, create=True), \
+             patch('linux_use.agent.settle.service.ATSPI_AVAILABLE', True):
+            monitor = AccessibilityMonitor()
+            monitor.start()
+            assert monitor.ready.wait(1.0)
+
+        assert monitor.available
+        assert dispatched == [False]
+        atspi.Registry.registerEventListener.assert_called_once()
+        atspi.Registry.start.assert_not_called()
+
+
+class TestSettleDetector:
+    def test_quiet_ui_settles_after_quiet_window(self):
+        result = make_detector(FakeMonitor(), quiet_window=0.05).wait()
+        assert not result.timed_out and result.monitored
+        assert 0.05 <= result.elapsed < 0.2
+
+    def test_activity_extends_the_wait(self):
+        monitor = FakeMonitor()
+        detector = make_detector(monitor, quiet_window=0.05, max_wait=2.0)
+
+        def render():
+            for _ in range(6):
+                monitor.touch()
+                sleep(0.03)
+
+        renderer = Thread(target=render)
+        renderer.start()
+        result = detector.wait()
+        renderer.join()
+        assert not result.timed_out
+        assert result.elapsed >= 0.2
+
+    def test_continuous_activity_hits_max_wait(self):
+        monitor = FakeMonitor()
+        detector = make_detector(monitor, quiet_window=0.05, max_wait=0.2)
+        stop = monotonic() + 0.5
+
+        def animate():
+            while monotonic() < stop:
+                monitor.touch()
+                sleep(0.01)
+
+        animation = Thread(target=animate)
+        animation.start()
+        result = detector.wait()
+        animation.join()
+        assert result.timed_out
+        assert result.elapsed == pytest.approx(0.2, abs=0.05)
+
+    def test_min_wait_bounds_fast_settles(self):
+        result = make_detector(FakeMonitor(), quiet_window=0.01, min_wait=0.1).wait()
+        assert result.elapsed >= 0.1
+
+    def test_without_sources_falls_back_to_fixed_wait(self):
+        result = make_detector(FakeMonitor(available=False), max_wait=0.05).wait()
+        assert not result.monitored
+        assert result.elapsed < 0.2
+
+    def test_await_settled_matches_wait(self):
+        monitor = FakeMonitor()
+        detector = make_detector(monitor, quiet_window=0.05, max_wait=2.0)
+
+        async def render():
+            for _ in range(6):
+                monitor.touch()
+                await asyncio.sleep(0.03)
+
+        async def settle():
+            result, _ = await asyncio.gather(detector.await_settled(), render())
+            return result
+
+        result = asyncio.run(settle())
+        assert not result.timed_out and result.monitored
+        assert result.elapsed >= 0.2
@@ -0,0 +1,98 @@
+import pytest
+from pathlib import Path
+
+from linux_use.agent.shell.service import OutputBuffer, ShellSession, ShellSessionManager
+
+
+@pytest.fixture
+def session(tmp_path):
+    """Provides a shell session started in a temporary directory."""
+    session = ShellSession(cwd=str(tmp_path))
+    yield session
+    session.close()
+
+
+class TestShellSession:
+    def test_state_persists_between_commands(self, session, tmp_path):
+        (tmp_path / 'child').mkdir()
+        assert session.execute('cd child && export GREETING=hello').status == 0
+        result = session.execute('pwd; echo "$GREETING"')
+        assert result.output == f'{tmp_path / "child"}\nhello\n'
+
+    def test_reports_exit_status_and_stderr(self, session):
+        result = session.execute('echo oops >&2; false')
+        assert result.status == 1
+        assert result.output == 'oops\n'
+
+    def test_syntax_error_does_not_break_framing(self, session):
+        assert session.execute('echo "unterminated').status != 0
+        assert session.execute('printf ok').output == 'ok'
+
+    def test_timeout_kills_command_but_keeps_session(self, session):
+        session.execute('export KEPT=yes')
+        result = session.execute('sleep 30', timeout=0.5)
+        assert result.timed_out and not result.session_restarted
+        assert result.elapsed < 5
+        assert session.execute('echo $KEPT').output == 'yes\n'
+
+    def test_timeout_spares_earlier_background_jobs(self, session):
+        session.execute('sleep 30 & job=$!')
+        for command in ('sleep 30 | cat', 'echo $(sleep 30)'):
+            result = session.execute(command, timeout=0.5)
+            assert result.timed_out and not result.session_restarted
+        assert session.execute('kill -0 $job && echo alive').output == 'alive\n'
+
+    def test_unkillable_command_restarts_session(self, session):
+        result = session.execute('while true; do :; done', timeout=0.3)
+        assert result.timed_out and result.session_restarted
+        assert session.execute('echo back').output == 'back\n'
+
+    def test_exit_restarts_session(self, session):
+        result = session.execute('exit 3')
+        assert result.status == 3 and result.session_restarted
+        assert session.execute('echo again').output == 'again\n'
+
+    def test_large_output_is_truncated_and_spilled(self, session):
+        result = session.execute('seq 1 100000')
+        assert result.truncated
+        assert result.output.startswith('1\n2\n') and result.output.endswith('99999\n100000\n')
+        assert len(result.output) < 20 * 1024
+        assert Path(result.spill_path).read_text() == ''.join(f'{n}\n' for n in range(1, 100001))
+        assert 'full output in' in result.to_string()
+
+    def test_old_spill_files_are_deleted(self, session, tmp_path, monkeypatch):
+        monkeypatch.setattr('linux_use.agent.shell.service.SPILL_DIRECTORY', tmp_path / 'spill')
+        monkeypatch.setattr('linux_use.agent.shell.service.SPILL_FILES_KEPT', 2)
+        paths = [Path(session.execute('seq 1 100000').spill_path) for _ in range(3)]
+        assert [path.exists() for path in paths] == [False, True, True]
+        session.close()
+        assert not any(path.exists() for path in paths)
+
+
+class TestOutputBuffer:
+    def test_keeps_head_and_tail_and_spills_everything(self, tmp_path, monkeypatch):
+        monkeypatch.setattr('linux_use.agent.shell.service.SPILL_DIRECTORY', tmp_path)
+        buffer = OutputBuffer(head_size=4, tail_size=4)
+        for chunk in (b'abc', b'defg', b'hijkl'):
+            buffer.write(chunk)
+        buffer.close()
+        assert buffer.text() == 'abcd\n... [4 bytes omitted] ...\nijkl'
+        assert Path(buffer.spill_path).read_bytes() == b'abcdefghijkl'
+
+    def test_small_output_is_kept_whole(self):
+        buffer = OutputBuffer(head_size=4, tail_size=8)
+        buffer.write(b'hello world')
+        assert buffer.text() == 'hello world'
+        assert not buffer.truncated
+
+
+class TestShellSessionManager:
+    def test_sessions_are_independent(self, tmp_path):
+        manager = ShellSessionManager(cwd=str(tmp_path))
+        try:
+            manager.execute('VALUE=one', session='first')
+            assert manager.execute('echo "$VALUE"', session='first').output == 'one\n'
+            assert manager.execute('echo "$VALUE"', session='second').output == '\n'
+        finally:
+            manager.close()
+        assert manager.sessions == {}
@@ -0,0 +1,88 @@
+import pytest
+import threading
+import time
+from unittest.mock import patch
+
+from linux_use.agent.system.service import SystemFactsProvider, get_system_facts_provider
+from linux_use.agent.desktop.views import Size
+
+
+@pytest.fixture
+def provider():
+    """Provides a SystemFactsProvider whose probes are counted and never touch the host."""
+    calls = {}
+    threads = set()
+
+    def probe(name, value, delay=0.05):
+        def run(self=None):
+            calls[name] = calls.get(name, 0) + 1
+            threads.add(threading.current_thread().name)
+            time.sleep(delay)
+            return value
+        return run
+
+    with patch.object(SystemFactsProvider, "probe_os", probe("os", "Linux Mint 22")), \
+         patch.object(SystemFactsProvider, "probe_account_type", probe("account_type", "Local Account")), \
+         patch.object(SystemFactsProvider, "probe_language", probe("language", "en US")), \
+         patch.object(SystemFactsProvider, "probe_resolution", probe("resolution", Size(width=2560, height=1440))), \
+         patch.object(SystemFactsProvider, "probe_dpi_scaling", probe("dpi_scaling", 1.25)), \
+         patch.object(SystemFactsProvider, "start_watching"):
+        instance = SystemFactsProvider()
+        instance.calls = calls
+        instance.threads = threads
+        yield instance
+
+
+class TestSystemFactsProvider:
+    """Tests for the SystemFactsProvider service class."""
+
+    def test_get_probes_once_and_concurrently(self, provider):
+        """
+        What is being tested:
+            - The first read probes every fact in parallel worker threads.
+            - Later reads are served from the cache without probing again.
+        """
+        start = time.perf_counter()
+        facts = provider.get()
+        elapsed = time.perf_counter() - start
+        provider.get()
+
+        assert facts.host.os == "Linux Mint 22"
+        assert facts.resolution == Size(width=2560, height=1440)
+        assert facts.dpi_scaling == 1.25
+        assert elapsed < 0.2
+        assert len(provider.threads) > 1
+        assert all(count == 1 for count in provider.calls.values())
+
+    def test_invalidate_screen_reprobes_screen_only(self, provider):
+        """
+        What is being tested:
+            - A screen change re-probes the resolution and DPI but not the host facts.
+        """
+        provider.get()
+        provider.invalidate_screen()
+        provider.get()
+
+        assert provider.calls["resolution"] == 2
+        assert provider.calls["dpi_scaling"] == 2
+        assert provider.calls["os"] == 1
+        assert provider.calls["account_type"] == 1
+
+    def test_refresh_reprobes_everything(self, provider):
+        """
+        What is being tested:
+            - An explicit refresh re-probes every fact.
+        """
+        provider.get()
+        provider.refresh()
+
+        assert all(count == 2 for count in provider.calls.values())
+
+    def test_provider_is_shared_per_display(self):
+        """
+        What is being tested:
+            - The same display returns the same provider; another display gets its own.
+        """
+        with patch.object(SystemFactsProvider, "start_watching"):
+            assert get_system_facts_provider(":42") is get_system_facts_provider(":42")
+            assert get_system_facts_provider(":42") is not get_system_facts_provider(":43")
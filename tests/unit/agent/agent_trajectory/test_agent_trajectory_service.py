@@ -0,0 +1,130 @@
+from unittest.mock import patch
+
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+
+from linux_use.agent.desktop.views import DesktopState
+from linux_use.agent.trajectory.service import TrajectoryStore, fingerprint, record_action, resolve_action
+from linux_use.agent.tree.views import TreeState, TreeElementNode, BoundingBox, Center
+from linux_use.agent.views import Action
+
+
+def node(name, x, y, app="Editor", control_type="Push_Button"):
+    return TreeElementNode(name=name, control_type=control_type, value="", shortcut="",
+                           bounding_box=BoundingBox(x - 10, y - 10, x + 10, y + 10, 20, 20),
+                           center=Center(x, y), app_name=app)
+
+
+class CountingChatModel(FakeMessagesListChatModel):
+    """Answers from a script and counts the requests."""
+    calls: int = 0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def response(name, params):
+    return AIMessage(content=f"<evaluate>ok</evaluate><thought>t</thought>"
+                             f"<action_name>{name}</action_name><action_input>{params!r}</action_input>")
+
+
+def run_agent(store, tree_state, responses):
+    state = DesktopState(apps=[], active_app=None, screenshot=None, tree_state=tree_state)
+    llm = CountingChatModel(responses=responses)
+    with patch("linux_use.agent.service.Desktop") as MockDesktop:
+        desktop = MockDesktop.return_value
+        desktop.frame_comparator = None
+        desktop.desktop_state = state
+        desktop.get_state.return_value = state
+        desktop.get_default_language.return_value = "English"
+        from linux_use.agent.service import Agent
+        agent = Agent(llm=llm, trajectory_store=store)
+        result = agent.invoke("Save the  document")
+    return agent, desktop, llm, result
+
+
+class TestTrajectoryStore:
+    def test_fingerprint_ignores_case_and_spacing(self):
+        assert fingerprint("Save the document") == fingerprint("  save THE\tdocument ")
+        assert fingerprint("Save the document") != fingerprint("Close the document")
+
+    def test_round_trip(self, tmp_path):
+        store = TrajectoryStore(tmp_path)
+        tree_state = TreeState(interactive_nodes=[node("Save", 60, 45)])
+        recorded = [record_action(Action(name="Click Tool", params={"loc": [60, 45]}), tree_state),
+                    record_action(Action(name="Shortcut Tool", params={"shortcut": "ctrl+s"}), tree_state)]
+        store.record("Save the document", recorded)
+
+        trajectory = store.get("save the document")
+        assert trajectory.actions == recorded
+        assert trajectory.actions[0].selectors["loc"].name == "Save"
+        assert trajectory.actions[1].selectors == {}
+        assert store.get("Close the document") is None
+
+    def test_corrupt_file_is_a_miss(self, tmp_path):
+        store = TrajectoryStore(tmp_path)
+        store.path("Save the document").write_text("{not json")
+        assert store.get("Save the document") is None
+
+
+class TestReplay:
+    def test_action_follows_a_moved_element(self):
+        recorded = record_action(Action(name="Click Tool", params={"loc": [60, 45], "button": "left"}),
+                                 TreeState(interactive_nodes=[node("Save", 60, 45)]))
+        moved = TreeState(interactive_nodes=[node("Save", 300, 400), node("Open", 60, 45)])
+        action = resolve_action(recorded, moved)
+        assert action.params == {"loc": (300, 400), "button": "left"}
+
+    def test_nearest_of_equal_elements(self):
+        recorded = record_action(Action(name="Click Tool", params={"loc": [60, 45]}),
+                                 TreeState(interactive_nodes=[node("Save", 60, 45), node("Save", 600, 45)]))
+        live = TreeState(interactive_nodes=[node("Save", 610, 45), node("Save", 70, 45)])
+        assert resolve_action(recorded, live).params["loc"] == (70, 45)
+
+    def test_missing_element_stops_the_replay(self):
+        recorded = record_action(Action(name="Click Tool", params={"loc": [60, 45]}),
+                                 TreeState(interactive_nodes=[node("Save", 60, 45)]))
+        assert resolve_action(recorded, TreeState(interactive_nodes=[node("Save", 60, 45, app="Browser")])) is None
+
+    def test_element_without_selector_stops_the_replay(self):
+        recorded = record_action(Action(name="Click Tool", params={"loc": [5, 5]}),
+                                 TreeState(interactive_nodes=[node("Save", 60, 45)]))
+        assert recorded.selectors == {}
+        assert resolve_action(recorded, TreeState(interactive_nodes=[node("Save", 60, 45)])) is None
+
+    def test_password_is_not_recorded(self):
+        tree_state = TreeState(interactive_nodes=[node("Password", 60, 45, control_type="Password_Text"), node("User", 60, 90, control_type="Entry")])
+        password = record_action(Action(name="Type Tool", params={"loc": [60, 45], "text": "hunter2"}), tree_state)
+        user = record_action(Action(name="Type Tool", params={"loc": [60, 90], "text": "alice"}), tree_state)
+        assert "text" not in password.params
+        assert resolve_action(password, tree_state) is None
+        assert resolve_action(user, tree_state).params["text"] == "alice"
+
+    def test_agent_replays_without_the_llm(self, tmp_path):
+        """
+        What is being tested:
+            - A successful run is recorded without its final answer.
+            - The same task later runs the recorded click on the element's new position without asking the LLM.
+            - A missing element hands the run back to the LLM.
+        """
+        store = TrajectoryStore(tmp_path)
+        tree_state = TreeState(interactive_nodes=[node("Save", 60, 45)])
+        agent, _, llm, result = run_agent(store, tree_state, [
+            response("Click Tool", {"loc": (60, 45)}), response("Done Tool", {"answer": "saved"})])
+        assert result.content == "saved"
+        assert llm.calls == 2
+        assert [action.name for action in store.get("Save the document").actions] == ["Click Tool"]
+
+        moved = TreeState(interactive_nodes=[node("Save", 300, 400)])
+        agent, desktop, llm, result = run_agent(store, moved, [response("Done Tool", {"answer": "saved again"})])
+        assert result.content == "saved again"
+        assert llm.calls == 1
+        desktop.activate_element.assert_called_once_with((300, 400))
+
+        missing = TreeState(interactive_nodes=[node("Open", 60, 45)])
+        agent, desktop, llm, result = run_agent(store, missing, [
+            response("Click Tool", {"loc": (60, 45)}), response("Done Tool", {"answer": "opened"})])
+        assert result.content == "opened"
+        assert llm.calls == 2
+        assert store.get("Save the document").actions[0].selectors["loc"].name == "Open"
@@ -0,0 +1,136 @@
+from collections import deque
+from unittest.mock import MagicMock
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from linux_use.agent.registry.views import ToolResult
+from linux_use.agent.service import Agent
+from linux_use.agent.registry.service import Registry
+from linux_use.agent.repair.service import ResponseParser
+from linux_use.agent.tools.service import click_tool, type_tool, wait_tool
+from linux_use.agent.utils import ResponseStream
+
+BATCH = (
+    "<output>\n"
+    "  <evaluate>Neutral - the form is open</evaluate>\n"
+    "  <thought>Fill in the name and the email</thought>\n"
+    "  <actions>\n"
+    "    <action>\n"
+    "      <action_name>Click Tool</action_name>\n"
+    "      <action_input>{'loc': [100, 200]}</action_input>\n"
+    "      <expect>3</expect>\n"
+    "    </action>\n"
+    "    <action>\n"
+    "      <action_name>Type Tool</action_name>\n"
+    "      <action_input>{'loc': [100, 200], 'text': 'Ada'}</action_input>\n"
+    "      <expect>3</expect>\n"
+    "    </action>\n"
+    "    <action>\n"
+    "      <action_name>Type Tool</action_name>\n"
+    "      <action_input>{'loc': [100, 260], 'text': 'ada@example.com'}</action_input>\n"
+    "      <expect>4</expect>\n"
+    "    </action>\n"
+    "  </actions>\n"
+    "</output>\n"
+    "Trailing prose."
+)
+
+
+PARSER = ResponseParser(Registry([click_tool, type_tool, wait_tool]))
+
+
+def parse(message):
+    return PARSER.parse_message(message).agent_data
+
+
+def make_agent(results, in_place=lambda label: True):
+    """An Agent without a desktop: the registry returns `results` in order."""
+    agent = Agent.__new__(Agent)
+    agent.max_batch_actions = 5
+    agent.use_vision = False
+    agent.trajectory_store = None
+    agent.replay = deque()
+    agent.desktop = MagicMock()
+    agent.desktop.is_element_in_place.side_effect = in_place
+    agent.registry = MagicMock()
+    agent.registry.execute.side_effect = results
+    agent.acted = lambda state, tool_result, desktop_state: tool_result
+    return agent
+
+
+class TestBatchParsing:
+    def test_batch_is_parsed_in_order(self):
+        agent_data = parse(AIMessage(content=BATCH))
+
+        assert agent_data.is_batch
+        assert [action.name for action in agent_data.actions] == ["Click Tool", "Type Tool", "Type Tool"]
+        assert [action.expect for action in agent_data.actions] == [3, 3, 4]
+        assert agent_data.action.params == {"loc": [100, 200]}
+
+    def test_single_action_still_parses(self):
+        agent_data = parse(AIMessage(content=(
+            "<evaluate>ok</evaluate><thought>t</thought>"
+            "<action_name>Wait Tool</action_name><action_input>{'duration': 1}</action_input>"
+        )))
+
+        assert not agent_data.is_batch
+        assert agent_data.action.expect is None
+
+    def test_stream_waits_for_end_of_batch(self):
+        response = ResponseStream()
+        for index in range(0, len(BATCH), 5):
+            if response.feed(AIMessageChunk(content=BATCH[index:index + 5])):
+                break
+
+        assert response.text.endswith("</actions>")
+        assert len(parse(response.message()).actions) == 3
+
+
+class TestBatchExecution:
+    def test_batch_runs_back_to_back(self):
+        """
+        What is being tested:
+            - Every action runs, with a settle wait between actions and a single observation at the end.
+        """
+        agent = make_agent([ToolResult(is_success=True, content=f"done {i}") for i in range(3)])
+        result = agent.action({"agent_data": parse(AIMessage(content=BATCH))})
+
+        assert result.is_success
+        assert agent.registry.execute.call_count == 3
+        assert agent.desktop.settle.wait.call_count == 2
+        agent.desktop.get_state.assert_called_once()
+        assert result.content.splitlines() == ["1. Click Tool: done 0", "2. Type Tool: done 1", "3. Type Tool: done 2"]
+
+    def test_failure_stops_the_batch(self):
+        agent = make_agent([ToolResult(is_success=True, content="clicked"), ToolResult(is_success=False, error="no focus")])
+        result = agent.action({"agent_data": parse(AIMessage(content=BATCH))})
+
+        assert not result.is_success
+        assert agent.registry.execute.call_count == 2
+        assert "2. Type Tool: no focus" in result.error
+        assert "remaining 1 action(s) were not executed" in result.error
+        agent.desktop.get_state.assert_called_once()
+
+    def test_moved_element_stops_the_batch(self):
+        """
+        What is being tested:
+            - An action whose expected element is gone is not executed, and neither is anything after it.
+        """
+        agent = make_agent([ToolResult(is_success=True, content="ok")] * 3, in_place=lambda label: label != 4)
+        result = agent.action({"agent_data": parse(AIMessage(content=BATCH))})
+
+        assert not result.is_success
+        assert agent.registry.execute.call_count == 2
+        assert "3. Type Tool: not executed, element 4 is no longer in place" in result.error
+
+    def test_unavailable_guard_does_not_stop_the_batch(self):
+        """
+        What is being tested:
+            - Without the accessibility tree the guards cannot be checked, so the batch runs instead of reporting a screen change.
+        """
+        agent = make_agent([ToolResult(is_success=True, content=f"done {i}") for i in range(3)], in_place=lambda label: None)
+        result = agent.action({"agent_data": parse(AIMessage(content=BATCH))})
+
+        assert result.is_success
+        assert agent.registry.execute.call_count == 3
+        assert "no longer in place" not in result.content
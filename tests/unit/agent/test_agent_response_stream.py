@@ -0,0 +1,123 @@
+import asyncio
+from types import SimpleNamespace
+
+from langchain_core.messages import AIMessageChunk
+
+from linux_use.agent.service import Agent
+from linux_use.agent.registry.service import Registry
+from linux_use.agent.repair.service import ResponseParser
+from linux_use.agent.tools.service import click_tool
+from linux_use.agent.utils import ResponseStream
+
+RESPONSE = (
+    "<output>\n"
+    "  <evaluate>Success - the window opened</evaluate>\n"
+    "  <thought>Click the button</thought>\n"
+    "  <action_name>Click Tool</action_name>\n"
+    "  <action_input>{'loc': [10, 20]}</action_input>\n"
+    "</output>\n"
+    "Some trailing prose that the agent never needs."
+)
+
+
+PARSER = ResponseParser(Registry([click_tool]))
+
+
+def parse(message):
+    return PARSER.parse_message(message).agent_data
+
+
+def chunks(size):
+    return [AIMessageChunk(content=RESPONSE[index:index + size]) for index in range(0, len(RESPONSE), size)]
+
+
+class CountingModel:
+    """Streams the response in fixed-size chunks and counts how many were pulled."""
+
+    def __init__(self, size):
+        self.chunks = chunks(size)
+        self.pulled = 0
+        self.closed = False
+
+    def stream(self, messages):
+        try:
+            for chunk in self.chunks:
+                self.pulled += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+    async def astream(self, messages):
+        try:
+            for chunk in self.chunks:
+                self.pulled += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+
+class TestResponseStream:
+    def test_tag_split_across_chunks(self):
+        """
+        What is being tested:
+            - The closing tag is found for every chunk size, including single characters.
+            - The collected text ends exactly at `</action_input>`.
+        """
+        for size in (1, 3, 7, 64):
+            response = ResponseStream()
+            done = [response.feed(chunk) for chunk in chunks(size)]
+            assert response.complete and done[-1]
+            assert response.text.endswith("</action_input>")
+            assert "</output>" not in response.text
+            assert parse(response.message()).action.params == {"loc": [10, 20]}
+
+    def test_content_blocks(self):
+        """
+        What is being tested:
+            - Chunks carrying a list of content blocks contribute only their text blocks.
+        """
+        response = ResponseStream()
+        response.feed(AIMessageChunk(content=[{"type": "text", "text": "<action_input>{}"}, {"type": "tool_use", "id": "1"}]))
+        assert response.feed(AIMessageChunk(content=[{"type": "text", "text": "</action_input> tail"}]))
+        assert response.text == "<action_input>{}</action_input>"
+
+    def test_incomplete_stream(self):
+        response = ResponseStream()
+        assert not response.feed(AIMessageChunk(content="<action_input>{'a'"))
+        assert not response.complete
+
+    def test_usage_survives_early_stop(self):
+        """
+        What is being tested:
+            - Usage reported on the first chunk (prompt tokens, cache reads) is kept on the collected message.
+        """
+        usage = {"input_tokens": 500, "output_tokens": 0, "total_tokens": 500, "input_token_details": {"cache_read": 400}}
+        response = ResponseStream()
+        response.feed(AIMessageChunk(content="", usage_metadata=usage))
+        for chunk in chunks(16):
+            if response.feed(chunk):
+                break
+
+        assert response.message().usage_metadata["input_token_details"]["cache_read"] == 400
+
+
+class TestAgentStreaming:
+    def test_stream_stops_at_action(self):
+        """
+        What is being tested:
+            - The agent stops pulling chunks once the action is complete and closes the stream.
+        """
+        model = CountingModel(size=8)
+        message = Agent.stream(SimpleNamespace(llm=model), messages=[])
+
+        assert model.pulled < len(model.chunks)
+        assert model.closed
+        assert parse(message).action.name == "Click Tool"
+
+    def test_astream_stops_at_action(self):
+        model = CountingModel(size=8)
+        message = asyncio.run(Agent.astream(SimpleNamespace(llm=model), messages=[]))
+
+        assert model.pulled < len(model.chunks)
+        assert model.closed
+        assert parse(message).thought == "Click the button"
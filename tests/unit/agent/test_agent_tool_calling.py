@@ -0,0 +1,141 @@
+from unittest.mock import patch
+
+import pytest
+from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from linux_use.agent.desktop.views import DesktopState
+from linux_use.agent.registry.service import Registry
+from linux_use.agent.repair.service import ResponseParser
+from linux_use.agent.tools.service import click_tool, done_tool, type_tool
+from linux_use.agent.tree.views import TreeState
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Answers from a script of messages, records every request and the tools bound to it."""
+    responses: list[AIMessage]
+    requests: list = []
+    tools: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        self.tools.extend(tools)
+        return self.bind(tools=tools, **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.requests.append(messages)
+        return ChatResult(generations=[ChatGeneration(message=self.responses[len(self.requests) - 1])])
+
+
+def tool_call(name, args, id):
+    return {"name": name, "args": args, "id": id, "type": "tool_call"}
+
+
+@pytest.fixture
+def registry():
+    return Registry([click_tool, type_tool, done_tool])
+
+
+class TestToolDefinitions:
+    def test_definitions_use_function_names_and_schemas(self, registry):
+        definitions = registry.get_tool_definitions()
+        assert [definition["function"]["name"] for definition in definitions] == ["click_tool", "type_tool", "done_tool"]
+        parameters = definitions[0]["function"]["parameters"]
+        assert parameters["required"] == ["loc"]
+        assert "desktop" not in parameters["properties"]
+
+
+class TestToolCallParsing:
+    def test_calls_become_actions(self, registry):
+        message = AIMessage(content="<evaluate>ok</evaluate><thought>fill the form</thought>", tool_calls=[
+            tool_call("click_tool", {"loc": [10, 20]}, "call_1"),
+            tool_call("type_tool", {"loc": "(10, 20)", "text": "hi"}, "call_2"),
+        ])
+        parsed = ResponseParser(registry).parse_message(message)
+        actions = parsed.agent_data.actions
+        assert parsed.agent_data.thought == "fill the form"
+        assert [(action.name, action.call_id) for action in actions] == [("Click Tool", "call_1"), ("Type Tool", "call_2")]
+        assert actions[1].params["loc"] == (10, 20)
+        assert parsed.repairs == ["coerced the input of Type Tool"]
+
+    def test_unreadable_arguments_are_relaxed(self, registry):
+        message = AIMessage(content="", invalid_tool_calls=[
+            {"name": "click_tool", "args": "{'loc': (10, 20),", "id": "call_1", "error": None, "type": "invalid_tool_call"}])
+        parsed = ResponseParser(registry).parse_message(message)
+        assert parsed.agent_data.action.params == {"loc": (10, 20)}
+        assert parsed.agent_data.evaluate == ""
+
+    def test_text_response_falls_back_to_the_xml_format(self, registry):
+        message = AIMessage(content="<evaluate>ok</evaluate><thought>t</thought>"
+                                    "<action_name>Done Tool</action_name><action_input>{'answer': 'done'}</action_input>")
+        assert ResponseParser(registry).parse_message(message, tool_calling=True).agent_data.action.name == "Done Tool"
+
+    def test_missing_call_is_reported_as_such(self, registry):
+        parsed = ResponseParser(registry).parse_message(AIMessage(content="I will click it."), tool_calling=True)
+        assert parsed.error == "The response has no tool call"
+
+
+def run_agent(responses):
+    state = DesktopState(apps=[], active_app=None, screenshot=None, tree_state=TreeState())
+    llm = ScriptedChatModel(responses=responses, requests=[], tools=[])
+    with patch("linux_use.agent.service.Desktop") as MockDesktop:
+        desktop = MockDesktop.return_value
+        desktop.frame_comparator = None
+        desktop.desktop_state = state
+        desktop.get_state.return_value = state
+        desktop.get_default_language.return_value = "English"
+        from linux_use.agent.service import Agent
+        agent = Agent(llm=llm, tool_calling=True)
+        result = agent.invoke("click the button")
+    return desktop, llm, result
+
+
+class TestToolCallingAgent:
+    def test_text_reply_is_corrected_towards_a_tool_call(self):
+        """
+        What is being tested:
+            - A reply without a tool call is retried with a correction that asks for a tool call, not for the XML format.
+        """
+        _, llm, result = run_agent([
+            AIMessage(content="I will click the button."),
+            AIMessage(content="<evaluate>ok</evaluate><thought>finished</thought>",
+                      tool_calls=[tool_call("done_tool", {"answer": "done"}, "toolu_1")]),
+        ])
+
+        assert result.content == "done"
+        correction = llm.requests[1][-1]
+        assert isinstance(correction, HumanMessage)
+        assert "The response has no tool call" in correction.content
+        assert "calling one of the bound tools" in correction.content
+        assert "<output>" not in correction.content
+
+    def test_run_with_native_tool_calls(self):
+        """
+        What is being tested:
+            - The tools are bound to the model and the system prompt only names them.
+            - The next request carries the call answered by a tool message, in a form a provider accepts.
+        """
+        desktop, llm, result = run_agent([
+            AIMessage(content="<evaluate>ok</evaluate><thought>click it</thought>",
+                      tool_calls=[tool_call("click_tool", {"loc": [10, 20]}, "toolu_1")]),
+            AIMessage(content="<evaluate>ok</evaluate><thought>finished</thought>",
+                      tool_calls=[tool_call("done_tool", {"answer": "done"}, "toolu_2")]),
+        ])
+
+        assert result.content == "done"
+        assert "click_tool" in [tool["function"]["name"] for tool in llm.tools]
+        system = llm.requests[0][0].content
+        assert "Tool Parameters:" not in system and "call `click_tool`" in system
+        desktop.activate_element.assert_called_once_with((10, 20))
+
+        second = llm.requests[1]
+        call, answer = second[-3], second[-2]
+        assert call.tool_calls[0]["id"] == "toolu_1" and call.tool_calls[0]["name"] == "click_tool"
+        assert isinstance(answer, ToolMessage) and answer.tool_call_id == "toolu_1"
+        payload = ChatAnthropic(model="claude-sonnet-4-5", api_key="test")._get_request_payload(second)
+        assert [message["role"] for message in payload["messages"]] == ["user", "assistant", "user"]
@@ -0,0 +1,49 @@
+import pytest
+from unittest.mock import patch
+
+from linux_use.agent.desktop.index import AppIndex
+from linux_use.agent.desktop.views import App, Size, Status
+
+
+def make_app(name, handle, wm_class='', pid=0):
+    return App(name=name, depth=handle, status=Status.NORMAL, size=Size(800, 600), handle=handle, wm_class=wm_class, pid=pid)
+
+
+@pytest.fixture
+def index():
+    """Provides an index over a browser, an editor and a file manager."""
+    index = AppIndex()
+    apps = [
+        make_app('Release notes — Mozilla Firefox', 1, 'Navigator.firefox', 101),
+        make_app('notes.txt - Text Editor', 2, 'gnome-text-editor.Gnome-text-editor', 102),
+        make_app('Downloads', 3, 'nemo.Nemo', 103),
+    ]
+    names = {101: 'firefox', 102: 'gnome-text-editor', 103: 'nemo'}
+    with patch.object(AppIndex, 'get_process_name', side_effect=lambda pid: names[pid]):
+        index.update(apps)
+    return index
+
+
+class TestAppIndex:
+    def test_matches_title(self, index):
+        assert index.find('Text Editor').handle == 2
+
+    def test_matches_class_when_title_does_not_name_the_app(self, index):
+        match = index.search('files nemo', limit=1)
+        assert index.find('nemo').handle == 3
+        assert match and match[0].app.handle == 3
+
+    def test_ranks_exact_key_first(self, index):
+        matches = index.search('firefox')
+        assert matches[0].app.handle == 1
+        assert matches[0].score == 100
+
+    def test_no_match_below_cutoff(self, index):
+        assert index.find('libreoffice calc') is None
+        assert index.search('') == []
+
+    def test_update_replaces_windows_and_prunes_process_names(self, index):
+        index.update([make_app('Terminal', 4)])
+        assert index.find('firefox') is None
+        assert index.process_names == {}
+        assert index.find('terminal').handle == 4
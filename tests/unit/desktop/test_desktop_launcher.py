@@ -0,0 +1,111 @@
+import pytest
+from time import monotonic
+from unittest.mock import MagicMock, patch
+
+from linux_use.agent.desktop.launcher import AppLauncher, get_app_identifiers, find_desktop_entry
+
+
+@pytest.fixture
+def applications(tmp_path, monkeypatch):
+    """Provides an XDG data home with a desktop entry for a text editor."""
+    directory = tmp_path / "applications"
+    directory.mkdir()
+    (directory / "org.gnome.TextEditor.desktop").write_text(
+        "[Desktop Entry]\nName=Text Editor\nExec=env GDK_BACKEND=x11 /usr/bin/gnome-text-editor %U\n"
+        "StartupWMClass=Gnome-text-editor\nType=Application\n"
+    )
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    monkeypatch.setenv("XDG_DATA_DIRS", str(tmp_path / "missing"))
+    return directory
+
+
+def make_connection(windows):
+    """Builds a mock X connection whose client list and window properties come from `windows`."""
+    connection = MagicMock()
+    connection.pending_events.return_value = 0
+    connection.screen.return_value.root.get_full_property.return_value.value = list(windows)
+
+    def create_resource_object(kind, handle):
+        pid, wm_class = windows[handle]
+        window = MagicMock()
+        window.get_attributes.return_value.map_state = 2  # X.IsViewable
+        window.get_full_property.return_value.value = [pid]
+        window.get_wm_class.return_value = wm_class
+        return window
+
+    connection.create_resource_object.side_effect = create_resource_object
+    return connection
+
+
+class TestDesktopEntries:
+    """Tests for desktop entry lookup."""
+
+    def test_identifiers_include_wm_class_and_program(self, applications):
+        """
+        What is being tested:
+            - The entry's StartupWMClass and Exec program (past env wrappers) become identifiers.
+        """
+        assert find_desktop_entry("org.gnome.TextEditor") is not None
+        identifiers = get_app_identifiers("org.gnome.TextEditor")
+
+        assert identifiers == {"org.gnome.texteditor", "gnome-text-editor"}
+
+    def test_identifiers_without_entry(self, applications):
+        """
+        What is being tested:
+            - Without a desktop entry only the launch name is used.
+        """
+        assert get_app_identifiers("Firefox") == {"firefox"}
+
+
+class TestAppLauncher:
+    """Tests for the AppLauncher readiness detection."""
+
+    def test_matches_new_window_by_pid(self):
+        """
+        What is being tested:
+            - A new window owned by the launched process is returned, pre-existing windows are ignored.
+        """
+        connection = make_connection({0x100: (10, ("old", "Old")), 0x200: (4242, ("x", "X"))})
+        launcher = AppLauncher()
+        window = launcher.wait_for_window(connection, {0x100}, 4242, {"nothing"}, monotonic() + 1)
+
+        assert window == (0x200, 4242, "x.X")
+
+    def test_matches_new_window_by_wm_class(self):
+        """
+        What is being tested:
+            - A window from an unrelated PID (e.g. D-Bus activation) matches through its WM_CLASS.
+        """
+        connection = make_connection({0x300: (99999999, ("gnome-calculator", "Gnome-calculator"))})
+        launcher = AppLauncher()
+        window = launcher.wait_for_window(connection, set(), 4242, {"gnome-calculator"}, monotonic() + 1)
+
+        assert window[0] == 0x300
+
+    def test_times_out_without_matching_window(self):
+        """
+        What is being tested:
+            - Unrelated new windows do not satisfy readiness and the wait ends at the deadline.
+        """
+        connection = make_connection({0x400: (99999999, ("other", "Other"))})
+        connection.fileno.return_value = -1
+        launcher = AppLauncher()
+        with patch("linux_use.agent.desktop.launcher.select") as mock_select:
+            window = launcher.wait_for_window(connection, set(), 4242, {"firefox"}, monotonic() + 0.05)
+
+        assert window is None
+        assert mock_select.called
+
+    def test_launch_reports_unknown_app(self):
+        """
+        What is being tested:
+            - When neither gtk-launch nor a command of that name exists, the launch is reported as not started.
+        """
+        launcher = AppLauncher()
+        with patch.object(AppLauncher, "open_connection", return_value=None), \
+             patch("linux_use.agent.desktop.launcher.subprocess.Popen", side_effect=FileNotFoundError):
+            result = launcher.launch("no-such-app", timeout=0.1)
+
+        assert result.started is False
+        assert result.ready is False
@@ -0,0 +1,250 @@
+import pytest
+import os
+import time
+import asyncio
+from unittest.mock import patch
+from psutil import Process, NoSuchProcess, STATUS_ZOMBIE
+from PIL import Image, ImageDraw
+
+from linux_use.agent.desktop import service as desktop_service
+from linux_use.agent.desktop.service import Desktop
+from linux_use.agent.desktop.views import App, Size, Status
+from linux_use.agent.screenshot.views import FrameChangeType
+from linux_use.agent.settle.views import SettleConfig
+from linux_use.agent.damage.views import ScreenChanges
+from linux_use.agent.tree.views import TreeState
+from linux_use.agent.prompt.service import Prompt
+from linux_use.agent.registry.views import ToolResult
+
+
+@pytest.fixture
+def desktop():
+    """Provides a Desktop whose window list, tree and capture stages are mocked with fixed latencies."""
+    frames = []
+
+    def get_apps():
+        time.sleep(0.05)
+        return (None, [])
+
+    def get_tree_state(apps):
+        time.sleep(0.2)
+        return TreeState()
+
+    def get_screenshot(scale):
+        time.sleep(0.2)
+        return frames.pop(0)
+
+    with patch("linux_use.agent.desktop.service.Tree") as MockTree, \
+         patch.object(Desktop, "get_apps", side_effect=get_apps), \
+         patch.object(Desktop, "get_screenshot", side_effect=get_screenshot):
+        MockTree.return_value.get_state.side_effect = get_tree_state
+        MockTree.return_value.annotated_screenshot.side_effect = lambda nodes, scale, screenshot: screenshot
+        instance = Desktop(settle_config=SettleConfig(max_wait=0.0))
+        instance.frames = frames
+        yield instance
+        instance.close()
+
+
+class TestDesktopGetState:
+    """Tests for the concurrent Desktop.get_state pipeline."""
+
+    def test_stages_run_concurrently(self, desktop):
+        """
+        What is being tested:
+            - The total latency approaches the slowest chain (window list, then tree) rather than the sum.
+            - Every stage reports its timing.
+        """
+        desktop.frames.append(Image.new("RGB", (320, 180), color=(255, 255, 255)))
+        state = desktop.get_state(use_vision=True)
+
+        # The tree waits for the window list; the capture runs alongside both
+        assert state.timings["total"] < 0.4
+        assert {"apps", "tree", "capture", "annotate", "encode", "total"} <= set(state.timings)
+        assert state.screenshot.startswith("data:image/jpeg;base64,")
+
+    def test_unchanged_frame_skips_image(self, desktop):
+        """
+        What is being tested:
+            - A repeated frame attaches no screenshot, adds a note and skips annotation.
+        """
+        frame = Image.new("RGB", (320, 180), color=(255, 255, 255))
+        desktop.frames.extend([frame, frame.copy()])
+        desktop.get_state(use_vision=True)
+        state = desktop.get_state(use_vision=True)
+
+        assert state.frame_change.type == FrameChangeType.UNCHANGED
+        assert state.screenshot is None
+        assert "unchanged" in state.screenshot_note
+        assert "annotate" not in state.timings
+
+    def test_partial_frame_is_cropped(self, desktop):
+        """
+        What is being tested:
+            - A localized change attaches a crop smaller than the frame and a note with screen coordinates.
+        """
+        frame = Image.new("RGB", (320, 180), color=(255, 255, 255))
+        changed = frame.copy()
+        ImageDraw.Draw(changed).rectangle((40, 40, 60, 60), fill=(0, 0, 0))
+        desktop.frames.extend([frame, changed])
+        desktop.get_state(use_vision=True)
+        state = desktop.get_state(use_vision=True)
+
+        assert state.frame_change.type == FrameChangeType.PARTIAL
+        assert state.screenshot_info.width < 320
+        assert "step 1" in state.screenshot_note
+
+    def test_reference_outside_kept_images_is_sent_in_full(self, desktop):
+        """
+        What is being tested:
+            - Once the full frame is no longer among the kept screenshots, a change and a repeat are both sent as full frames.
+            - Without a reference the model holds, the capture is not skipped for lack of damage.
+        """
+        frame = Image.new("RGB", (320, 180), color=(255, 255, 255))
+        changed = frame.copy()
+        ImageDraw.Draw(changed).rectangle((40, 40, 60, 60), fill=(0, 0, 0))
+        desktop.frame_comparator.window = 1
+        desktop.frames.extend([frame, changed, changed.copy()])
+        desktop.get_state(use_vision=True)
+        state = desktop.get_state(use_vision=True)
+
+        assert state.frame_change.type == FrameChangeType.FULL
+        assert state.screenshot_info.width == 320 and state.screenshot_note is None
+        with patch.object(desktop.damage, "get_changes", side_effect=lambda since: ScreenChanges(since=since)):
+            state = desktop.get_state(use_vision=True)
+
+        assert state.frame_change.type == FrameChangeType.FULL
+        assert state.screenshot is not None
+
+    def test_cursor_location_comes_from_the_bound_display(self, desktop):
+        """
+        What is being tested:
+            - The state carries the pointer position read through the Desktop's input controller, and the observation reports it.
+        """
+        with patch.object(desktop.input, "position", return_value=(12, 34)):
+            state = desktop.get_state(use_vision=False)
+        prompt = Prompt.observation_prompt(query="q", steps=1, max_steps=5,
+                                           tool_result=ToolResult(is_success=True, content="ok"), desktop_state=state)
+
+        assert state.cursor_location == (12, 34)
+        assert "(12,34)" in prompt
+
+    def test_missing_window_list_reads_every_application(self, desktop):
+        """
+        What is being tested:
+            - Without a window list the tree is read for all applications, and with an empty one for none.
+        """
+        tree = desktop_service.Tree(desktop)
+        with patch.object(desktop, "get_apps", return_value=(None, None)):
+            state = desktop.get_state(use_vision=False)
+        tree.get_state.assert_called_with(None)
+        assert state.apps == []
+        desktop.get_state(use_vision=False)
+        tree.get_state.assert_called_with([])
+
+    def test_tree_read_overlaps_the_window_list(self, desktop):
+        """
+        What is being tested:
+            - With the same visible windows as the last observation the tree read overlaps the window list.
+            - A changed window list makes the tree be read again for the fresh windows.
+        """
+        editor = App(name="Editor", depth=0, status=Status.NORMAL, size=Size(width=800, height=600), handle=1)
+        terminal = App(name="Terminal", depth=1, status=Status.NORMAL, size=Size(width=800, height=600), handle=2)
+        windows = [editor]
+
+        def get_apps():
+            time.sleep(0.2)
+            return (windows[0], windows[1:])
+
+        tree = desktop_service.Tree(desktop)
+        with patch.object(desktop, "get_apps", side_effect=get_apps), \
+             patch.object(desktop, "get_current_workspace", return_value=None):
+            first = desktop.get_state(use_vision=False)
+            second = desktop.get_state(use_vision=False)
+            windows.append(terminal)
+            third = desktop.get_state(use_vision=False)
+
+        # Window list (0.2 s) then tree (0.2 s) the first time, side by side once the windows are known
+        assert first.timings["total"] >= 0.4
+        assert second.timings["total"] < 0.35
+        assert third.timings["total"] >= 0.4
+        assert tree.get_state.call_args_list[-1].args[0] == [editor, terminal]
+
+    def test_without_vision(self, desktop):
+        """
+        What is being tested:
+            - Without vision no capture stage runs and no screenshot is attached.
+        """
+        state = desktop.get_state(use_vision=False)
+
+        assert state.screenshot is None
+        assert "capture" not in state.timings
+
+    def test_no_damage_skips_capture(self, desktop):
+        """
+        What is being tested:
+            - Without screen damage since the previous capture the frame is reported unchanged without grabbing the screen.
+        """
+        desktop.frames.append(Image.new("RGB", (320, 180), color=(255, 255, 255)))
+        desktop.get_state(use_vision=True)
+        with patch.object(desktop.damage, "get_changes", side_effect=lambda since: ScreenChanges(since=since)):
+            state = desktop.get_state(use_vision=True)
+
+        assert state.frame_change.type == FrameChangeType.UNCHANGED
+        assert state.frame_change.frame_index == 2
+        assert state.screenshot is None
+
+    def test_async_state_keeps_loop_free(self, desktop):
+        """
+        What is being tested:
+            - aget_state produces the same stages as get_state.
+            - Other tasks on the event loop keep running while the stages are in flight.
+        """
+        desktop.frames.append(Image.new("RGB", (320, 180), color=(255, 255, 255)))
+        ticks = []
+
+        async def ticker():
+            for _ in range(10):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        async def observe():
+            state, _ = await asyncio.gather(desktop.aget_state(use_vision=True), ticker())
+            return state
+
+        state = asyncio.run(observe())
+
+        assert {"apps", "tree", "capture", "annotate", "encode", "total"} <= set(state.timings)
+        assert state.screenshot.startswith("data:image/jpeg;base64,")
+        assert len(ticks) == 10 and ticks[-1] - ticks[0] < 0.4
+
+
+def running_in_groups(groups: set[int]) -> list[int]:
+    """Live (non-zombie) processes whose process group is one of `groups`."""
+    pids = []
+    for pid in map(int, filter(str.isdigit, os.listdir("/proc"))):
+        try:
+            if os.getpgid(pid) in groups and Process(pid).status() != STATUS_ZOMBIE:
+                pids.append(pid)
+        except (OSError, NoSuchProcess):
+            pass
+    return pids
+
+
+class TestDesktopClose:
+    """Tests for releasing a Desktop's threads, shells and connections."""
+
+    def test_close_kills_the_shell_process_group(self, desktop):
+        """
+        What is being tested:
+            - Closing the Desktop kills the shell's process group and the groups of its background jobs.
+            - The damage tracker's listener thread exits.
+        """
+        result = desktop.shell.execute("sleep 60 & echo $!")
+        shell = desktop.shell.get_session("default").process.pid
+        groups = {shell, os.getpgid(int(result.output.strip()))}
+        assert running_in_groups(groups)
+
+        desktop.close()
+
+        assert running_in_groups(groups) == []
+        assert desktop.damage.thread is None or not desktop.damage.thread.is_alive()
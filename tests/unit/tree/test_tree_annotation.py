@@ -0,0 +1,49 @@
+import pytest
+from PIL import Image
+
+from linux_use.agent.tree.annotation import AnnotationRenderer, LabelGrid
+from linux_use.agent.tree.config import ANNOTATION_PALETTE
+from linux_use.agent.tree.views import TreeElementNode, BoundingBox, Center
+
+
+def make_node(left, top, right, bottom):
+    return TreeElementNode(name='OK', control_type='Push_Button', value='', shortcut='',
+                           bounding_box=BoundingBox(left, top, right, bottom, right - left, bottom - top),
+                           center=Center((left + right) // 2, (top + bottom) // 2), app_name='App')
+
+
+@pytest.fixture(scope='module')
+def renderer():
+    return AnnotationRenderer()
+
+
+class TestAnnotationRenderer:
+    def test_draws_in_place(self, renderer):
+        frame = Image.new('RGB', (200, 100), (255, 255, 255))
+        assert renderer.render(frame, [make_node(40, 40, 100, 80)], scale=1.0) is frame
+        assert frame.getpixel((40, 60)) == ANNOTATION_PALETTE[0]
+
+    def test_colours_follow_the_index(self, renderer):
+        frames = [Image.new('RGB', (200, 100), (255, 255, 255)) for _ in range(2)]
+        for frame in frames:
+            renderer.render(frame, [make_node(10, 40, 60, 80), make_node(100, 40, 150, 80)], scale=1.0)
+        assert frames[0].tobytes() == frames[1].tobytes()
+        assert frames[0].getpixel((100, 60)) == ANNOTATION_PALETTE[1]
+
+    def test_label_of_top_edge_box_stays_on_frame(self, renderer):
+        grid = LabelGrid()
+        left, top, right, bottom = renderer.place((0, 0, 50, 30), 20, (200, 100), grid)
+        assert left >= 0 and top >= 0 and right <= 200 and bottom <= 100
+
+    def test_crowded_labels_do_not_overlap(self, renderer):
+        grid = LabelGrid()
+        # Adjacent narrow boxes: the right-aligned spots above collide, the others are free
+        boxes = [(x, 40, x + 16, 70) for x in range(0, 160, 16)]
+        for index, box in enumerate(boxes):
+            renderer.place(box, renderer.get_label_width(str(index + 10)), (200, 120), grid)
+        assert all(grid.overlaps(rect) == 1 for rect in grid.rects)
+
+    def test_scale_maps_boxes_onto_the_frame(self, renderer):
+        frame = Image.new('RGB', (100, 50), (255, 255, 255))
+        renderer.render(frame, [make_node(100, 40, 180, 90)], scale=0.5)
+        assert frame.getpixel((50, 35)) == ANNOTATION_PALETTE[0]
@@ -0,0 +1,131 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from linux_use.agent.tree.service import Tree
+from linux_use.agent.tree.views import TreeElementNode, BoundingBox, Center
+from linux_use.agent.desktop.views import App, Size, Status
+
+
+@pytest.fixture
+def atspi():
+    """Provides a stand-in pyatspi module with the constants the tree uses."""
+    module = SimpleNamespace(
+        STATE_DEFUNCT='defunct', ROLE_TEXT='text', ROLE_ENTRY='entry', ROLE_PASSWORD_TEXT='password',
+        ROLE_SLIDER='slider', ROLE_SPIN_BUTTON='spin', ROLE_PUSH_BUTTON='push', ROLE_TOGGLE_BUTTON='toggle_button',
+        ROLE_LINK='link', ROLE_MENU_ITEM='menu_item', ROLE_CHECK_MENU_ITEM='check_menu_item',
+        ROLE_RADIO_MENU_ITEM='radio_menu_item', ROLE_CHECK_BOX='check_box', ROLE_RADIO_BUTTON='radio_button',
+        Registry=MagicMock()
+    )
+    with patch('linux_use.agent.tree.service.pyatspi', module, create=True), \
+         patch('linux_use.agent.tree.service.ATSPI_AVAILABLE', True):
+        yield module
+
+
+def make_accessible(role='push', actions=('focus', 'click'), defunct=False, name='OK'):
+    accessible = MagicMock()
+    accessible.name = name
+    accessible.getState.return_value.contains.side_effect = lambda state: defunct and state == 'defunct'
+    accessible.getRole.return_value = role
+    accessible.queryAction.return_value.nActions = len(actions)
+    accessible.queryAction.return_value.getName.side_effect = lambda index: actions[index]
+    accessible.queryAction.return_value.doAction.return_value = True
+    return accessible
+
+
+def make_node(accessible=None, element_id=(0, 1)):
+    return TreeElementNode(name='OK', control_type='Push_Button', value='', shortcut='',
+                           bounding_box=BoundingBox(0, 0, 10, 10, 10, 10), center=Center(5, 5), app_name='App',
+                           element_id=element_id, accessible=accessible)
+
+
+@pytest.fixture
+def tree():
+    return Tree(MagicMock())
+
+
+class TestActivateNode:
+    def test_runs_click_action(self, atspi, tree):
+        accessible = make_accessible()
+        assert tree.activate_node(make_node(accessible))
+        accessible.queryAction.return_value.doAction.assert_called_once_with(1)
+
+    def test_prefers_click_over_activate(self, atspi, tree):
+        accessible = make_accessible(actions=('activate', 'Press'))
+        assert tree.activate_node(make_node(accessible))
+        accessible.queryAction.return_value.doAction.assert_called_once_with(1)
+
+    def test_leaves_text_fields_and_action_less_elements_to_the_pointer(self, atspi, tree):
+        entry = make_accessible(role='entry', actions=('activate',))
+        assert not tree.activate_node(make_node(entry))
+        entry.queryAction.return_value.doAction.assert_not_called()
+        assert not tree.activate_node(make_node(make_accessible(actions=('focus',))))
+
+    def test_leaves_rows_and_cells_to_the_pointer(self, atspi, tree):
+        # 'activate' on these is GTK's row-activated (a double click) and 'toggle' skips the selection
+        for role, actions in (('list_item', ('activate',)), ('table_cell', ('toggle', 'activate')), ('tree_item', ('activate',))):
+            accessible = make_accessible(role=role, actions=actions)
+            assert not tree.activate_node(make_node(accessible))
+            accessible.queryAction.return_value.doAction.assert_not_called()
+        assert tree.activate_node(make_node(make_accessible(role='check_box', actions=('toggle',))))
+
+    def test_re_resolves_defunct_reference_from_element_id(self, atspi, tree):
+        fresh = make_accessible()
+        fresh.getRole.return_value = MagicMock(value_name='ROLE_PUSH_BUTTON')
+        app = MagicMock()
+        app.getChildAtIndex.side_effect = lambda index: fresh if index == 1 else None
+        atspi.Registry.getDesktop.return_value.getChildAtIndex.side_effect = lambda index: app if index == 0 else None
+        node = make_node(make_accessible(defunct=True))
+        assert tree.resolve_node(node) is fresh
+        assert node.accessible is fresh
+
+    def test_rejects_a_different_element_at_the_same_path(self, atspi, tree):
+        other = make_accessible(name='Cancel')
+        other.getRole.return_value = MagicMock(value_name='ROLE_PUSH_BUTTON')
+        atspi.Registry.getDesktop.return_value.getChildAtIndex.return_value.getChildAtIndex.return_value = other
+        assert tree.resolve_node(make_node(None)) is None
+
+
+def make_application(name, pid):
+    application = MagicMock()
+    application.name = name
+    application.get_process_id.return_value = pid
+    return application
+
+
+class TestJoinApps:
+    @pytest.fixture
+    def desktop(self):
+        applications = [make_application('nm-applet', 50), make_application('Firefox', 101), make_application('gedit', 7)]
+        return SimpleNamespace(childCount=len(applications), getChildAtIndex=lambda index: applications[index])
+
+    def make_app(self, handle, pid, wm_class):
+        return App(name=f'Window {handle}', depth=0, status=Status.NORMAL, size=Size(800, 600), handle=handle, wm_class=wm_class, pid=pid)
+
+    def test_joins_by_pid_and_links_application(self, desktop, tree):
+        firefox = self.make_app(1, 101, 'Navigator.firefox')
+        targets = tree.join_apps(desktop, [firefox])
+        assert [index for index, _ in targets] == [1]
+        assert firefox.accessible is desktop.getChildAtIndex(1)
+
+    def test_sandboxed_window_joins_by_class(self, desktop, tree):
+        # Flatpak windows carry the pid from inside the sandbox
+        gedit = self.make_app(2, 2, 'gedit.Gedit')
+        tree.desktop.app_index.get_process_name.return_value = ''
+        assert [index for index, _ in tree.join_apps(desktop, [gedit])] == [2]
+
+    def test_applications_without_visible_window_are_skipped(self, atspi, desktop, tree):
+        atspi.Registry.getDesktop.return_value = desktop
+        apps = [self.make_app(1, 101, 'Navigator.firefox'), self.make_app(3, 101, 'Navigator.firefox')]
+        with patch.object(Tree, '_traverse_accessible') as traverse:
+            tree.get_nodes_atspi(apps)
+        assert [call.args[1] for call in traverse.call_args_list] == ['Firefox']
+
+    def test_no_visible_window_reads_no_application(self, atspi, desktop, tree):
+        atspi.Registry.getDesktop.return_value = desktop
+        with patch.object(Tree, '_traverse_accessible') as traverse:
+            tree.get_nodes_atspi([])
+        traverse.assert_not_called()
+        with patch.object(Tree, '_traverse_accessible') as traverse:
+            tree.get_nodes_atspi(None)
+        assert [call.args[1] for call in traverse.call_args_list] == ['nm-applet', 'Firefox', 'gedit']